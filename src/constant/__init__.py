@@ -15,6 +15,8 @@ from .parameter_prompts import PARAMETER_OBSERVATION
 # Mapping-related prompts
 from .mapping_prompts import (
     PARAMETER_SCHEMA_MAPPING_PROMPT,
+    PARAMETER_SCHEMA_MAPPING_PROMPT_BATCH,
+    PARAMETER_SCHEMA_MAPPING_BATCH_ITEM,
     NAIVE_PARAMETER_SCHEMA_MAPPING_PROMPT,
     MAPPING_CONFIRMATION,
     DATA_MODEL_PROMPT,
@@ -24,7 +26,11 @@ from .mapping_prompts import (
 from .constraint_prompts import (
     DESCRIPTION_OBSERVATION_PROMPT,
     NAIVE_CONSTRAINT_DETECTION_PROMPT,
+    NAIVE_CONSTRAINT_DETECTION_PROMPT_BATCH,
+    NAIVE_CONSTRAINT_DETECTION_BATCH_ITEM,
     CONSTRAINT_CONFIRMATION,
+    CONSTRAINT_CONFIRMATION_BATCH,
+    CONSTRAINT_DETECT_COMBINED_PROMPT,
 )
 
 # Verification-related prompts
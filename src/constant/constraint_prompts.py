@@ -28,6 +28,38 @@ yes/no
 ```
 """
 
+NAIVE_CONSTRAINT_DETECTION_PROMPT_BATCH = """Given descriptions of attributes in an OpenAPI Specification, your responsibility is to identify, for each attribute, whether its description implies any constraints, rules, or limitations for legalizing the attribute itself.
+
+Below are the attributes' specifications:
+{attributes}
+
+For each attribute, return yes if its description implies any constraints, rules, or limitations for legalizing the attribute itself; otherwise, return no. Answer with a JSON array containing one object per attribute, follow the following format:
+```json
+[{{"idx": 1, "answer": "yes"}}, {{"idx": 2, "answer": "no"}}]
+```
+"""
+
+NAIVE_CONSTRAINT_DETECTION_BATCH_ITEM = (
+    '{idx}. name: "{attribute}", type: {data_type}, description: "{description}"'
+)
+
+CONSTRAINT_CONFIRMATION_BATCH = """Given descriptions of attributes in an OpenAPI Specification, your responsibility is to identify, for each attribute, whether its description implies any constraints, rules, or limitations for legalizing the attribute itself. Ensure that the description contains sufficient information to generate a script capable of verifying these constraints.
+
+Below are the attributes' specifications:
+{attributes}
+
+For each attribute, first provide a brief observation of the constraints, rules, or limitations its description implies, if any.
+
+Follow these rules to identify the capability of generating a constraint validation test script:
+- If there is a constraint for the attribute itself, check if the description contains specific predefined values, ranges, formats, etc. Exception: Predefined values such as True/False for the attribute whose data type is boolean are not good constraints.
+- If there is an inter-parameter constraint, ensure that the relevant attributes have been mentioned in the description.
+
+Then confirm for each attribute: Is there sufficient information mentioned in the description to generate a script for verifying these identified constraints? Answer with a JSON array containing one object per attribute, follow the following format:
+```json
+[{{"idx": 1, "observation": "...", "answer": "yes"}}, {{"idx": 2, "observation": "...", "answer": "no"}}]
+```
+"""
+
 CONSTRAINT_CONFIRMATION = """Given a description of an attribute in an OpenAPI Specification, your responsibility is to identify whether the description implies any constraints, rules, or limitations for legalizing the attribute itself. Ensure that the description contains sufficient information to generate a script capable of verifying these constraints.
 
 Below is the attribute's specification:
@@ -48,3 +80,20 @@ Now, let's confirm: Is there sufficient information mentioned in the description
 yes/no
 ```
 """
+
+CONSTRAINT_DETECT_COMBINED_PROMPT = """Given a description of an attribute in an OpenAPI Specification, your responsibility is to identify whether the description implies any constraints, rules, or limitations for legalizing the attribute itself. Ensure that the description contains sufficient information to generate a script capable of verifying these constraints.
+
+Below is the attribute's specification:
+- name: "{attribute}"
+- type: {data_type}
+- description: "{description}"
+- schema: "{param_schema}"
+
+First, provide your observation about whether the description implies any constraints, rules, or limitations, with a brief description of these constraints.
+
+Follow these rules to identify the capability of generating a constraint validation test script:
+- If there is a constraint for the attribute itself, check if the description contains specific predefined values, ranges, formats, etc. Exception: Predefined values such as True/False for the attribute whose data type is boolean are not good constraints.
+- If there is an inter-parameter constraint, ensure that the relevant attributes have been mentioned in the description.
+
+Then confirm: Is there sufficient information mentioned in the description to generate a script for verifying these identified constraints? On a new line, output `ANSWER: yes` or `ANSWER: no`.
+"""
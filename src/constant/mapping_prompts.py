@@ -2,6 +2,9 @@
 
 """
 Mapping-related prompt constants used for mapping between parameters and schema attributes.
+
+Prompts asked once per parameter against the same schema put the schema first,
+so consecutive requests share a prompt prefix the provider can cache.
 """
 
 PARAMETER_SCHEMA_MAPPING_PROMPT = """Given an input parameter and an API response schema, your responsibility is to check whether there is a corresponding attribute in the API response schema.
@@ -41,37 +44,49 @@ just respond corresponding attribute's name here (without any explanation)
 
 NAIVE_PARAMETER_SCHEMA_MAPPING_PROMPT = """Given an input parameter and an API response schema, your responsibility is to check whether there is a corresponding attribute in the API response schema.
 
+Below is the specification of the schema "{schema}":
+{schema_specification}
+
+Some cases can help determine a corresponding attribute:
+- The input parameter is used for filtering, and there is a corresponding attribute that reflects the real value (result of the filter); but this attribute must be in the same object as the input parameter.
+- The input parameter and the corresponding attribute maintain the same semantic meaning regarding their values.
+
 Below is the input parameter of the operation {method} {endpoint}:
 - "{attribute}": "{description}"
 
-Follow these step to find the coresponding attribute of the input parameter:
+Identify the corresponding attribute in the API response's schema. Respond with exactly these two lines and nothing else:
+ANSWER: yes/no
+ATTRIBUTE: the corresponding attribute's name, or none
+"""
 
+PARAMETER_SCHEMA_MAPPING_PROMPT_BATCH = """Given input parameters and an API response schema, your responsibility is to check, for each input parameter, whether there is a corresponding attribute in the API response schema.
 
-Identify the corresponding attribute in the API response's schema.
+Below is the specification of the schema "{schema}":
+{schema_specification}
+
+Below is an observation of the schema's attributes:
+{schema_observation}
 
 Some cases can help determine a corresponding attribute:
 - The input parameter is used for filtering, and there is a corresponding attribute that reflects the real value (result of the filter); but this attribute must be in the same object as the input parameter.
 - The input parameter and the corresponding attribute maintain the same semantic meaning regarding their values.
 
-Below is the specification of the schema "{schema}":
-{schema_specification}
+Below are the input parameters:
+{parameters}
 
-If there is a corresponding attribute in the response schema, let's explain the identified attribute. Follow the format of triple backticks below:
-```explanation
-explain...
-```
-
-Let's give your confirmation: Does the input parameter have any corresponding attribute in the response schema? Follow the format of triple backticks below:
-```answer
-just respond: yes/no (without any explanation)
-```
+Follow these steps to find the corresponding attribute of each input parameter:
+STEP 1: Let's give a brief observation about each input parameter.
 
-Let's identify all corresponding attributes name of the provided input parameter in {attributes}. Format of triple backticks below:
-```corresponding attribute
-just respond corresponding attribute's name here (without any explanation)
+STEP 2: For each input parameter, identify the name of its corresponding attribute in {attributes}, or null if it has no corresponding attribute in the response schema. Answer with a JSON array containing one object per input parameter, follow the following format:
+```json
+[{{"idx": 1, "corresponding_attribute": "id"}}, {{"idx": 2, "corresponding_attribute": null}}]
 ```
 """
 
+PARAMETER_SCHEMA_MAPPING_BATCH_ITEM = (
+    '{idx}. operation {method} {endpoint}: "{attribute}": "{description}"'
+)
+
 MAPPING_CONFIRMATION = """Given an input parameter of a REST API and an identified equivalent attribute in an API response schema, your responsibility is to check that the mapping is correct.
 
 The input parameter's information:
@@ -22,6 +22,7 @@ from utils.openapi_utils import (
     get_simplified_schema,
     get_response_body_name_and_type,
 )
+from utils.json_utils import dump_json_file
 from utils.llm_utils import llm_chat_completion
 from utils.dict_utils import filter_dict_by_key
 from utils.text_extraction import extract_python_code
@@ -32,6 +33,7 @@ from models.verification_script_models import (
     ConstraintInfo,
     RequestResponseConstraintInfo,
     VerificationScriptResult,
+    ResponseConstraintRef,
     ResponsePropertyVerificationResult,
     RequestResponseVerificationResult,
 )
@@ -93,13 +95,16 @@ class VerificationScriptGenerator:
         self.simplified_openapi = simplify_openapi(self.openapi_spec)
         self.simplified_schemas = get_simplified_schema(self.openapi_spec)
 
+        # Response specifications filtered to one attribute, keyed by
+        # (operation, attribute); the specification is never reloaded
+        self._response_specification_cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
         # Setup experiment directory
         self.experiment_dir = experiment_dir
         os.makedirs(self.experiment_dir, exist_ok=True)
 
         # Save simplified OpenAPI for debugging
-        with open("simplified_openapi.json", "w") as file:
-            json.dump(self.simplified_openapi, file, indent=2)
+        dump_json_file(self.simplified_openapi, "simplified_openapi.json")
 
         # Service information
         self.service_name = service_name
@@ -155,6 +160,28 @@ class VerificationScriptGenerator:
         )
         self.verify_inside_response_body_constraints()
 
+    def _response_specification(self, operation: str, attribute: str) -> Dict[str, Any]:
+        """
+        Get the part of an operation's response body leading to an attribute.
+
+        Constraints often share an operation and attribute, so the filtered
+        specification is computed once per pair.
+
+        Args:
+            operation: Operation the constraint belongs to
+            attribute: Response attribute the constraint is about
+
+        Returns:
+            The filtered response body specification, or an empty dictionary
+            if the attribute is not found
+        """
+        key = (operation, attribute)
+        if key not in self._response_specification_cache:
+            self._response_specification_cache[key] = filter_dict_by_key(
+                self.simplified_openapi[operation].get("responseBody", {}), attribute
+            )
+        return self._response_specification_cache[key]
+
     def track_generated_script(
         self, generating_script: Dict[str, str]
     ) -> Optional[
@@ -278,12 +305,7 @@ class VerificationScriptGenerator:
                 continue
 
             # Get response specification information
-            response_specification = self.simplified_openapi[operation].get(
-                "responseBody", {}
-            )
-            response_specification = filter_dict_by_key(
-                response_specification, attribute
-            )
+            response_specification = self._response_specification(operation, attribute)
 
             # Get response schema structure
             main_response_schema_name, response_type = get_response_body_name_and_type(
@@ -380,12 +402,15 @@ class VerificationScriptGenerator:
             executable_scripts[index] = script_string
             statuses[index] = status
 
-            # Create a result object and add to tracking
-            result = ResponsePropertyVerificationResult(
-                operation=operation,
-                response_resource=response_resource,
-                attribute=attribute,
-                description=description,
+            # Create a result object and add to tracking (trusted: built from
+            # the constraint row and the generated script, so skip validation)
+            result = ResponsePropertyVerificationResult.build_trusted(
+                ref=ResponseConstraintRef.model_construct(
+                    operation=operation,
+                    response_resource=response_resource,
+                    attribute=attribute,
+                    description=description,
+                ),
                 verification_script=python_verification_script,
                 executable_script=script_string,
                 status=status,
@@ -511,12 +536,7 @@ class VerificationScriptGenerator:
                 continue
 
             # Get response specification information
-            response_specification = self.simplified_openapi[operation].get(
-                "responseBody", {}
-            )
-            response_specification = filter_dict_by_key(
-                response_specification, attribute
-            )
+            response_specification = self._response_specification(operation, attribute)
 
             # Get response schema structure
             main_response_schema_name, response_type = get_response_body_name_and_type(
@@ -654,12 +674,15 @@ class VerificationScriptGenerator:
             verification_scripts[index] = python_verification_script
             statuses[index] = "unknown"
 
-            # Create a result object and add to tracking
-            result = RequestResponseVerificationResult(
-                operation=operation,
-                response_resource=response_resource,
-                attribute=attribute,
-                description=description,
+            # Create a result object and add to tracking (trusted: built from
+            # the constraint row and the generated script, so skip validation)
+            result = RequestResponseVerificationResult.build_trusted(
+                ref=ResponseConstraintRef.model_construct(
+                    operation=operation,
+                    response_resource=response_resource,
+                    attribute=attribute,
+                    description=description,
+                ),
                 corresponding_operation=corresponding_operation[0],
                 corresponding_attribute=corresponding_attribute,
                 corresponding_description=corresponding_description,
@@ -277,7 +277,7 @@ def main() -> None:
     csv_file = Path("experiment_our/Hotel Search API/invariants_description.csv")
 
     # Create the configuration
-    config = InvariantEvaluatorConfig.from_path(str(csv_file))
+    config = InvariantEvaluatorConfig.from_path(str(csv_file)).verify()
 
     # Create and run the evaluator
     evaluator = InvariantEvaluator(config)
@@ -492,7 +492,7 @@ def main() -> None:
         api_folders=args.api_folders,
         export_results=args.export,
         apply_verification_filter=args.verifier,
-    )
+    ).verify()
 
     # Run the evaluations
     mining_results = evaluate_response_property_constraint_mining(config)
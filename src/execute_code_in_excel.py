@@ -11,7 +11,7 @@ import os
 import uuid
 import pandas as pd
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from utils.execution_utils import (
     execute_response_constraint_verification_script,
@@ -22,7 +22,7 @@ from utils.execution_utils import (
     fix_json,
 )
 
-from models.execution_models import ExecutionConfig, ExecutionStats
+from models.execution_models import ExecutionConfig, ExecutionStats, ExecutionStatus
 
 
 def re_execute_code(
@@ -155,11 +155,7 @@ def re_execute_code(
         code = row["verification script"]
 
         # Initialize tracking variables
-        execution_statuses = []
-        satisfied = 0
-        mismatched = 0
-        unknown = 0
-        code_error = 0
+        execution_statuses: List[ExecutionStatus] = []
         mismatches_json = []
 
         # Execute the verification code for each API response
@@ -197,13 +193,10 @@ def re_execute_code(
                     )
 
             # Track status
-            execution_statuses.append(new_execution_status)
+            status = ExecutionStatus.from_label(new_execution_status)
+            execution_statuses.append(status)
 
-            # Update counts based on status
-            if new_execution_status == "satisfied":
-                satisfied += 1
-            elif new_execution_status == "mismatched":
-                mismatched += 1
+            if status == ExecutionStatus.MISMATCHED:
                 mismatches_json.append(api_response)
 
                 # Save mismatched code for debugging
@@ -213,9 +206,7 @@ def re_execute_code(
                     os.path.join(mismatched_code_folder, f"{uuid.uuid4()}.py"), "w"
                 ) as f:
                     f.write(executable_script)
-            elif new_execution_status == "code error":
-                code_error += 1
-
+            elif status == ExecutionStatus.CODE_ERROR:
                 # Save error code for debugging
                 code_error_folder = os.path.join("code", "code_error")
                 os.makedirs(code_error_folder, exist_ok=True)
@@ -223,14 +214,17 @@ def re_execute_code(
                     os.path.join(code_error_folder, f"{uuid.uuid4()}.py"), "w"
                 ) as f:
                     f.write(executable_script)
-            else:
-                unknown += 1
+
+        # Count all statuses for this row at once
+        row_stats = ExecutionStats.from_statuses(execution_statuses)
+        satisfied = row_stats.satisfied_count
+        mismatched = row_stats.mismatched_count
 
         # Update execution results in the dataframe
         df.at[index, "satisfied"] = bool(satisfied > 0)
         df.at[index, "mismatched"] = bool(mismatched > 0)
         df.at[index, "unknown"] = bool(not (satisfied > 0 or mismatched > 0))
-        df.at[index, "code error"] = code_error
+        df.at[index, "code error"] = row_stats.code_error_count
 
         # Save the executed code for reference
         with open(f"code/{index}.py", "w") as f:
@@ -239,8 +233,8 @@ def re_execute_code(
         # Update statistics
         stats.satisfied_count += satisfied
         stats.mismatched_count += mismatched
-        stats.unknown_count += unknown
-        stats.code_error_count += code_error
+        stats.unknown_count += row_stats.unknown_count
+        stats.code_error_count += row_stats.code_error_count
         stats.total_count += 1
 
     # Save the updated Excel file
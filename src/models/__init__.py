@@ -9,8 +9,13 @@ across the project.
 
 from .constraint_models import (
     CheckedMapping,
+    CheckedMappingRecord,
     AttributeMapping,
     ConstraintExtractorConfig,
+    ResponseBodyScope,
+    InputParameterScope,
+    Constraint,
+    ConstraintCollection,
     ResponseBodyConstraint,
     InputParameterConstraint,
     ResponseBodyConstraints,
@@ -7,8 +7,44 @@ This module defines Pydantic models for representing constraints in REST APIs,
 including parameter and response constraints extracted from OpenAPI specifications.
 """
 
-from typing import Dict, List, Optional, Any
-from pydantic import BaseModel, Field
+import sys
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+_intern = sys.intern
+
+ScopeT = TypeVar("ScopeT", bound=BaseModel)
+ValueT = TypeVar("ValueT")
+
+
+def _intern_keys(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Recursively intern the string keys of a nested constraint dictionary.
+
+    Constraint files repeat the same schema, operation and attribute names many
+    times; interning them lets duplicates share one object and keeps dict
+    lookups on the identity fast path.
+
+    Args:
+        data: Nested dictionary loaded from JSON
+
+    Returns:
+        A copy of the dictionary with interned keys
+    """
+    return {
+        _intern(key): _intern_keys(value) if isinstance(value, dict) else value
+        for key, value in data.items()
+    }
 
 
 class CheckedMapping(BaseModel):
@@ -31,6 +67,33 @@ class CheckedMapping(BaseModel):
         return [self.mapping, self.confirmation]
 
 
+class CheckedMappingRecord(NamedTuple):
+    """
+    Lightweight in-memory form of CheckedMapping.
+
+    Used while filtering mappings; the tuple mapping doubles as a dict key.
+    Promote it with ``to_model`` at I/O boundaries.
+    """
+
+    mapping: Tuple[str, ...]
+    confirmation: str
+
+    def to_model(self) -> CheckedMapping:
+        """Promote the record to a CheckedMapping without validation."""
+        return CheckedMapping.model_construct(
+            mapping=list(self.mapping), confirmation=self.confirmation
+        )
+
+    def to_list(self) -> List[Any]:
+        """
+        Convert the record to the legacy list representation.
+
+        Returns:
+            A list containing [mapping, confirmation]
+        """
+        return [list(self.mapping), self.confirmation]
+
+
 class AttributeMapping(BaseModel):
     """A model representing mapping between an attribute and operations."""
 
@@ -56,40 +119,54 @@ class ConstraintExtractorConfig(BaseModel):
     experiment_folder: str = Field(
         "experiment", description="Folder where experiment files are stored"
     )
+    debug_prompts: bool = Field(
+        False, description="Whether to write the last prompt and response to prompt.txt"
+    )
 
 
-class ResponseBodyConstraint(BaseModel):
-    """A model representing a constraint in a response body."""
+class ResponseBodyScope(BaseModel):
+    """Location of a constraint inside a response body schema."""
 
     schema: str = Field(..., description="The schema name containing the constraint")
     attribute: str = Field(..., description="The attribute name with the constraint")
-    description: str = Field(
-        ..., description="The description that defines the constraint"
-    )
 
 
-class InputParameterConstraint(BaseModel):
-    """A model representing a constraint in an input parameter."""
+class InputParameterScope(BaseModel):
+    """Location of a constraint on an operation input parameter."""
 
     operation: str = Field(..., description="The operation containing the parameter")
     part: str = Field(
         ..., description="The part of the operation ('parameters' or 'requestBody')"
     )
     parameter: str = Field(..., description="The parameter name with the constraint")
+
+
+class Constraint(BaseModel, Generic[ScopeT]):
+    """A constraint description attached to a location in the specification."""
+
+    scope: ScopeT = Field(..., description="Where the constraint applies")
     description: str = Field(
         ..., description="The description that defines the constraint"
     )
 
 
-class ResponseBodyConstraints(BaseModel):
-    """A collection of response body constraints organized by schema."""
+class ConstraintCollection(BaseModel, Generic[ValueT]):
+    """A collection of constraints keyed by schema or operation name."""
 
-    constraints: Dict[str, Dict[str, str]] = Field(
+    model_config = ConfigDict(frozen=True)
+
+    constraints: Dict[str, ValueT] = Field(
         default_factory=dict,
-        description="Mapping of schema names to attribute constraints",
+        description="Mapping of schema or operation names to their constraints",
     )
 
-    def to_dict(self) -> Dict[str, Dict[str, str]]:
+    @field_validator("constraints")
+    @classmethod
+    def intern_constraint_keys(cls, v: Dict[str, ValueT]) -> Dict[str, ValueT]:
+        """Intern the repeated schema, operation and attribute names."""
+        return _intern_keys(v)
+
+    def to_dict(self) -> Dict[str, ValueT]:
         """
         Convert the model to a dictionary representation.
 
@@ -99,7 +176,7 @@ class ResponseBodyConstraints(BaseModel):
         return self.constraints
 
     @classmethod
-    def from_dict(cls, data: Dict[str, Dict[str, str]]) -> "ResponseBodyConstraints":
+    def from_dict(cls, data: Dict[str, ValueT]) -> "ConstraintCollection[ValueT]":
         """
         Create a model from a dictionary.
 
@@ -107,39 +184,39 @@ class ResponseBodyConstraints(BaseModel):
             data: Dictionary containing constraint data
 
         Returns:
-            ResponseBodyConstraints model
+            ConstraintCollection model
         """
         return cls(constraints=data)
 
+    @classmethod
+    def from_json(cls, raw: Union[str, bytes]) -> "ConstraintCollection[ValueT]":
+        """
+        Create a model straight from the JSON text of a constraints file.
 
-class InputParameterConstraints(BaseModel):
-    """A collection of input parameter constraints organized by operation."""
-
-    constraints: Dict[str, Dict[str, Dict[str, str]]] = Field(
-        default_factory=dict,
-        description="Mapping of operations to parameter constraints",
-    )
+        The file holds the bare constraint mapping, so it is wrapped in the
+        model's envelope and parsed by Pydantic without an intermediate
+        ``json.loads`` dictionary.
 
-    def to_dict(self) -> Dict[str, Dict[str, Dict[str, str]]]:
-        """
-        Convert the model to a dictionary representation.
+        Args:
+            raw: JSON text of a constraints file
 
         Returns:
-            Dictionary representation of the constraints
+            ConstraintCollection model
         """
-        return self.constraints
+        if isinstance(raw, str):
+            raw = raw.encode("utf-8")
+        return cls.model_validate_json(b'{"constraints":' + raw + b"}")
 
-    @classmethod
-    def from_dict(
-        cls, data: Dict[str, Dict[str, Dict[str, str]]]
-    ) -> "InputParameterConstraints":
-        """
-        Create a model from a dictionary.
 
-        Args:
-            data: Dictionary containing constraint data
+# A constraint inside a response body schema
+ResponseBodyConstraint = Constraint[ResponseBodyScope]
 
-        Returns:
-            InputParameterConstraints model
-        """
-        return cls(constraints=data)
+# A constraint on an input parameter
+InputParameterConstraint = Constraint[InputParameterScope]
+
+# Response body constraints organized by schema: {schema: {attribute: description}}
+ResponseBodyConstraints = ConstraintCollection[Dict[str, str]]
+
+# Input parameter constraints organized by operation:
+# {operation: {part: {parameter: description}}}
+InputParameterConstraints = ConstraintCollection[Dict[str, Dict[str, str]]]
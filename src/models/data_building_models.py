@@ -7,9 +7,9 @@ This module defines Pydantic models used for data model building
 and schema relationship analysis.
 """
 
-from typing import Dict, List, Tuple, Optional, Set, Any
-from pydantic import BaseModel, Field, field_validator
-import os
+from functools import cached_property, lru_cache
+from typing import Dict, List, Tuple, Optional, Set, Any, Union
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, model_validator
 
 
 class SchemaKeyPair(BaseModel):
@@ -43,6 +43,8 @@ class SchemaRelationship(BaseModel):
 class DataModel(BaseModel):
     """Complete data model containing schema keys and relationships."""
 
+    model_config = ConfigDict(frozen=True)
+
     schema_keys: Dict[str, List[str]] = Field(
         default_factory=dict,
         description="Dictionary mapping schema names to their key fields",
@@ -51,6 +53,39 @@ class DataModel(BaseModel):
         default_factory=list, description="List of relationships between schemas"
     )
 
+    @model_validator(mode="before")
+    @classmethod
+    def reshape_legacy_format(cls, data: Any) -> Any:
+        """
+        Accept the legacy layout with a parallel 'schema_model' list.
+
+        The legacy layout stores relationships as
+        ``[schema_pairs, field_mappings_list]`` where each field mapping is a
+        ``[source, target]`` pair; it is reshaped into ``schema_relationships``.
+        """
+        if not isinstance(data, dict) or "schema_model" not in data:
+            return data
+
+        schema_relationships = []
+        schema_model = data["schema_model"]
+        if len(schema_model) >= 2:
+            schema_pairs, field_mappings_list = schema_model[0], schema_model[1]
+            for schema_pair, field_mappings in zip(schema_pairs, field_mappings_list):
+                schema_relationships.append(
+                    {
+                        "schema_pair": schema_pair,
+                        "field_mappings": [
+                            {"source_field": src, "target_field": tgt}
+                            for src, tgt in field_mappings
+                        ],
+                    }
+                )
+
+        return {
+            "schema_keys": data.get("schema_keys", {}),
+            "schema_relationships": schema_relationships,
+        }
+
     @classmethod
     def from_legacy_format(cls, legacy_data: Dict[str, Any]) -> "DataModel":
         """
@@ -62,31 +97,28 @@ class DataModel(BaseModel):
         Returns:
             DataModel instance populated with the legacy data
         """
-        schema_keys = legacy_data.get("schema_keys", {})
+        return cls.model_validate(legacy_data)
 
-        # Extract schema relationships
-        schema_relationships = []
-        if "schema_model" in legacy_data and len(legacy_data["schema_model"]) >= 2:
-            schema_pairs = legacy_data["schema_model"][0]
-            field_mappings_list = legacy_data["schema_model"][1]
-
-            for i, schema_pair in enumerate(schema_pairs):
-                if i < len(field_mappings_list):
-                    field_mappings = [
-                        SchemaKeyPair(source_field=src, target_field=tgt)
-                        for src, tgt in field_mappings_list[i]
-                    ]
-                    schema_relationships.append(
-                        SchemaRelationship(
-                            schema_pair=schema_pair, field_mappings=field_mappings
-                        )
-                    )
-
-        return cls(schema_keys=schema_keys, schema_relationships=schema_relationships)
+    @classmethod
+    def from_legacy_json(cls, raw: Union[str, bytes]) -> "DataModel":
+        """
+        Parse a legacy-format data model straight from JSON.
 
-    def to_legacy_format(self) -> Dict[str, Any]:
+        Pydantic parses the JSON directly instead of going through an
+        intermediate ``json.loads`` dictionary.
+
+        Args:
+            raw: JSON text of a saved data model file
+
+        Returns:
+            DataModel instance populated with the legacy data
         """
-        Convert to the legacy format for backward compatibility.
+        return _data_model_adapter().validate_json(raw)
+
+    @cached_property
+    def legacy_format(self) -> Dict[str, Any]:
+        """
+        The data model in the legacy format, computed once per instance.
 
         Returns:
             Dictionary in the legacy format with 'schema_keys' and 'schema_model'
@@ -105,6 +137,21 @@ class DataModel(BaseModel):
             "schema_model": [schema_pairs, field_mappings_list],
         }
 
+    def to_legacy_format(self) -> Dict[str, Any]:
+        """
+        Convert to the legacy format for backward compatibility.
+
+        Returns:
+            Dictionary in the legacy format with 'schema_keys' and 'schema_model'
+        """
+        return self.legacy_format
+
+
+@lru_cache(maxsize=None)
+def _data_model_adapter() -> TypeAdapter:
+    """Build the DataModel TypeAdapter once, on first use."""
+    return TypeAdapter(DataModel)
+
 
 class DataModelBuilderConfig(BaseModel):
     """Configuration for the DataModelBuilder."""
@@ -117,17 +164,34 @@ class DataModelBuilderConfig(BaseModel):
         default_factory=lambda: {"integer", "string"},
         description="Set of data types to keep during attribute filtering",
     )
+    prune_schema_pairs: bool = Field(
+        False,
+        description="Whether to skip schema pairs whose names share no uncommon word",
+    )
+
+    def verify(self) -> "DataModelBuilderConfig":
+        """
+        Check that the configured paths exist on disk.
+
+        Path checks are kept out of validation so that building the config
+        (or importing this module) does not touch the filesystem.
+
+        Returns:
+            The configuration itself, for chaining
+
+        Raises:
+            ValueError: If the OpenAPI file or the KS project directory is missing
+        """
+        import os
 
-    @field_validator("openapi_path")
-    def validate_openapi_path(cls, v: str) -> str:
-        """Validate that the OpenAPI path exists."""
-        if not os.path.exists(v):
-            raise ValueError(f"OpenAPI specification file not found at: {v}")
-        return v
-
-    @field_validator("ks_project_path")
-    def validate_ks_project_path(cls, v: Optional[str]) -> Optional[str]:
-        """Validate that the KS project path exists if provided."""
-        if v is not None and not os.path.exists(v):
-            raise ValueError(f"KS project directory not found at: {v}")
-        return v
+        if not os.path.exists(self.openapi_path):
+            raise ValueError(
+                f"OpenAPI specification file not found at: {self.openapi_path}"
+            )
+        if self.ks_project_path is not None and not os.path.exists(
+            self.ks_project_path
+        ):
+            raise ValueError(
+                f"KS project directory not found at: {self.ks_project_path}"
+            )
+        return self
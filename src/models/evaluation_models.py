@@ -7,8 +7,8 @@ This module defines Pydantic models for evaluation operations including
 constraint mining evaluation, test generation evaluation, and invariant evaluation.
 """
 
-from typing import Dict, List, Union
-from pydantic import BaseModel, Field, field_validator
+from typing import Dict, List, Optional, Union
+from pydantic import BaseModel, Field
 from pathlib import Path
 
 
@@ -32,12 +32,20 @@ class EvaluationConfig(BaseModel):
         False, description="Whether to filter results based on verification results"
     )
 
-    @field_validator("approach_folder", "ground_truth_folder")
-    def folder_must_exist(cls, v):
-        """Validate that the folder exists."""
-        if not v.exists():
-            raise ValueError(f"Folder does not exist: {v}")
-        return v
+    def verify(self) -> "EvaluationConfig":
+        """
+        Check that the approach and ground truth folders exist.
+
+        Returns:
+            The configuration itself, for chaining
+
+        Raises:
+            ValueError: If either folder does not exist
+        """
+        for folder in (self.approach_folder, self.ground_truth_folder):
+            if not folder.exists():
+                raise ValueError(f"Folder does not exist: {folder}")
+        return self
 
     @classmethod
     def from_paths(
@@ -60,6 +68,72 @@ class EvaluationConfig(BaseModel):
         )
 
 
+class ConstraintEvaluationConfig(BaseModel):
+    """Configuration for the combined constraint mining and test generation evaluation."""
+
+    approach_folder: str = Field(
+        ..., description="Folder containing the approach results to evaluate"
+    )
+    ground_truth_folder: str = Field(
+        ..., description="Folder containing the ground truth data"
+    )
+    api_folders: List[str] = Field(..., description="List of API folders to evaluate")
+    output_csv_path: str = Field(
+        ..., description="Path where the evaluation results CSV will be saved"
+    )
+    export: bool = Field(
+        False, description="Whether to export the results to the original files"
+    )
+    verifier: bool = Field(
+        False, description="Whether to filter results based on verification results"
+    )
+
+
+class TestGenEvaluationConfig(BaseModel):
+    """Configuration for summarizing test generation results."""
+
+    root_experiment_folder: str = Field(
+        ..., description="Folder containing one sub-folder per evaluated API"
+    )
+    output_file: str = Field(
+        ..., description="Path where the Excel summary will be saved"
+    )
+    knowledge_base_file: Optional[str] = Field(
+        None, description="Optional knowledge base used to categorize constraints"
+    )
+
+
+class CategoryStats(BaseModel):
+    """Test generation counts for one API or for the total."""
+
+    all_count: int = Field(0, description="Number of constraints")
+    no_test_gen_count: int = Field(
+        0, description="Number of constraints without a generated test"
+    )
+    correct_count: int = Field(0, description="Number of correct test generations")
+    tp_satisfied_count: int = Field(
+        0, description="Number of true positives that were satisfied"
+    )
+    tp_mismatched_count: int = Field(
+        0, description="Number of true positives that were mismatched"
+    )
+    unknown_count: int = Field(
+        0, description="Number of constraints with unknown status"
+    )
+
+
+class TestGenSummary(BaseModel):
+    """Summary of test generation results across APIs."""
+
+    api_stats: Dict[str, CategoryStats] = Field(
+        default_factory=dict,
+        description="Statistics keyed by '<api>_response' or '<api>_request'",
+    )
+    total_stats: CategoryStats = Field(
+        default_factory=CategoryStats, description="Statistics summed over all APIs"
+    )
+
+
 class EvaluationResults(BaseModel):
     """Results of constraint mining evaluation."""
 
@@ -146,9 +220,7 @@ class InvariantRecord(BaseModel):
 class InvariantEvaluatorConfig(BaseModel):
     """Configuration for the invariant evaluator application."""
 
-    csv_file: Path = Field(
-        ..., description="Path to the CSV file containing invariants"
-    )
+    csv_file: str = Field(..., description="Path to the CSV file containing invariants")
     encoding: str = Field("utf-8", description="Encoding of the CSV file")
     separator: str = Field("\t", description="Separator used in the CSV file")
     output_encoding: str = Field(
@@ -156,14 +228,26 @@ class InvariantEvaluatorConfig(BaseModel):
     )
     font_family: str = Field("Arial", description="Font family for the UI")
 
-    @field_validator("csv_file")
-    def file_must_exist(cls, v):
-        """Validate that the file exists."""
-        if not v.exists():
-            raise ValueError(f"CSV file does not exist: {v}")
-        return v
+    @property
+    def csv_path(self) -> Path:
+        """The CSV file as a Path object."""
+        return Path(self.csv_file)
+
+    def verify(self) -> "InvariantEvaluatorConfig":
+        """
+        Check that the configured CSV file exists.
+
+        Returns:
+            The configuration itself, for chaining
+
+        Raises:
+            ValueError: If the CSV file does not exist
+        """
+        if not self.csv_path.exists():
+            raise ValueError(f"CSV file does not exist: {self.csv_file}")
+        return self
 
     @classmethod
     def from_path(cls, csv_file: str) -> "InvariantEvaluatorConfig":
         """Create a configuration from a string path."""
-        return cls(csv_file=Path(csv_file))
+        return cls(csv_file=str(csv_file))
@@ -6,9 +6,37 @@ Example Models Module
 This module defines Pydantic models for working with example values in OpenAPI specifications.
 """
 
-from typing import Dict, List, Optional, Any, Union, Literal
+from enum import IntEnum
+from typing import Dict, List, Optional, Any, Union
 from pathlib import Path
-from pydantic import BaseModel, Field, field_validator
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    computed_field,
+    field_serializer,
+    field_validator,
+)
+
+
+class ExampleSource(IntEnum):
+    """Where an example value was found, stored as a small integer."""
+
+    NONE = 0
+    COMPONENTS = 1
+    DEFINITIONS = 2
+    BRUTE_FORCE = 3
+    ENUM = 4
+    DEFAULT = 5
+
+    @property
+    def label(self) -> str:
+        """The source name used in serialized results."""
+        return _SOURCE_LABELS[self]
+
+
+_SOURCE_LABELS = tuple(source.name.lower() for source in ExampleSource)
+_SOURCE_BY_LABEL = {label: ExampleSource(i) for i, label in enumerate(_SOURCE_LABELS)}
 
 
 class OpenAPIProperty(BaseModel):
@@ -48,13 +76,28 @@ class ExampleSearchResult(BaseModel):
     object_name: str = Field(..., description="Name of the object containing the field")
     field_name: str = Field(..., description="Name of the field")
     example_value: Optional[Any] = Field(None, description="Found example value")
-    source: Literal[
-        "components", "definitions", "brute_force", "enum", "default", "none"
-    ] = Field("none", description="Source of the example value")
+    source: ExampleSource = Field(
+        ExampleSource.NONE, description="Source of the example value"
+    )
     found: bool = Field(
         False, description="Whether an example value was successfully found"
     )
 
+    @field_validator("source", mode="before")
+    @classmethod
+    def parse_source(cls, v: Any) -> Any:
+        """Accept the legacy source strings."""
+        if isinstance(v, str):
+            if v not in _SOURCE_BY_LABEL:
+                raise ValueError(f"Unknown example source: {v!r}")
+            return _SOURCE_BY_LABEL[v]
+        return v
+
+    @field_serializer("source")
+    def serialize_source(self, source: ExampleSource) -> str:
+        """Serialize the source as its original string."""
+        return source.label
+
 
 class VerifierConfig(BaseModel):
     """Configuration for the Example Verifier."""
@@ -90,18 +133,19 @@ class VerifierConfig(BaseModel):
 class VerifierResult(BaseModel):
     """Results from running the verifier."""
 
+    model_config = ConfigDict(frozen=True)
+
     total_constraints: int = Field(0, description="Total number of constraints checked")
     examples_found: int = Field(0, description="Number of examples found")
     apis_processed: List[str] = Field(
         default_factory=list, description="List of APIs that were processed"
     )
-    failure_rate: float = Field(
-        0.0, description="Percentage of constraints without examples"
-    )
 
-    def calculate_stats(self) -> None:
-        """Calculate statistics based on the current counts."""
-        self.failure_rate = (
+    @computed_field
+    @property
+    def failure_rate(self) -> float:
+        """Percentage of constraints without examples."""
+        return (
             (self.total_constraints - self.examples_found)
             / self.total_constraints
             * 100
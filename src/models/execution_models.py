@@ -7,8 +7,35 @@ This module defines Pydantic models for code execution processes.
 These models provide structured representations of configuration parameters and results.
 """
 
-from typing import Dict, List, Optional, Union, Literal
-from pydantic import BaseModel, Field
+import sys
+from enum import IntEnum
+from typing import Any, Dict, Iterable, List, Optional, Union
+from pydantic import BaseModel, Field, field_serializer, field_validator
+
+
+class ExecutionStatus(IntEnum):
+    """Outcome of executing a verification script, stored as a small integer."""
+
+    SATISFIED = 0
+    MISMATCHED = 1
+    UNKNOWN = 2
+    CODE_ERROR = 3
+
+    @property
+    def label(self) -> str:
+        """The status string used in Excel files and script output."""
+        return _STATUS_LABELS[self]
+
+    @classmethod
+    def from_label(cls, label: str) -> "ExecutionStatus":
+        """Parse a status string, treating anything unrecognised as unknown."""
+        return _STATUS_BY_LABEL.get(label, cls.UNKNOWN)
+
+
+_STATUS_LABELS = tuple(
+    sys.intern(label) for label in ("satisfied", "mismatched", "unknown", "code error")
+)
+_STATUS_BY_LABEL = {label: ExecutionStatus(i) for i, label in enumerate(_STATUS_LABELS)}
 
 
 class ExecutionConfig(BaseModel):
@@ -36,12 +63,46 @@ class ExecutionStats(BaseModel):
     )
     total_count: int = Field(0, description="Total number of executions")
 
+    @classmethod
+    def from_statuses(cls, statuses: Iterable[ExecutionStatus]) -> "ExecutionStats":
+        """
+        Count execution statuses in a single pass.
+
+        Args:
+            statuses: Status codes of the executed scripts
+
+        Returns:
+            ExecutionStats with one count per status
+        """
+        import numpy as np
+
+        codes = np.fromiter(statuses, dtype=np.int8)
+        counts = np.bincount(codes, minlength=len(ExecutionStatus))
+        return cls(
+            satisfied_count=int(counts[ExecutionStatus.SATISFIED]),
+            mismatched_count=int(counts[ExecutionStatus.MISMATCHED]),
+            unknown_count=int(counts[ExecutionStatus.UNKNOWN]),
+            code_error_count=int(counts[ExecutionStatus.CODE_ERROR]),
+            total_count=len(codes),
+        )
+
 
 class ExecutionResult(BaseModel):
     """Result of code execution."""
 
-    status: Literal["satisfied", "mismatched", "unknown", "code error"] = Field(
-        ..., description="Status of the execution"
-    )
+    status: ExecutionStatus = Field(..., description="Status of the execution")
     script: str = Field(..., description="The executed script")
     index: int = Field(..., description="Index in the Excel file")
+
+    @field_validator("status", mode="before")
+    @classmethod
+    def parse_status(cls, v: Any) -> Any:
+        """Accept the legacy status strings."""
+        if isinstance(v, str):
+            return ExecutionStatus.from_label(v)
+        return v
+
+    @field_serializer("status")
+    def serialize_status(self, status: ExecutionStatus) -> str:
+        """Serialize the status as its original string."""
+        return status.label
@@ -7,8 +7,22 @@ This module defines Pydantic models representing the data structures used in the
 parameter-response body mapping process, with detailed field descriptions and validation.
 """
 
+import sys
 from typing import Dict, List, Optional, Any, Union, Tuple
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+_intern = sys.intern
+
+
+def _load_mapping(data: Dict[str, List[List[str]]]) -> Dict[str, List[List[str]]]:
+    """Intern attribute names and operation entries so duplicates share one object."""
+    return {
+        _intern(key): [
+            [_intern(item) if isinstance(item, str) else item for item in row]
+            for row in rows
+        ]
+        for key, rows in data.items()
+    }
 
 
 class AttributeInfo(BaseModel):
@@ -36,27 +50,55 @@ class FoundMapping(BaseModel):
         None,
         description="The name of the corresponding attribute in the schema, if found",
     )
+    prefiltered: bool = Field(
+        False,
+        description="Whether the lexical prefilter, not the LLM, found no mapping",
+    )
 
-    def to_list(self) -> List[Any]:
-        """Convert to the legacy list format for backward compatibility."""
-        return [
+    def to_tuple(self) -> Tuple[Any, Any, Any, Any]:
+        """Convert to an immutable tuple in the legacy field order."""
+        return (
             self.parameter_name,
             self.parameter_description,
             self.schema_name,
             self.corresponding_attribute,
-        ]
+        )
+
+    def to_list(self) -> List[Any]:
+        """
+        Convert to the legacy list format for backward compatibility.
+
+        Prefilter verdicts get a fifth ``true`` element; other mappings keep the
+        four-element legacy format.
+        """
+        mapping_list = list(self.to_tuple())
+        if self.prefiltered:
+            mapping_list.append(True)
+        return mapping_list
 
     @classmethod
     def from_list(cls, mapping_list: List[Any]) -> "FoundMapping":
-        """Create a FoundMapping from a list in the legacy format."""
-        if len(mapping_list) >= 4:
-            return cls(
-                parameter_name=mapping_list[0],
-                parameter_description=mapping_list[1],
-                schema_name=mapping_list[2],
-                corresponding_attribute=mapping_list[3],
-            )
-        raise ValueError("Invalid mapping list format")
+        """
+        Create a FoundMapping from a list in the legacy format.
+
+        The list comes from our own saved mapping files, so validation is
+        skipped and the fields are set directly.
+        """
+        if len(mapping_list) < 4:
+            raise ValueError("Invalid mapping list format")
+        (
+            parameter_name,
+            parameter_description,
+            schema_name,
+            corresponding_attribute,
+        ) = mapping_list[:4]
+        return cls.model_construct(
+            parameter_name=parameter_name,
+            parameter_description=parameter_description,
+            schema_name=schema_name,
+            corresponding_attribute=corresponding_attribute,
+            prefiltered=len(mapping_list) > 4 and bool(mapping_list[4]),
+        )
 
 
 class SchemaMapping(BaseModel):
@@ -67,6 +109,14 @@ class SchemaMapping(BaseModel):
         description="Dictionary mapping attributes to lists of operations using them",
     )
 
+    @field_validator("attributes", mode="before")
+    @classmethod
+    def intern_attributes(cls, v: Any) -> Any:
+        """Intern the repeated attribute and operation strings."""
+        if isinstance(v, dict):
+            return _load_mapping(v)
+        return v
+
 
 class ParameterResponseMapperConfig(BaseModel):
     """Configuration for the Parameter-Response Mapper."""
@@ -92,3 +142,7 @@ class ParameterResponseMapperConfig(BaseModel):
     is_naive: bool = Field(
         False, description="Whether to use the naive mapping approach"
     )
+    lexical_prefilter: bool = Field(
+        False,
+        description="Whether to skip parameters whose name and description share no text with the schema's attribute names",
+    )
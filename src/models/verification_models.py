@@ -38,7 +38,13 @@ class ConstraintVerificationResult(BaseModel):
     """Result of constraint verification."""
 
     field_name: str = Field(..., description="Name of the field being verified")
-    example_value: Any = Field(..., description="Example value used for verification")
+    example_value: Union[str, int, float, bool, None] = Field(
+        None, description="Scalar example value used for verification"
+    )
+    example_object: Optional[Union[Dict[str, Any], List[Any]]] = Field(
+        None,
+        description="Example value used for verification when it is an object or array",
+    )
     verification_results: List[FieldVerificationResult] = Field(
         default_factory=list, description="Results of individual field verifications"
     )
@@ -4,9 +4,13 @@
 Verification Script Models
 
 This module defines Pydantic models for verification script generation and execution.
+
+Result models offer ``build_trusted``, which skips validation. The script
+generation loops use it because their values come from already-processed
+constraint rows; configs keep full validation.
 """
 
-from typing import Optional, Literal
+from typing import Any, Optional, Literal
 from pydantic import BaseModel, Field, field_validator
 import os
 
@@ -84,18 +88,14 @@ class VerificationScriptResult(BaseModel):
         "", description="Status of the revised script execution"
     )
 
-
-class ResponsePropertyVerificationResult(VerificationScriptResult):
-    """Result of response property verification."""
-
-    operation: str = Field(..., description="API operation ID")
-    response_resource: str = Field(..., description="Response resource name")
-    attribute: str = Field(..., description="Attribute name")
-    description: str = Field(..., description="Constraint description")
+    @classmethod
+    def build_trusted(cls, **kwargs: Any) -> "VerificationScriptResult":
+        """Build an instance from trusted program state without validation."""
+        return cls.model_construct(**kwargs)
 
 
-class RequestResponseVerificationResult(VerificationScriptResult):
-    """Result of request-response verification."""
+class ResponseConstraintRef(BaseModel):
+    """The response constraint a verification script was generated for."""
 
     operation: str = Field(..., description="API operation ID")
     response_resource: str = Field(..., description="Response resource name")
@@ -103,6 +103,43 @@ class RequestResponseVerificationResult(VerificationScriptResult):
     description: str = Field(
         ..., description="Response attribute constraint description"
     )
+
+
+class ConstraintRefResult(VerificationScriptResult):
+    """Verification script result tied to a response constraint."""
+
+    ref: ResponseConstraintRef = Field(
+        ..., description="The response constraint that was verified"
+    )
+
+    @property
+    def operation(self) -> str:
+        """API operation ID of the constraint."""
+        return self.ref.operation
+
+    @property
+    def response_resource(self) -> str:
+        """Response resource name of the constraint."""
+        return self.ref.response_resource
+
+    @property
+    def attribute(self) -> str:
+        """Response attribute name of the constraint."""
+        return self.ref.attribute
+
+    @property
+    def description(self) -> str:
+        """Description of the constraint."""
+        return self.ref.description
+
+
+class ResponsePropertyVerificationResult(ConstraintRefResult):
+    """Result of response property verification."""
+
+
+class RequestResponseVerificationResult(ConstraintRefResult):
+    """Result of request-response verification."""
+
     corresponding_operation: str = Field(..., description="Corresponding operation")
     corresponding_attribute: str = Field(
         ..., description="Corresponding request attribute"
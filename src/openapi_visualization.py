@@ -7,7 +7,9 @@ by showing inputs and outputs in a visual and structured manner.
 
 import os
 import json
-import yaml
+import tempfile
+from hashlib import sha256
+from utils.json_utils import dump_json_file, dumps_json
 from utils.openapi_utils import (
     load_openapi,
     extract_operations,
@@ -181,11 +183,15 @@ if not os.path.exists(spec_path):
         },
     }
 
-    # Save sample spec to a temporary file
-    temp_path = "d:/Projects/Desktop/RBCTest/examples/sample_openapi.yaml"
-    os.makedirs(os.path.dirname(temp_path), exist_ok=True)
-    with open(temp_path, "w") as f:
-        yaml.dump(sample_spec, f)
+    # Save sample spec to a temporary file, named after a hash of its content
+    # so an edited sample never reuses a stale file
+    sample_json = dumps_json(sample_spec, indent=False)
+    temp_path = os.path.join(
+        tempfile.gettempdir(),
+        f"rbctest_sample_openapi_{sha256(sample_json).hexdigest()[:16]}.json",
+    )
+    if not os.path.exists(temp_path):
+        dump_json_file(sample_spec, temp_path, atomic=True)
     spec_path = temp_path
 
 # Load the OpenAPI spec
@@ -323,6 +329,5 @@ output_data = {
     "schema_operations_relationships": operations_by_schema,
 }
 
-with open(output_file, "w") as f:
-    json.dump(output_data, f, indent=2)
+dump_json_file(output_data, output_file)
 print(f"\nResults have been saved to {output_file}")
@@ -8,16 +8,11 @@ between request parameters and response bodies in REST API specifications.
 """
 
 import os
-import json
-from dotenv import load_dotenv
-import openai
+from pathlib import Path
 from response_body_verification import ConstraintExtractor, ParameterResponseMapper
 
 from utils import load_openapi, convert_json_to_excel_response_property_constraints
-
-# Load environment variables and set up OpenAI API
-load_dotenv()
-openai.api_key = os.getenv("OPENAI_KEY")
+from utils.json_utils import dump_json_file
 
 # Constants
 EXPERIMENT_FOLDER = "experiment_our"
@@ -32,6 +27,8 @@ def main() -> None:
     This function processes OpenAPI specifications to identify input parameter constraints
     and maps how request parameters influence response properties.
     """
+    _init_openai()
+
     experiment_folder = EXPERIMENT_FOLDER
 
     # List of REST services to analyze
@@ -52,7 +49,8 @@ def main() -> None:
         service_name = openapi_spec["info"]["title"]
 
         # Create output directory if it doesn't exist
-        os.makedirs(f"{experiment_folder}/{service_name}", exist_ok=True)
+        service_dir = Path(experiment_folder) / service_name
+        service_dir.mkdir(parents=True, exist_ok=True)
 
         # Initialize constraint extractor based on service type
         if rest_service == "StripeClone":
@@ -64,41 +62,60 @@ def main() -> None:
         else:
             # Default handling for other services
             constraint_extractor = ConstraintExtractor(
-                openapi_path, save_and_load=False
+                openapi_path, save_and_load=False, openapi_spec=openapi_spec
             )
 
         # Extract input parameter constraints
-        input_param_outfile = f"{experiment_folder}/{service_name}/input_parameter.json"
+        input_param_outfile = str(service_dir / "input_parameter.json")
         constraint_extractor.get_input_parameter_constraints(
             outfile=input_param_outfile
         )
 
         # Save input parameter constraints to JSON file
-        with open(input_param_outfile, "w") as f:
-            json.dump(constraint_extractor.input_parameter_constraints, f, indent=2)
+        dump_json_file(
+            constraint_extractor.input_parameter_constraints, input_param_outfile
+        )
 
         # Extract request-response mapping constraints
-        req_resp_outfile = (
-            f"{experiment_folder}/{service_name}/request_response_constraints.json"
-        )
+        req_resp_outfile = str(service_dir / "request_response_constraints.json")
 
         # Map request parameters to response properties
         parameterResponseMapper = ParameterResponseMapper(
-            openapi_path, save_and_load=False, outfile=req_resp_outfile
+            openapi_path,
+            save_and_load=False,
+            outfile=req_resp_outfile,
+            openapi_spec=openapi_spec,
         )
 
         # Save request-response mappings to JSON file
-        with open(req_resp_outfile, "w") as f:
-            json.dump(
-                parameterResponseMapper.response_body_input_parameter_mappings,
-                f,
-                indent=2,
+        dump_json_file(
+            parameterResponseMapper.response_body_input_parameter_mappings,
+            req_resp_outfile,
+        )
+
+        # Convert JSON results to Excel format, unless nothing was mapped; in
+        # that case remove the sheet of an earlier run so it is not evaluated
+        req_resp_excel = req_resp_outfile.replace(".json", ".xlsx")
+        if parameterResponseMapper.response_body_input_parameter_mappings:
+            convert_json_to_excel_response_property_constraints(
+                req_resp_outfile, openapi_path, req_resp_excel
             )
+        elif os.path.exists(req_resp_excel):
+            os.remove(req_resp_excel)
 
-        # Convert JSON results to Excel format
-        convert_json_to_excel_response_property_constraints(
-            req_resp_outfile, openapi_path, req_resp_outfile.replace(".json", ".xlsx")
-        )
+
+def _init_openai() -> None:
+    """
+    Load environment variables and configure the OpenAI API key.
+
+    openai and dotenv are imported here rather than at module level so that
+    importing this module does not pay their import cost.
+    """
+    import openai
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    openai.api_key = os.getenv("OPENAI_KEY")
 
 
 if __name__ == "__main__":
@@ -9,20 +9,17 @@ and evaluates the results against ground truth data.
 """
 
 import os
-import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
 from typing import List
-from dotenv import load_dotenv
-import openai
 from response_body_verification import ConstraintExtractor, ParameterResponseMapper
 
 from utils import load_openapi, convert_json_to_excel_request_response_constraints
+from utils.json_utils import dump_json_file, load_json_file
+from utils.llm_utils import set_llm_max_concurrency
 from eval.request_approach_evaluate import evaluate_request_response_constraint_mining
 
 
-# Load environment variables and set up OpenAI API
-load_dotenv()
-openai.api_key = os.getenv("OPENAI_KEY")
-
 # Constants
 EXPERIMENT_FOLDER = "experiment_our"
 GROUND_TRUTH_FOLDER = "approaches/ground_truth"
@@ -31,13 +28,19 @@ STRIPE_OPERATIONS_PATH = "stripe_selected/selected_operations"
 STRIPE_SCHEMAS_PATH = "src/selected_schemas.txt"
 STRIPE_SCHEMAS_JSON_PATH = "response-verification/stripe_schemas.json"
 
+# Services processed at once, and LLM requests in flight across all of them
+MAX_SERVICE_WORKERS = 4
+MAX_LLM_REQUESTS = 16
+
 
 def main() -> None:
     """
     Main function for the ablation study of request-response constraint mining.
 
     This function extracts request-response relationships, saves the results,
-    and evaluates the extraction against ground truth data.
+    and evaluates the extraction against ground truth data. Services are
+    independent of each other, so they are processed in parallel worker
+    processes; evaluation runs once all of them have finished.
     """
     experiment_folder = EXPERIMENT_FOLDER
     ground_truth_folder = GROUND_TRUTH_FOLDER
@@ -58,81 +61,126 @@ def main() -> None:
     selected_operations = _load_file_lines(STRIPE_OPERATIONS_PATH)
     selected_schemas = _load_file_lines(STRIPE_SCHEMAS_PATH)
 
-    for rest_service in rest_services:
-        print("\n" + "*" * 20)
-        print(rest_service)
-        print("*" * 20)
-
-        # Construct path to OpenAPI specification
-        openapi_path = f"{DATASET_BASE_PATH}/{rest_service}/openapi.json"
-
-        # Load and parse OpenAPI specification
-        openapi_spec = load_openapi(openapi_path)
-
-        # Extract service name from specification
-        service_name = openapi_spec["info"]["title"]
+    # Split the request budget between the worker processes so the total
+    # number of concurrent LLM requests stays at MAX_LLM_REQUESTS
+    workers = min(MAX_SERVICE_WORKERS, len(rest_services))
+    service_names: List[str] = []
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(max(1, MAX_LLM_REQUESTS // workers),),
+    ) as executor:
+        futures = [
+            executor.submit(
+                _process_service,
+                rest_service,
+                experiment_folder,
+                selected_operations,
+                selected_schemas,
+            )
+            for rest_service in rest_services
+        ]
+        for future in as_completed(futures):
+            service_names.append(future.result())
+
+    # Evaluate extraction results against ground truth in a single pass, so the
+    # evaluation CSV is only appended to from this process
+    service_names.sort()
+    evaluate_request_response_constraint_mining(
+        experiment_folder,
+        ground_truth_folder,
+        service_names,
+        f"{experiment_folder}/evaluation.csv",
+        export=True,
+    )
+
+
+def _process_service(
+    rest_service: str,
+    experiment_folder: str,
+    selected_operations: List[str],
+    selected_schemas: List[str],
+) -> str:
+    """
+    Extract and save the request-response constraints of one REST service.
 
-        # Create output directory if it doesn't exist
-        os.makedirs(f"{experiment_folder}/{service_name}", exist_ok=True)
+    Runs in a worker process set up by _init_worker.
 
-        # Initialize constraint extractor based on service type
-        if rest_service == "StripeClone":
-            # Special handling for StripeClone with selected operations
-            constraint_extractor = ConstraintExtractor(
-                openapi_path,
-                save_and_load=False,
-                list_of_operations=selected_operations,
-            )
-        else:
-            # Default handling for other services
-            constraint_extractor = ConstraintExtractor(
-                openapi_path, save_and_load=False
-            )
+    Args:
+        rest_service: Name of the service folder in the dataset
+        experiment_folder: Folder where the results are written
+        selected_operations: Operations to keep for the StripeClone service
+        selected_schemas: Schemas to keep for the StripeClone service
 
-        # Extract input parameter constraints
-        outfile = (
-            f"{experiment_folder}/{service_name}/response_property_constraints.json"
+    Returns:
+        The service name taken from the OpenAPI specification
+    """
+    print("\n" + "*" * 20)
+    print(rest_service)
+    print("*" * 20)
+
+    # Construct path to OpenAPI specification
+    openapi_path = f"{DATASET_BASE_PATH}/{rest_service}/openapi.json"
+
+    # Load and parse OpenAPI specification
+    openapi_spec = load_openapi(openapi_path)
+
+    # Extract service name from specification
+    service_name = openapi_spec["info"]["title"]
+
+    # Create output directory if it doesn't exist
+    service_dir = Path(experiment_folder) / service_name
+    service_dir.mkdir(parents=True, exist_ok=True)
+
+    # Initialize constraint extractor based on service type
+    if rest_service == "StripeClone":
+        # Special handling for StripeClone with selected operations
+        constraint_extractor = ConstraintExtractor(
+            openapi_path,
+            save_and_load=False,
+            list_of_operations=selected_operations,
+            openapi_spec=openapi_spec,
+        )
+    else:
+        # Default handling for other services
+        constraint_extractor = ConstraintExtractor(
+            openapi_path, save_and_load=False, openapi_spec=openapi_spec
         )
-        constraint_extractor.get_input_parameter_constraints(outfile=outfile)
 
-        # Save input parameter constraints to JSON file
-        with open(outfile, "w") as f:
-            json.dump(constraint_extractor.input_parameter_constraints, f, indent=2)
+    # Extract input parameter constraints
+    outfile = str(service_dir / "response_property_constraints.json")
+    constraint_extractor.get_input_parameter_constraints(outfile=outfile)
 
-        # Load Stripe schemas from JSON
-        list_of_schemas = json.load(open(STRIPE_SCHEMAS_JSON_PATH, "r"))
+    # Save input parameter constraints to JSON file
+    dump_json_file(constraint_extractor.input_parameter_constraints, outfile)
 
-        # Extract request-response mapping constraints
-        outfile = (
-            f"{experiment_folder}/{service_name}/request_response_constraints.json"
-        )
+    # Load Stripe schemas from JSON
+    list_of_schemas = load_json_file(STRIPE_SCHEMAS_JSON_PATH)
 
-        # Map request parameters to response properties
-        parameterResponseMapper = ParameterResponseMapper(
-            openapi_path, save_and_load=False, outfile=outfile
-        )
+    # Extract request-response mapping constraints
+    outfile = str(service_dir / "request_response_constraints.json")
 
-        # Save request-response mappings to JSON file
-        with open(outfile, "w") as f:
-            json.dump(
-                parameterResponseMapper.response_body_input_parameter_mappings,
-                f,
-                indent=2,
-            )
+    # Map request parameters to response properties
+    parameterResponseMapper = ParameterResponseMapper(
+        openapi_path, save_and_load=False, outfile=outfile, openapi_spec=openapi_spec
+    )
+
+    # Save request-response mappings to JSON file
+    dump_json_file(
+        parameterResponseMapper.response_body_input_parameter_mappings, outfile
+    )
 
-        # Convert JSON results to Excel format
+    # Convert JSON results to Excel format, unless nothing was mapped; in that
+    # case remove the sheet of an earlier run so it is not evaluated
+    excel_file = outfile.replace(".json", ".xlsx")
+    if parameterResponseMapper.response_body_input_parameter_mappings:
         convert_json_to_excel_request_response_constraints(
-            outfile, openapi_path, outfile.replace(".json", ".xlsx")
+            outfile, openapi_path, excel_file
         )
+    elif os.path.exists(excel_file):
+        os.remove(excel_file)
 
-        # Evaluate extraction results against ground truth
-        evaluate_request_response_constraint_mining(
-            experiment_folder,
-            ground_truth_folder,
-            [service_name],
-            f"{experiment_folder}/evaluation.csv",
-            export=True,
-        )
+    return service_name
 
 
 def _load_file_lines(file_path: str) -> List[str]:
@@ -145,9 +193,25 @@ def _load_file_lines(file_path: str) -> List[str]:
     Returns:
         List of stripped lines from the file
     """
-    with open(file_path, "r") as f:
-        lines = f.readlines()
-    return [line.strip() for line in lines]
+    return [line.strip() for line in Path(file_path).read_text().splitlines()]
+
+
+def _init_worker(max_llm_requests: int) -> None:
+    """
+    Set up a worker process: configure the OpenAI API key and cap its LLM requests.
+
+    openai and dotenv are imported here rather than at module level so that
+    importing this module does not pay their import cost.
+
+    Args:
+        max_llm_requests: Maximum number of LLM requests this worker runs at once
+    """
+    import openai
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    openai.api_key = os.getenv("OPENAI_KEY")
+    set_llm_max_concurrency(max_llm_requests)
 
 
 if __name__ == "__main__":
@@ -12,8 +12,9 @@ definitions to identify constraints that should be enforced during API usage.
 
 import json
 import os
-import copy
-from typing import Dict, List, Optional, Any
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Any, Set, Tuple
 
 
 from utils.openapi_utils import (
@@ -23,13 +24,22 @@ from utils.openapi_utils import (
     get_relevent_response_schemas_of_operation,
     extract_operations,
 )
-from utils.llm_utils import llm_chat_completion
+from utils.json_utils import dump_json_file, dumps_json, load_json_file, loads_json
+from utils.prompt_utils import compile_prompt
+from utils.llm_utils import (
+    batch_by_tokens,
+    iter_llm_tasks,
+    llm_chat_completion_with_retry,
+    run_llm_tasks,
+)
 from utils.text_extraction import (
     extract_variables,
     extract_values,
     extract_dict_attributes,
     extract_python_code,
     extract_answer,
+    extract_combined_answer,
+    extract_structured_field,
     extract_summary_constraint,
     extract_idl,
     is_construct_json_object,
@@ -38,10 +48,14 @@ from utils.text_extraction import (
 from constant import (
     DESCRIPTION_OBSERVATION_PROMPT,
     NAIVE_CONSTRAINT_DETECTION_PROMPT,
+    NAIVE_CONSTRAINT_DETECTION_PROMPT_BATCH,
+    NAIVE_CONSTRAINT_DETECTION_BATCH_ITEM,
     CONSTRAINT_CONFIRMATION,
+    CONSTRAINT_CONFIRMATION_BATCH,
+    CONSTRAINT_DETECT_COMBINED_PROMPT,
 )
 from models.constraint_models import (
-    CheckedMapping,
+    CheckedMappingRecord,
     AttributeMapping,
     ConstraintExtractorConfig,
     ResponseBodyConstraint,
@@ -50,6 +64,170 @@ from models.constraint_models import (
     InputParameterConstraints,
 )
 
+# Splits a simplified attribute spec "<data type> (description: <text>)"
+_DESC_RE = re.compile(r"^(.*?)\(description:\s*(.*)\)\s*$", re.S)
+
+# Prompt templates compiled once into rendering functions
+_render_description_observation = compile_prompt(DESCRIPTION_OBSERVATION_PROMPT)
+_render_constraint_confirmation = compile_prompt(CONSTRAINT_CONFIRMATION)
+_render_constraint_confirmation_batch = compile_prompt(CONSTRAINT_CONFIRMATION_BATCH)
+_render_combined_detection = compile_prompt(CONSTRAINT_DETECT_COMBINED_PROMPT)
+_render_naive_detection = compile_prompt(NAIVE_CONSTRAINT_DETECTION_PROMPT)
+_render_naive_detection_batch = compile_prompt(NAIVE_CONSTRAINT_DETECTION_PROMPT_BATCH)
+_render_naive_detection_batch_item = compile_prompt(
+    NAIVE_CONSTRAINT_DETECTION_BATCH_ITEM
+)
+
+# Limits for packing several attributes into one naive detection prompt
+NAIVE_BATCH_MAX_PROMPT_TOKENS = 6000
+NAIVE_BATCH_MAX_ATTRIBUTES = 30
+
+# Limits for packing several attributes into one confirmation prompt; these
+# replies carry an observation per attribute, so fewer attributes fit
+CONFIRMATION_BATCH_MAX_PROMPT_TOKENS = 6000
+CONFIRMATION_BATCH_MAX_ATTRIBUTES = 20
+
+# Checkpoint progress is flushed to disk after this many new entries or this
+# many seconds, whichever comes first
+CHECKPOINT_FLUSH_EVERY = 50
+CHECKPOINT_FLUSH_INTERVAL = 2.0
+
+
+def load_checkpoint(save_path: str) -> List[Any]:
+    """
+    Load checkpointed entries.
+
+    Entries are read from the consolidated JSON file, followed by any
+    entries appended to its ``.jsonl`` journal since it was last written.
+    A partial last line left by an interrupted write is cut from the journal,
+    so the next appended entry starts on a line of its own, and any other
+    unreadable line is skipped.
+
+    Args:
+        save_path: Path of the consolidated checkpoint file
+
+    Returns:
+        The checkpointed entries, empty if nothing was saved yet
+    """
+    entries: List[Any] = []
+    if os.path.exists(save_path):
+        entries = load_json_file(save_path)
+
+    journal_path = f"{save_path}.jsonl"
+    if os.path.exists(journal_path):
+        with open(journal_path, "rb+") as file:
+            data = file.read()
+            if data and not data.endswith(b"\n"):
+                data = data[: data.rfind(b"\n") + 1]
+                file.truncate(len(data))
+        for line in data.splitlines():
+            try:
+                entries.append(loads_json(line))
+            except ValueError:
+                continue
+    return entries
+
+
+def consolidate_checkpoint(save_path: str, entries: List[Any]) -> None:
+    """
+    Atomically rewrite the consolidated checkpoint file and drop its journal.
+
+    Args:
+        save_path: Path of the consolidated checkpoint file
+        entries: All checkpointed entries
+
+    Returns:
+        None
+    """
+    dump_json_file(entries, save_path, indent=False, fsync=True, atomic=True)
+
+    journal_path = f"{save_path}.jsonl"
+    if os.path.exists(journal_path):
+        os.remove(journal_path)
+
+
+def _count_substring(node: Any, needle: str) -> int:
+    """
+    Count occurrences of a substring in all strings of a nested structure.
+
+    Args:
+        node: Nested dicts/lists of strings, as loaded from JSON
+        needle: The substring to count
+
+    Returns:
+        Total number of occurrences across keys and values
+    """
+    if isinstance(node, str):
+        return node.count(needle)
+    if isinstance(node, dict):
+        return sum(
+            key.count(needle) + _count_substring(value, needle)
+            for key, value in node.items()
+        )
+    if isinstance(node, list):
+        return sum(_count_substring(item, needle) for item in node)
+    return 0
+
+
+def _parse_batch_verdicts(response: Optional[str]) -> Dict[int, str]:
+    """
+    Parse the yes/no verdicts of a batched constraint detection reply.
+
+    Args:
+        response: LLM reply holding a JSON array of {"idx", "answer"} objects
+
+    Returns:
+        Dictionary mapping attribute indexes to "yes"/"no"; empty if the reply
+        is not a valid JSON array
+    """
+    answers: Dict[int, str] = {}
+    try:
+        verdicts = loads_json(extract_structured_field(response, "json") or response)
+        for verdict in verdicts:
+            answer = str(verdict["answer"]).strip().lower()
+            if answer in ("yes", "no"):
+                answers[int(verdict["idx"])] = answer
+    except (TypeError, ValueError, KeyError):
+        return {}
+    return answers
+
+
+def _render_batch_attributes(items: List[Tuple[str, str, str]]) -> str:
+    """
+    Render the numbered attribute list of a batched constraint detection prompt.
+
+    Args:
+        items: Tuples of (attribute, data_type, description)
+
+    Returns:
+        One numbered line per attribute, starting at 1
+    """
+    return "\n".join(
+        _render_naive_detection_batch_item(
+            idx=idx,
+            attribute=attribute,
+            data_type=data_type,
+            description=description,
+        )
+        for idx, (attribute, data_type, description) in enumerate(items, 1)
+    )
+
+
+def _parse_desc(spec: str) -> Optional[Tuple[str, str]]:
+    """
+    Split a simplified attribute spec into its data type and description.
+
+    Args:
+        spec: Simplified spec of the form "<data type> (description: <text>)"
+
+    Returns:
+        Tuple of (data_type, description), or None if the spec has no description
+    """
+    match = _DESC_RE.match(spec)
+    if match is None:
+        return None
+    return match.group(1).strip(), match.group(2).strip()
+
 
 class ConstraintExtractor:
     """
@@ -87,6 +265,8 @@ class ConstraintExtractor:
         save_and_load: bool = False,
         list_of_operations: Optional[List[str]] = None,
         experiment_folder: str = "experiment",
+        openapi_spec: Optional[Dict[str, Any]] = None,
+        debug_prompts: bool = False,
     ) -> None:
         """
         Initialize the ConstraintExtractor.
@@ -96,6 +276,8 @@ class ConstraintExtractor:
             save_and_load: Whether to save and load progress from files
             list_of_operations: Optional list of operations to process; if None, all operations are processed
             experiment_folder: Folder where experiment files are stored
+            openapi_spec: Already loaded specification of openapi_path; loaded from the file if None
+            debug_prompts: Whether to write the last prompt and response to prompt.txt
 
         Returns:
             None
@@ -106,6 +288,7 @@ class ConstraintExtractor:
             save_and_load=save_and_load,
             list_of_operations=list_of_operations,
             experiment_folder=experiment_folder,
+            debug_prompts=debug_prompts,
         )
 
         self.openapi_path = openapi_path
@@ -114,11 +297,16 @@ class ConstraintExtractor:
         self.experiment_folder = experiment_folder
 
         # Initialize fields that will be populated in initialize()
-        self.openapi_spec: Dict[str, Any] = {}
+        self.openapi_spec: Dict[str, Any] = openapi_spec or {}
         self.simplified_openapi: Dict[str, Any] = {}
         self.service_name: str = ""
-        self.mappings_checked: List[CheckedMapping] = []
+        self.mappings_checked: List[CheckedMappingRecord] = []
         self.input_parameters_checked: List[List[Any]] = []
+        # Lookup indexes over the checked lists, keyed by the tuple form of the
+        # checked mapping/parameter/attribute
+        self._mappings_checked_idx: Dict[Tuple[str, ...], CheckedMappingRecord] = {}
+        self._input_parameters_checked_idx: Dict[Tuple[Any, ...], List[Any]] = {}
+        self._found_responsebody_constraints_idx: Dict[Tuple[Any, ...], List[Any]] = {}
         self.operations_containing_param_w_description: Dict[str, Any] = {}
         self.operation_param_w_descr: Dict[str, Any] = {}
         self.total_inference: int = 0
@@ -128,6 +316,20 @@ class ConstraintExtractor:
         self.inside_response_body_constraints: Dict[str, Dict[str, str]] = {}
         self.input_parameter_constraints: Dict[str, Dict[str, Dict[str, str]]] = {}
         self.simplified_schemas: Dict[str, Any] = {}
+        self._response_body_schemas: Optional[List[str]] = None
+        # Parsed (data_type, description) of every described input parameter,
+        # keyed by (operation, part, parameter)
+        self._attr_parsed: Dict[Tuple[str, str, str], Tuple[str, str]] = {}
+        # Operations outside list_of_operations whose parameters were parsed
+        # into _attr_parsed on demand
+        self._unlisted_operations_parsed: Set[str] = set()
+        # Response body constraint confirmations, keyed by the normalized
+        # (data_type, description) so attributes sharing a description are
+        # only confirmed once
+        self._desc_cache: Dict[Tuple[str, str], Optional[str]] = {}
+        # Described attributes of each response body schema as
+        # (name, spec, data_type, description), parsed once per schema
+        self._schema_attr_parsed: Dict[str, List[Tuple[str, str, str, str]]] = {}
 
         # Load OpenAPI specification and initialize structures
         self.initialize()
@@ -143,10 +345,14 @@ class ConstraintExtractor:
         Returns:
             None
         """
-        self.openapi_spec = load_openapi(self.openapi_path)
+        if not self.openapi_spec:
+            self.openapi_spec = load_openapi(self.openapi_path)
         self.service_name = self.openapi_spec["info"]["title"]
 
-        self.simplified_openapi = simplify_openapi(self.openapi_spec)
+        # Only simplify the requested operations when the run is restricted
+        self.simplified_openapi = simplify_openapi(
+            self.openapi_spec, self.list_of_operations
+        )
 
         self.mappings_checked = []
         self.input_parameters_checked = []
@@ -156,19 +362,28 @@ class ConstraintExtractor:
             self.mappings_checked_save_path = (
                 f"{self.experiment_folder}/{self.service_name}/mappings_checked.txt"
             )
-            if os.path.exists(self.mappings_checked_save_path):
-                raw_mappings = json.load(open(self.mappings_checked_save_path, "r"))
-                # Convert raw mappings to CheckedMapping objects
-                self.mappings_checked = [
-                    CheckedMapping(mapping=item[0], confirmation=item[1])
-                    for item in raw_mappings
-                ]
+            raw_mappings = load_checkpoint(self.mappings_checked_save_path)
+            # Convert raw mappings to CheckedMappingRecord tuples
+            self.mappings_checked = [
+                CheckedMappingRecord(tuple(item[0]), item[1]) for item in raw_mappings
+            ]
 
             self.input_parameters_checked_save_path = f"{self.experiment_folder}/{self.service_name}/input_parameters_checked.txt"
-            if os.path.exists(self.input_parameters_checked_save_path):
-                self.input_parameters_checked = json.load(
-                    open(self.input_parameters_checked_save_path, "r")
-                )
+            self.input_parameters_checked = load_checkpoint(
+                self.input_parameters_checked_save_path
+            )
+
+        # Index the loaded entries, keeping the first entry of duplicates
+        self._mappings_checked_idx = {}
+        for checked_mapping in self.mappings_checked:
+            self._mappings_checked_idx.setdefault(
+                checked_mapping.mapping, checked_mapping
+            )
+        self._input_parameters_checked_idx = {}
+        for checked_parameter in self.input_parameters_checked:
+            self._input_parameters_checked_idx.setdefault(
+                tuple(checked_parameter[0]), checked_parameter
+            )
 
         # Use all operations if none specified
         if self.list_of_operations is None:
@@ -185,43 +400,135 @@ class ConstraintExtractor:
             Dictionary of operations with parameter descriptions
         """
         self.operations_containing_param_w_description = {}
-        # Get simplified openapi Spec with params, that each param has a description
-        self.operation_param_w_descr = simplify_openapi(self.openapi_spec)
+        # Get simplified openapi Spec with params, that each param has a description;
+        # initialize() has already simplified this spec, so reuse it when available.
+        # Either way only the operations in list_of_operations are walked
+        self.operation_param_w_descr = self.simplified_openapi or simplify_openapi(
+            self.openapi_spec, self.list_of_operations
+        )
 
         # Count total potential inferences
-        self.total_inference = json.dumps(self.operation_param_w_descr).count(
-            "(description:"
+        self.total_inference = _count_substring(
+            self.operation_param_w_descr, "(description:"
         )
 
-        for operation in self.operation_param_w_descr:
-            self.operations_containing_param_w_description[operation] = {}
+        # Described parameters are also parsed once here for the mapping filter
+        self._attr_parsed = {}
+
+        for operation, operation_spec in self.operation_param_w_descr.items():
+            filtered_operation: Dict[str, Any] = {}
+            self.operations_containing_param_w_description[operation] = (
+                filtered_operation
+            )
 
             # Copy operation summary if present
-            if "summary" in self.operation_param_w_descr[operation]:
-                self.operations_containing_param_w_description[operation]["summary"] = (
-                    self.operation_param_w_descr[operation]["summary"]
-                )
+            if "summary" in operation_spec:
+                filtered_operation["summary"] = operation_spec["summary"]
 
             # Filter parameters and requestBody for those with descriptions
-            parts = ["parameters", "requestBody"]
-            for part in parts:
-                if (
-                    self.operation_param_w_descr.get(operation, {}).get(part, None)
-                    is not None
-                ):
-                    self.operations_containing_param_w_description[operation][part] = {}
-                    if isinstance(self.operation_param_w_descr[operation][part], dict):
-                        for param, value in self.operation_param_w_descr[operation][
-                            part
-                        ].items():
-                            if "description" in value:
-                                self.operations_containing_param_w_description[
-                                    operation
-                                ][part][param] = value
+            for part in ("parameters", "requestBody"):
+                part_spec = operation_spec.get(part)
+                if part_spec is None:
+                    continue
+                filtered_part: Dict[str, Any] = {}
+                filtered_operation[part] = filtered_part
+                if not isinstance(part_spec, dict):
+                    continue
+                for param, value in part_spec.items():
+                    if "description" in value:
+                        filtered_part[param] = value
+                        parsed = _parse_desc(value)
+                        if parsed is not None:
+                            self._attr_parsed[(operation, part, param)] = parsed
 
         return self.operations_containing_param_w_description
 
-    def checkedMapping(self, mapping: List[str]) -> Optional[CheckedMapping]:
+    def _parse_unlisted_operations(self, operations: Iterable[str]) -> None:
+        """
+        Parse the described parameters of operations outside list_of_operations.
+
+        filter_params_w_descr only walks the listed operations, but mappings may
+        come from a run over the whole spec, so their operations are simplified
+        and parsed into _attr_parsed here, once each.
+
+        Args:
+            operations: Operations whose parameter descriptions are needed
+
+        Returns:
+            None
+        """
+        unlisted = sorted(
+            set(operations)
+            - self.operation_param_w_descr.keys()
+            - self._unlisted_operations_parsed
+        )
+        if not unlisted:
+            return
+        self._unlisted_operations_parsed.update(unlisted)
+
+        for operation, operation_spec in simplify_openapi(
+            self.openapi_spec, unlisted
+        ).items():
+            for part in ("parameters", "requestBody"):
+                part_spec = operation_spec.get(part)
+                if not isinstance(part_spec, dict):
+                    continue
+                for param, value in part_spec.items():
+                    if "description" in value:
+                        parsed = _parse_desc(value)
+                        if parsed is not None:
+                            self._attr_parsed[(operation, part, param)] = parsed
+
+    def _get_response_body_schemas(self) -> List[str]:
+        """
+        Get the schemas used in response bodies, computing them once per spec.
+
+        Also fills self.simplified_schemas on first use. The naive and
+        two-step response body passes share the result.
+
+        Returns:
+            List of schema names specified in response bodies
+        """
+        if self._response_body_schemas is None:
+            # Get simplified schemas with attribute descriptions
+            self.simplified_schemas = get_simplified_schema(self.openapi_spec)
+
+            # Extract all schemas specified in response bodies
+            response_body_specified_schemas = []
+            operations = extract_operations(self.openapi_spec)
+
+            for operation in operations:
+                _, relevant_schemas_in_response = (
+                    get_relevent_response_schemas_of_operation(
+                        self.openapi_spec, operation
+                    )
+                )
+                response_body_specified_schemas.extend(relevant_schemas_in_response)
+
+            self._response_body_schemas = list(set(response_body_specified_schemas))
+        return self._response_body_schemas
+
+    def _described_attributes(self, schema: str) -> List[Tuple[str, str, str, str]]:
+        """
+        Get the attributes of a schema that have a description, parsing them once.
+
+        Args:
+            schema: Name of the schema in self.simplified_schemas
+
+        Returns:
+            List of (name, spec, data_type, description) tuples, in schema order
+        """
+        described = self._schema_attr_parsed.get(schema)
+        if described is None:
+            described = []
+            for name, spec in self.simplified_schemas.get(schema, {}).items():
+                parsed = _parse_desc(spec)
+                if parsed is not None and parsed[1]:
+                    described.append((name, spec, parsed[0], parsed[1]))
+            self._schema_attr_parsed[schema] = described
+        return described
+
+    def checkedMapping(self, mapping: List[str]) -> Optional[CheckedMappingRecord]:
         """
         Check if a mapping has already been processed.
 
@@ -231,10 +538,207 @@ class ConstraintExtractor:
         Returns:
             The checked mapping if found, None otherwise
         """
-        for check_mapping in self.mappings_checked:
-            if check_mapping.mapping == mapping:
-                return check_mapping
-        return None
+        return self._mappings_checked_idx.get(tuple(mapping))
+
+    def _add_checked_mapping(self, checked_mapping: CheckedMappingRecord) -> None:
+        """Record a checked mapping and index it for checkedMapping."""
+        self.mappings_checked.append(checked_mapping)
+        self._mappings_checked_idx.setdefault(checked_mapping.mapping, checked_mapping)
+
+    def _add_checked_input_parameter(self, checked_parameter: List[Any]) -> None:
+        """Record a checked input parameter and index it for lookups."""
+        self.input_parameters_checked.append(checked_parameter)
+        self._input_parameters_checked_idx.setdefault(
+            tuple(checked_parameter[0]), checked_parameter
+        )
+
+    def _add_found_responsebody_constraint(self, checked_attribute: List[Any]) -> None:
+        """Record a checked response body attribute and index it for lookups."""
+        self.found_responsebody_constraints.append(checked_attribute)
+        self._found_responsebody_constraints_idx.setdefault(
+            tuple(checked_attribute[0]), checked_attribute
+        )
+
+    def _confirm_constraint(self, item: Tuple[str, str, str]) -> Tuple[str, ...]:
+        """
+        Ask whether an attribute description implies a constraint.
+
+        The description is first observed, then the observation is confirmed.
+
+        Args:
+            item: Tuple of (attribute, data_type, description)
+
+        Returns:
+            Tuple of (observation prompt, observation response,
+            confirmation prompt, confirmation response)
+        """
+        attribute, data_type, description = item
+
+        description_observation_prompt = _render_description_observation(
+            attribute=attribute,
+            data_type=data_type,
+            description=description,
+            param_schema="",
+        )
+        description_observation_response = llm_chat_completion_with_retry(
+            description_observation_prompt, model="gpt-4-turbo", temperature=0.0
+        )
+
+        constraint_confirmation_prompt = _render_constraint_confirmation(
+            attribute=attribute,
+            data_type=data_type,
+            description=description,
+            description_observation=description_observation_response,
+            param_schema="",
+        )
+        constraint_confirmation_response = llm_chat_completion_with_retry(
+            constraint_confirmation_prompt, model="gpt-4-turbo", temperature=0.0
+        )
+
+        return (
+            description_observation_prompt,
+            description_observation_response,
+            constraint_confirmation_prompt,
+            constraint_confirmation_response,
+        )
+
+    def _detect_constraint_combined(self, item: Tuple[str, str, str]) -> Optional[str]:
+        """
+        Observe and confirm a possible constraint with a single combined prompt.
+
+        Args:
+            item: Tuple of (attribute, data_type, description)
+
+        Returns:
+            The "yes"/"no" confirmation extracted from the response
+        """
+        return self._confirm_constraint_combined(item, fallback=False)[2]
+
+    def _confirm_constraint_combined(
+        self, item: Tuple[str, str, str], fallback: bool = True
+    ) -> Tuple[str, Optional[str], Optional[str]]:
+        """
+        Observe and confirm a possible constraint with a single combined prompt.
+
+        Args:
+            item: Tuple of (attribute, data_type, description)
+            fallback: Whether to observe and confirm in two separate prompts
+                when the reply has no yes/no verdict
+
+        Returns:
+            Tuple of (prompt, response, extracted confirmation)
+        """
+        attribute, data_type, description = item
+
+        combined_prompt = _render_combined_detection(
+            attribute=attribute,
+            data_type=data_type,
+            description=description,
+            param_schema="",
+        )
+        combined_response = llm_chat_completion_with_retry(
+            combined_prompt, model="gpt-4-turbo", temperature=0.0
+        )
+        confirmation = extract_combined_answer(combined_response)
+
+        if fallback and confirmation not in ("yes", "no"):
+            _, _, combined_prompt, combined_response = self._confirm_constraint(item)
+            confirmation = extract_answer(combined_response)
+        return combined_prompt, combined_response, confirmation
+
+    def _detect_constraint_naive(self, item: Tuple[str, str, str]) -> Optional[str]:
+        """
+        Ask with the naive prompt whether an attribute description implies a constraint.
+
+        Args:
+            item: Tuple of (attribute, data_type, description)
+
+        Returns:
+            The LLM response
+        """
+        attribute, data_type, description = item
+        constraint_confirmation_prompt = _render_naive_detection(
+            attribute=attribute,
+            data_type=data_type,
+            description=description,
+        )
+        return llm_chat_completion_with_retry(
+            constraint_confirmation_prompt, model="gpt-4-turbo", temperature=0.0
+        )
+
+    def _detect_constraints_naive_batch(
+        self, items: List[Tuple[str, str, str]]
+    ) -> List[Optional[str]]:
+        """
+        Ask with one naive prompt whether each of several attribute descriptions
+        implies a constraint.
+
+        Attributes whose verdict is missing from the reply, or all of them if the
+        reply is not a valid JSON array, are asked again one prompt at a time.
+
+        Args:
+            items: Tuples of (attribute, data_type, description)
+
+        Returns:
+            The "yes"/"no" answers, in the same order as ``items``
+        """
+        if len(items) == 1:
+            return [extract_answer(self._detect_constraint_naive(items[0]))]
+
+        prompt = _render_naive_detection_batch(
+            attributes=_render_batch_attributes(items)
+        )
+        response = llm_chat_completion_with_retry(
+            prompt, model="gpt-4-turbo", temperature=0.0
+        )
+        answers = _parse_batch_verdicts(response)
+
+        return [
+            (
+                answers[idx]
+                if idx in answers
+                else extract_answer(self._detect_constraint_naive(item))
+            )
+            for idx, item in enumerate(items, 1)
+        ]
+
+    def _confirm_constraints_batch(
+        self, items: List[Tuple[str, str, str]]
+    ) -> Tuple[str, Optional[str], List[Optional[str]]]:
+        """
+        Observe and confirm possible constraints of several attributes in one prompt.
+
+        Attributes whose verdict is missing from the reply, or all of them if the
+        reply is not a valid JSON array, are observed and confirmed again one
+        attribute at a time, with a single combined prompt each.
+
+        Args:
+            items: Tuples of (attribute, data_type, description)
+
+        Returns:
+            Tuple of (last prompt, last response, the "yes"/"no" confirmations
+            in the same order as ``items``)
+        """
+        if len(items) == 1:
+            prompt, response, confirmation = self._confirm_constraint_combined(items[0])
+            return prompt, response, [confirmation]
+
+        prompt = _render_constraint_confirmation_batch(
+            attributes=_render_batch_attributes(items)
+        )
+        response = llm_chat_completion_with_retry(
+            prompt, model="gpt-4-turbo", temperature=0.0
+        )
+        answers = _parse_batch_verdicts(response)
+
+        confirmations: List[Optional[str]] = []
+        for idx, item in enumerate(items, 1):
+            if idx in answers:
+                confirmations.append(answers[idx])
+                continue
+            prompt, response, confirmation = self._confirm_constraint_combined(item)
+            confirmations.append(confirmation)
+        return prompt, response, confirmations
 
     def get_response_body_input_parameter_mappings_with_constraint(
         self,
@@ -251,132 +755,123 @@ class ConstraintExtractor:
         print("Filtering response body constraints through input parameters...")
 
         # Load mappings from file
-        self.input_parameter_responsebody_mapping = json.load(
-            open(
-                f"{self.experiment_folder}/{self.service_name}/request_response_mappings.json",
-                "r",
-            )
+        self.input_parameter_responsebody_mapping = load_json_file(
+            f"{self.experiment_folder}/{self.service_name}/request_response_mappings.json"
         )
 
-        # Make a deep copy to avoid modifying the original
-        self.response_body_input_parameter_mappings_with_constraint = copy.deepcopy(
-            self.input_parameter_responsebody_mapping
+        # The mappings come from the unrestricted mapper, so they may refer to
+        # operations outside list_of_operations
+        self._parse_unlisted_operations(
+            mapping[0]
+            for attribute_mappings in self.input_parameter_responsebody_mapping.values()
+            for mappings in attribute_mappings.values()
+            for mapping in mappings
         )
 
+        # Mappings with a description, in their original order, with the verdict
+        # from an earlier check (None if not checked yet), and the prompt inputs
+        # for each distinct mapping that still needs an LLM verdict
+        candidates: List[Tuple[str, str, List[str], Optional[str]]] = []
+        pending: Dict[Tuple[str, ...], Tuple[str, str, str]] = {}
+
         # Iterate through schemas and their attributes
-        for schema in self.input_parameter_responsebody_mapping:
-            for attribute in self.input_parameter_responsebody_mapping[schema]:
+        for (
+            schema,
+            attribute_mappings,
+        ) in self.input_parameter_responsebody_mapping.items():
+            for attribute, mappings in attribute_mappings.items():
                 # Process each mapping for current attribute
-                for mapping in self.input_parameter_responsebody_mapping[schema][
-                    attribute
-                ]:
+                for mapping in mappings:
                     operation, part, corresponding_attribute = mapping
 
                     # Skip if attribute has no description
-                    if (
-                        "(description:"
-                        not in self.operations_containing_param_w_description[
-                            operation
-                        ][part][corresponding_attribute]
-                    ):
-                        self.response_body_input_parameter_mappings_with_constraint[
-                            schema
-                        ][attribute].remove(mapping)
-                        continue
-
-                    # Extract data type and description
-                    data_type = (
-                        self.operations_containing_param_w_description[operation][part][
-                            corresponding_attribute
-                        ]
-                        .split("(description: ")[0]
-                        .strip()
-                    )
-                    description = (
-                        self.operations_containing_param_w_description[operation][part][
-                            corresponding_attribute
-                        ]
-                        .split("(description: ")[-1][:-1]
-                        .strip()
+                    parsed = self._attr_parsed.get(
+                        (operation, part, corresponding_attribute)
                     )
+                    if parsed is None:
+                        continue
 
-                    # Check if mapping was previously processed
+                    # Use the verdict if mapping was previously processed
                     check_mapping = self.checkedMapping(mapping)
                     if check_mapping:
-                        confirmation_status = check_mapping.confirmation
-                        if confirmation_status != "yes":
-                            if (
-                                mapping
-                                in self.response_body_input_parameter_mappings_with_constraint[
-                                    schema
-                                ][
-                                    attribute
-                                ]
-                            ):
-                                self.response_body_input_parameter_mappings_with_constraint[
-                                    schema
-                                ][
-                                    attribute
-                                ].remove(
-                                    mapping
-                                )
-                        continue
-
-                    # Generate observation for description
-                    description_observation_prompt = (
-                        DESCRIPTION_OBSERVATION_PROMPT.format(
-                            attribute=corresponding_attribute,
-                            data_type=data_type,
-                            description=description,
+                        candidates.append(
+                            (schema, attribute, mapping, check_mapping.confirmation)
                         )
-                    )
-
-                    description_observation_response = llm_chat_completion(
-                        description_observation_prompt, model="gpt-4-turbo"
-                    )
-
-                    # Confirm if description implies constraints
-                    constraint_confirmation_prompt = CONSTRAINT_CONFIRMATION.format(
-                        attribute=corresponding_attribute,
-                        data_type=data_type,
-                        description=description,
-                        description_observation=description_observation_response,
-                    )
+                        continue
 
-                    constraint_confirmation_response = llm_chat_completion(
-                        constraint_confirmation_prompt, model="gpt-4-turbo"
+                    # Queue the mapping; identical mappings are only asked once.
+                    # Data type and description were parsed in filter_params_w_descr
+                    data_type, description = parsed
+                    candidates.append((schema, attribute, mapping, None))
+                    pending.setdefault(
+                        tuple(mapping),
+                        (corresponding_attribute, data_type, description),
                     )
 
-                    confirmation = extract_answer(constraint_confirmation_response)
-
-                    # Remove mapping if not confirmed
-                    if confirmation != "yes":
-                        if (
-                            mapping
-                            in self.response_body_input_parameter_mappings_with_constraint[
-                                schema
-                            ][
-                                attribute
-                            ]
-                        ):
-                            self.response_body_input_parameter_mappings_with_constraint[
-                                schema
-                            ][attribute].remove(mapping)
-
-                    # Track checked mappings using the CheckedMapping model
-                    checked_mapping = CheckedMapping(
-                        mapping=mapping, confirmation=confirmation
+        # Ask the LLM about all new mappings concurrently, one combined
+        # observation and confirmation call per mapping. Each verdict is
+        # recorded and journaled as it arrives, and the journal is consolidated
+        # into the checkpoint file once at the end
+        keys = list(pending)
+        confirmations: Dict[Tuple[str, ...], str] = {}
+        journal = None
+        if self.save_and_load and keys:
+            journal = open(
+                f"{self.mappings_checked_save_path}.jsonl",
+                "ab",
+                buffering=1 << 16,
+            )
+        unflushed = 0
+        last_flush = time.monotonic()
+
+        try:
+            for index, confirmation in iter_llm_tasks(
+                self._detect_constraint_combined, [pending[key] for key in keys]
+            ):
+                key = keys[index]
+                confirmations[key] = confirmation
+                checked_mapping = CheckedMappingRecord(key, confirmation)
+                self._add_checked_mapping(checked_mapping)
+
+                # Journal the checked mapping if saving is enabled
+                if journal is not None:
+                    journal.write(
+                        dumps_json(checked_mapping.to_list(), indent=False) + b"\n"
                     )
-                    self.mappings_checked.append(checked_mapping)
+                    unflushed += 1
+                    if (
+                        unflushed >= CHECKPOINT_FLUSH_EVERY
+                        or time.monotonic() - last_flush > CHECKPOINT_FLUSH_INTERVAL
+                    ):
+                        journal.flush()
+                        unflushed = 0
+                        last_flush = time.monotonic()
+        finally:
+            if journal is not None:
+                journal.flush()
+                os.fsync(journal.fileno())
+                journal.close()
+                # Convert the records to the expected format for backwards
+                # compatibility
+                consolidate_checkpoint(
+                    self.mappings_checked_save_path,
+                    [m.to_list() for m in self.mappings_checked],
+                )
 
-                    # Save checked mappings to file if enabled
-                    if self.save_and_load:
-                        # Convert CheckedMapping objects to the expected format for backwards compatibility
-                        mappings_to_save = [
-                            [m.mapping, m.confirmation] for m in self.mappings_checked
-                        ]
-                        with open(self.mappings_checked_save_path, "w") as file:
-                            json.dump(mappings_to_save, file)
+        # Keep only confirmed mappings, under every schema and attribute
+        self.response_body_input_parameter_mappings_with_constraint = {
+            schema: {attribute: [] for attribute in attribute_mappings}
+            for schema, attribute_mappings in (
+                self.input_parameter_responsebody_mapping.items()
+            )
+        }
+        for schema, attribute, mapping, confirmation in candidates:
+            if confirmation is None:
+                confirmation = confirmations[tuple(mapping)]
+            if confirmation == "yes":
+                self.response_body_input_parameter_mappings_with_constraint[schema][
+                    attribute
+                ].append(mapping)
 
         return self.response_body_input_parameter_mappings_with_constraint
 
@@ -392,10 +887,7 @@ class ConstraintExtractor:
         Returns:
             The found constraint if it exists, None otherwise
         """
-        for checked_attribute in self.found_responsebody_constraints:
-            if checking_attribute == checked_attribute[0]:
-                return checked_attribute
-        return None
+        return self._found_responsebody_constraints_idx.get(tuple(checking_attribute))
 
     def foundConstraintInputParameter(
         self, checking_parameter: List[Any]
@@ -409,10 +901,7 @@ class ConstraintExtractor:
         Returns:
             The found constraint if it exists, None otherwise
         """
-        for checked_parameter in self.input_parameters_checked:
-            if checking_parameter == checked_parameter[0]:
-                return checked_parameter
-        return None
+        return self._input_parameters_checked_idx.get(tuple(checking_parameter))
 
     def get_input_parameter_constraints(
         self, outfile: Optional[str] = None
@@ -436,109 +925,140 @@ class ConstraintExtractor:
         progress_size = len(self.list_of_operations) * 2
         completed = 0
 
-        # Process each operation
-        for operation in self.list_of_operations:
-            raw_constraints[operation] = {
-                "parameters": {},
-                "requestBody": {},
-            }
-
-            # Process parameters and requestBody separately
-            parts = ["parameters", "requestBody"]
-            for part in parts:
-                print(
-                    f"[{self.service_name}] progress: {round(completed/progress_size*100, 2)}"
-                )
-                completed += 1
-
-                # Get specification for current part
-                specification = self.simplified_openapi.get(operation, {}).get(part, {})
-                operation_path = operation.split("-")[1]
-                operation_name = operation.split("-")[0]
-                full_specifications = (
+        # Checked parameters are appended to a journal while the loop runs and
+        # consolidated into the checkpoint file once at the end
+        journal = None
+        if self.save_and_load:
+            journal = open(
+                f"{self.input_parameters_checked_save_path}.jsonl",
+                "ab",
+                buffering=1 << 16,
+            )
+        unflushed = 0
+        last_flush = time.monotonic()
+
+        try:
+            # Process each operation
+            for operation in self.list_of_operations:
+                raw_constraints[operation] = {
+                    "parameters": {},
+                    "requestBody": {},
+                }
+
+                # Resolve the operation in the full specification once, rather
+                # than once per part
+                operation_name, _, operation_path = operation.partition("-")
+                operation_spec = (
                     self.openapi_spec.get("paths", {})
                     .get(operation_path, {})
                     .get(operation_name, {})
-                    .get(part, {})
                 )
+                simplified_operation = self.simplified_openapi.get(operation, {})
 
-                if not specification:
-                    continue
+                # Process parameters and requestBody separately
+                parts = ["parameters", "requestBody"]
+                for part in parts:
+                    print(
+                        f"[{self.service_name}] progress: {round(completed/progress_size*100, 2)}"
+                    )
+                    completed += 1
 
-                # Process each parameter in the current part
-                for parameter in specification:
-                    parameter_name = parameter
+                    # Get specification for current part
+                    specification = simplified_operation.get(part, {})
+                    full_specifications = operation_spec.get(part, {})
 
-                    # Extract data type and description
-                    data_type = (
-                        specification[parameter_name].split("(description: ")[0].strip()
-                    )
-                    description = (
-                        specification[parameter_name]
-                        .split("(description: ")[-1][:-1]
-                        .strip()
-                    )
+                    if not specification:
+                        continue
 
-                    # Get parameter specification
-                    param_spec = {}
+                    part_constraints = raw_constraints[operation][part]
+
+                    # Index the full parameter specifications by name, keeping
+                    # the first specification of each name
+                    spec_index: Dict[str, Dict[str, Any]] = {}
                     for spec in full_specifications:
-                        if isinstance(spec, str):
-                            continue
-                        if spec.get("name", "") == parameter_name:
-                            param_spec = spec
-                            break
+                        if isinstance(spec, dict) and "name" in spec:
+                            spec_index.setdefault(spec["name"], spec)
 
-                    param_schema = param_spec.get("schema", {})
-                    if param_schema:
-                        param_schema = json.dumps(param_schema)
+                    # Process each parameter in the current part
+                    for parameter_name, parameter_spec in specification.items():
 
-                    checking_parameter = [parameter_name, specification[parameter_name]]
+                        # Extract data type and description
+                        data_type, description = _parse_desc(parameter_spec) or (
+                            parameter_spec.strip(),
+                            "",
+                        )
 
-                    # Check if parameter was previously processed
-                    checked_parameter = self.foundConstraintInputParameter(
-                        checking_parameter
-                    )
-                    if checked_parameter:
-                        confirmation_status = checked_parameter[1]
-                        if confirmation_status == "yes":
-                            if parameter_name not in raw_constraints[operation][part]:
-                                raw_constraints[operation][part][parameter] = (
-                                    specification[parameter_name]
-                                )
-                        continue
+                        # Get parameter specification
+                        param_spec = spec_index.get(parameter_name, {})
+                        param_schema = param_spec.get("schema", {})
+                        if param_schema:
+                            param_schema = json.dumps(param_schema)
 
-                    # Analyze description for constraints
-                    description_observation_prompt = (
-                        DESCRIPTION_OBSERVATION_PROMPT.format(
-                            attribute=parameter_name,
-                            data_type=data_type,
-                            description=description,
-                            param_schema=param_schema,
-                        )
-                    )
-                    print(description_observation_prompt)
-                    print(
-                        f"Observing operation: {operation} - part: {part} - parameter: {parameter_name}"
-                    )
+                        checking_parameter = [parameter_name, parameter_spec]
 
-                    # For demonstration purposes, we're setting confirmation to "yes"
-                    # In practice, this should call GPTChatCompletion and evaluate the response
-                    confirmation = "yes"
+                        # Check if parameter was previously processed
+                        checked_parameter = self.foundConstraintInputParameter(
+                            checking_parameter
+                        )
+                        if checked_parameter:
+                            confirmation_status = checked_parameter[1]
+                            if confirmation_status == "yes":
+                                if parameter_name not in part_constraints:
+                                    part_constraints[parameter_name] = parameter_spec
+                            continue
 
-                    if confirmation == "yes":
-                        if parameter_name not in raw_constraints[operation][part]:
-                            raw_constraints[operation][part][parameter_name] = (
-                                specification[parameter_name]
+                        # Analyze description for constraints
+                        description_observation_prompt = (
+                            _render_description_observation(
+                                attribute=parameter_name,
+                                data_type=data_type,
+                                description=description,
+                                param_schema=param_schema,
                             )
+                        )
+                        print(description_observation_prompt)
+                        print(
+                            f"Observing operation: {operation} - part: {part} - parameter: {parameter_name}"
+                        )
 
-                    self.input_parameters_checked.append(
-                        [checking_parameter, confirmation]
-                    )
+                        # For demonstration purposes, we're setting confirmation to "yes"
+                        # In practice, this should call GPTChatCompletion and evaluate the response
+                        confirmation = "yes"
 
-                    # Save checked parameters to file if enabled
-                    if self.save_and_load:
-                        with open(self.input_parameters_checked_save_path, "w") as file:
-                            json.dump(self.input_parameters_checked, file)
+                        if confirmation == "yes":
+                            if parameter_name not in part_constraints:
+                                part_constraints[parameter_name] = parameter_spec
+
+                        self._add_checked_input_parameter(
+                            [checking_parameter, confirmation]
+                        )
+
+                        # Journal the checked parameter if saving is enabled
+                        if journal is not None:
+                            journal.write(
+                                dumps_json(
+                                    [checking_parameter, confirmation], indent=False
+                                )
+                                + b"\n"
+                            )
+                            unflushed += 1
+                            if (
+                                unflushed >= CHECKPOINT_FLUSH_EVERY
+                                or time.monotonic() - last_flush
+                                > CHECKPOINT_FLUSH_INTERVAL
+                            ):
+                                journal.flush()
+                                unflushed = 0
+                                last_flush = time.monotonic()
+        finally:
+            if journal is not None:
+                journal.flush()
+                os.fsync(journal.fileno())
+                journal.close()
+                consolidate_checkpoint(
+                    self.input_parameters_checked_save_path,
+                    self.input_parameters_checked,
+                )
 
         # Store the raw constraints for backwards compatibility
         self.input_parameter_constraints = raw_constraints
@@ -548,8 +1068,7 @@ class ConstraintExtractor:
 
         # Save constraints to file if specified
         if outfile is not None:
-            with open(outfile, "w") as file:
-                json.dump(raw_constraints, file, indent=2)
+            dump_json_file(raw_constraints, outfile, atomic=True)
 
         return constraints_model
 
@@ -574,65 +1093,35 @@ class ConstraintExtractor:
         print("Inferring constraints inside response body...")
         raw_constraints: Dict[str, Dict[str, str]] = {}
 
-        # Get simplified schemas with attribute descriptions
-        self.simplified_schemas = get_simplified_schema(self.openapi_spec)
-
-        # Extract all schemas specified in response bodies
-        response_body_specified_schemas = []
-        operations = extract_operations(self.openapi_spec)
-
-        for operation in operations:
-            _, relevant_schemas_in_response = (
-                get_relevent_response_schemas_of_operation(self.openapi_spec, operation)
-            )
-            response_body_specified_schemas.extend(relevant_schemas_in_response)
-
-        response_body_specified_schemas = list(set(response_body_specified_schemas))
+        # Get all schemas specified in response bodies, with simplified
+        # attribute descriptions in self.simplified_schemas
+        response_body_specified_schemas = self._get_response_body_schemas()
 
         self.found_responsebody_constraints = []
+        self._found_responsebody_constraints_idx = {}
         print(f"Schemas: {response_body_specified_schemas}")
 
         # Use selected schemas if provided
         if selected_schemas is not None:
             response_body_specified_schemas = selected_schemas
 
+        # Attributes that still need an LLM verdict, and the prompt inputs for
+        # each distinct attribute
+        unchecked_attributes: List[Tuple[str, str, str, Tuple[str, str]]] = []
+        pending: Dict[Tuple[str, str], Tuple[str, str, str]] = {}
+
         # Process each schema
         for schema in response_body_specified_schemas:
             raw_constraints[schema] = {}
 
-            attributes = self.simplified_schemas.get(schema, {})
-            if not attributes:
-                continue
-
-            # Process each attribute in the schema
-            for parameter_name in attributes:
-                # Skip attributes without descriptions
-                if (
-                    "(description:"
-                    not in self.simplified_schemas[schema][parameter_name]
-                ):
-                    continue
-
-                # Extract data type and description
-                data_type = (
-                    self.simplified_schemas[schema][parameter_name]
-                    .split("(description: ")[0]
-                    .strip()
-                )
-
-                description = (
-                    self.simplified_schemas[schema][parameter_name]
-                    .split("(description: ")[-1][:-1]
-                    .strip()
-                )
-
-                if not description:
-                    continue
-
-                checking_attribute = [
-                    parameter_name,
-                    self.simplified_schemas[schema][parameter_name],
-                ]
+            # Process each attribute with a description in the schema
+            for (
+                parameter_name,
+                attribute_spec,
+                data_type,
+                description,
+            ) in self._described_attributes(schema):
+                checking_attribute = [parameter_name, attribute_spec]
 
                 # Check if attribute was previously processed
                 checked_attribute = self.foundConstraintResponseBody(checking_attribute)
@@ -643,32 +1132,49 @@ class ConstraintExtractor:
                             raw_constraints[schema][parameter_name] = description
                     continue
 
-                # Generate naive prompt to check for constraints
-                constraint_confirmation_prompt = (
-                    NAIVE_CONSTRAINT_DETECTION_PROMPT.format(
-                        attribute=parameter_name,
-                        data_type=data_type,
-                        description=description,
-                    )
-                )
-
-                constraint_confirmation_response = llm_chat_completion(
-                    constraint_confirmation_prompt, model="gpt-4-turbo"
-                )
-
-                confirmation = extract_answer(constraint_confirmation_response)
+                # Queue the attribute; identical attributes are only asked once
+                key = tuple(checking_attribute)
+                unchecked_attributes.append((schema, parameter_name, description, key))
+                pending.setdefault(key, (parameter_name, data_type, description))
+
+        # Pack the new attributes into prompts of several attributes each and
+        # send the batches concurrently
+        keys = list(pending)
+        batches = batch_by_tokens(
+            keys,
+            lambda key: _render_naive_detection_batch_item(
+                idx=0,
+                attribute=pending[key][0],
+                data_type=pending[key][1],
+                description=pending[key][2],
+            ),
+            max_tokens=NAIVE_BATCH_MAX_PROMPT_TOKENS,
+            max_items=NAIVE_BATCH_MAX_ATTRIBUTES,
+        )
+        batch_answers = run_llm_tasks(
+            self._detect_constraints_naive_batch,
+            [[pending[key] for key in batch] for batch in batches],
+        )
+        confirmations = {
+            key: answer
+            for batch, answers in zip(batches, batch_answers)
+            for key, answer in zip(batch, answers)
+        }
+
+        for schema, parameter_name, description, key in unchecked_attributes:
+            confirmation = confirmations[key]
+
+            # Add constraint if confirmed
+            if confirmation == "yes":
+                if parameter_name not in raw_constraints[schema]:
+                    raw_constraints[schema][parameter_name] = description
+
+            print(
+                f"Schema: {schema} - attribute: {parameter_name} - Confirmation: {confirmation}"
+            )
 
-                # Add constraint if confirmed
-                if confirmation == "yes":
-                    if parameter_name not in raw_constraints[schema]:
-                        raw_constraints[schema][parameter_name] = description
-
-                print(
-                    f"Schema: {schema} - attribute: {parameter_name} - Confirmation: {confirmation}"
-                )
-                self.found_responsebody_constraints.append(
-                    [checking_attribute, confirmation]
-                )
+        for key in keys:
+            self._add_found_responsebody_constraint([list(key), confirmations[key]])
 
         # Store raw_constraints for backward compatibility
         self.inside_response_body_constraints = raw_constraints
@@ -678,8 +1184,7 @@ class ConstraintExtractor:
 
         # Save constraints to file if specified
         if outfile is not None:
-            with open(outfile, "w") as file:
-                json.dump(raw_constraints, file, indent=2)
+            dump_json_file(raw_constraints, outfile, atomic=True)
 
         return constraints_model
 
@@ -691,8 +1196,9 @@ class ConstraintExtractor:
         """
         Infer constraints inside response body with a more sophisticated approach.
 
-        This method uses a two-step process with observation and confirmation prompts
-        to identify constraints in response body attribute descriptions.
+        This method uses observation and confirmation prompts to identify
+        constraints in response body attribute descriptions, asking about
+        several attributes per prompt.
 
         Args:
             selected_schemas: Optional list of schemas to process; if None, all relevant schemas are processed
@@ -706,30 +1212,27 @@ class ConstraintExtractor:
 
         # Load existing constraints if outfile exists
         if outfile and os.path.exists(outfile):
-            raw_constraints = json.load(open(outfile, "r"))
+            raw_constraints = load_json_file(outfile)
 
-        # Get simplified schemas with attribute descriptions
-        self.simplified_schemas = get_simplified_schema(self.openapi_spec)
-
-        # Extract all schemas specified in response bodies
-        response_body_specified_schemas = []
-        operations = extract_operations(self.openapi_spec)
-
-        for operation in operations:
-            _, relevant_schemas_in_response = (
-                get_relevent_response_schemas_of_operation(self.openapi_spec, operation)
-            )
-            response_body_specified_schemas.extend(relevant_schemas_in_response)
-
-        response_body_specified_schemas = list(set(response_body_specified_schemas))
+        # Get all schemas specified in response bodies, with simplified
+        # attribute descriptions in self.simplified_schemas
+        response_body_specified_schemas = self._get_response_body_schemas()
 
         self.found_responsebody_constraints = []
+        self._found_responsebody_constraints_idx = {}
         print(f"Schemas: {response_body_specified_schemas}")
 
         # Use selected schemas if provided
         if selected_schemas is not None:
             response_body_specified_schemas = selected_schemas
 
+        # Attributes that still need a verdict, the description key each
+        # verdict is looked up under, and the prompt inputs for each
+        # description not confirmed before
+        unchecked_attributes: List[Tuple[str, str, str, Tuple[str, str]]] = []
+        attribute_desc_keys: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        pending: Dict[Tuple[str, str], Tuple[str, str, str]] = {}
+
         # Process each schema
         for schema in response_body_specified_schemas:
             # Skip schemas that are already processed (except for ContentRating)
@@ -739,44 +1242,19 @@ class ConstraintExtractor:
             else:
                 raw_constraints[schema] = {}
 
-            attributes = self.simplified_schemas.get(schema, {})
-            if not attributes:
-                continue
-
-            # Process each attribute in the schema
-            for parameter_name in attributes:
+            # Process each attribute with a description in the schema
+            for (
+                parameter_name,
+                attribute_spec,
+                data_type,
+                description,
+            ) in self._described_attributes(schema):
                 # Skip attributes already processed for ContentRating
                 if schema == "ContentRating":
                     if parameter_name in raw_constraints[schema]:
                         continue
 
-                # Skip attributes without descriptions
-                if (
-                    "(description:"
-                    not in self.simplified_schemas[schema][parameter_name]
-                ):
-                    continue
-
-                # Extract data type and description
-                data_type = (
-                    self.simplified_schemas[schema][parameter_name]
-                    .split("(description: ")[0]
-                    .strip()
-                )
-
-                description = (
-                    self.simplified_schemas[schema][parameter_name]
-                    .split("(description: ")[-1][:-1]
-                    .strip()
-                )
-
-                if not description:
-                    continue
-
-                checking_attribute = [
-                    parameter_name,
-                    self.simplified_schemas[schema][parameter_name],
-                ]
+                checking_attribute = [parameter_name, attribute_spec]
 
                 # Check if attribute was previously processed
                 checked_attribute = self.foundConstraintResponseBody(checking_attribute)
@@ -787,57 +1265,65 @@ class ConstraintExtractor:
                             raw_constraints[schema][parameter_name] = description
                     continue
 
-                # Generate observation for the description
-                description_observation_prompt = DESCRIPTION_OBSERVATION_PROMPT.format(
-                    attribute=parameter_name,
-                    data_type=data_type,
-                    description=description,
-                    param_schema="",
-                )
-                print(f"Observing schema: {schema} - attribute: {parameter_name}")
+                # Queue the attribute; attributes sharing a data type and
+                # description are only asked once, and reuse earlier verdicts
+                key = tuple(checking_attribute)
+                desc_key = (data_type.strip().lower(), description.strip().lower())
+                unchecked_attributes.append((schema, parameter_name, description, key))
+                attribute_desc_keys[key] = desc_key
+                if desc_key not in self._desc_cache:
+                    pending.setdefault(
+                        desc_key, (parameter_name, data_type, description)
+                    )
 
-                description_observation_response = llm_chat_completion(
-                    description_observation_prompt, model="gpt-4-turbo"
-                )
+        # Pack the new descriptions into prompts of several attributes each and
+        # observe and confirm the batches concurrently
+        desc_keys = list(pending)
+        print(f"Checking {len(desc_keys)} descriptions for constraints...")
+        batches = batch_by_tokens(
+            desc_keys,
+            lambda desc_key: _render_naive_detection_batch_item(
+                idx=0,
+                attribute=pending[desc_key][0],
+                data_type=pending[desc_key][1],
+                description=pending[desc_key][2],
+            ),
+            max_tokens=CONFIRMATION_BATCH_MAX_PROMPT_TOKENS,
+            max_items=CONFIRMATION_BATCH_MAX_ATTRIBUTES,
+        )
+        batch_results = run_llm_tasks(
+            self._confirm_constraints_batch,
+            [[pending[desc_key] for desc_key in batch] for batch in batches],
+        )
+        for batch, (_, _, confirmations) in zip(batches, batch_results):
+            self._desc_cache.update(zip(batch, confirmations))
 
-                # Save prompts and responses for debugging
-                with open("prompt.txt", "w", encoding="utf-16") as file:
-                    file.write(f"PROMPT: {description_observation_prompt}\n")
-                    file.write(f"---\n")
-                    file.write(f"RESPONSE: {description_observation_response}\n")
-
-                # Confirm if description implies constraints
-                constraint_confirmation_prompt = CONSTRAINT_CONFIRMATION.format(
-                    attribute=parameter_name,
-                    data_type=data_type,
-                    description_observation=description_observation_response,
-                    description=description,
-                    param_schema="",
-                )
+        # Save the last prompt and response for debugging
+        if self.config.debug_prompts and batch_results:
+            constraint_confirmation_prompt, constraint_confirmation_response, _ = (
+                batch_results[-1]
+            )
+            with open("prompt.txt", "w", encoding="utf-16") as file:
+                file.write(f"PROMPT: {constraint_confirmation_prompt}\n")
+                file.write(f"---\n")
+                file.write(f"RESPONSE: {constraint_confirmation_response}\n")
 
-                print(f"Confirming schema: {schema} - attribute: {parameter_name}")
-                constraint_confirmation_response = llm_chat_completion(
-                    constraint_confirmation_prompt, model="gpt-4-turbo"
-                )
-                confirmation = extract_answer(constraint_confirmation_response)
+        for schema, parameter_name, description, key in unchecked_attributes:
+            confirmation = self._desc_cache[attribute_desc_keys[key]]
 
-                # Save prompts and responses for debugging
-                with open("prompt.txt", "a", encoding="utf-16") as file:
-                    file.write(f"PROMPT: {constraint_confirmation_prompt}\n")
-                    file.write(f"---\n")
-                    file.write(f"RESPONSE: {constraint_confirmation_response}\n")
+            # Add constraint if confirmed
+            if confirmation == "yes":
+                if parameter_name not in raw_constraints[schema]:
+                    raw_constraints[schema][parameter_name] = description
 
-                # Add constraint if confirmed
-                if confirmation == "yes":
-                    if parameter_name not in raw_constraints[schema]:
-                        raw_constraints[schema][parameter_name] = description
+            print(
+                f"Schema: {schema} - attribute: {parameter_name} - Confirmation: {confirmation}"
+            )
 
-                print(
-                    f"Schema: {schema} - attribute: {parameter_name} - Confirmation: {confirmation}"
-                )
-                self.found_responsebody_constraints.append(
-                    [checking_attribute, confirmation]
-                )
+        for key, desc_key in attribute_desc_keys.items():
+            self._add_found_responsebody_constraint(
+                [list(key), self._desc_cache[desc_key]]
+            )
 
         # Store raw_constraints for backward compatibility
         self.inside_response_body_constraints = raw_constraints
@@ -847,8 +1333,7 @@ class ConstraintExtractor:
 
         # Save constraints to file if specified
         if outfile is not None:
-            with open(outfile, "w", encoding="utf-16") as file:
-                json.dump(raw_constraints, file, indent=2)
+            dump_json_file(raw_constraints, outfile, atomic=True)
 
         return constraints_model
 
@@ -10,9 +10,12 @@ The data models created help in understanding the relationships between differen
 in an API and can be used for generating test cases, validation rules, or documentation.
 """
 
+import itertools
 import json
 import os
-from typing import Dict, List, Optional, Set, Any
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Any, Tuple
 
 
 from utils.openapi_utils import (
@@ -21,7 +24,12 @@ from utils.openapi_utils import (
     get_simplified_schema,
     get_relevant_schemas_of_operation,
 )
-from utils.llm_utils import llm_chat_completion
+from utils.llm_utils import (
+    llm_chat_completion_with_retry,
+    run_llm_tasks,
+    set_storage_path,
+)
+from utils.json_utils import dump_json_file, dumps_json, load_json_file
 from utils.text_extraction import extract_data_model_key_pairs
 from constant import FIND_SCHEMA_KEYS, DATA_MODEL_PROMPT
 
@@ -32,6 +40,17 @@ from models.data_building_models import (
     SchemaRelationship,
 )
 
+# Splits identifiers such as "userId", "user_id" or "URLPath" into words
+_NAME_TOKEN_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+")
+
+# Words too common in attribute names to suggest that two schemas are related,
+# including generic field names that nearly every schema has
+_NAME_STOPWORDS = frozenset(
+    {"a", "an", "the", "of", "by", "at", "in", "is", "to"}
+    | {"id", "name", "type", "description", "status", "url", "created", "updated"}
+    | {"date", "time", "count", "value", "data", "object", "metadata"}
+)
+
 
 class DataModelBuilder:
     """
@@ -56,6 +75,8 @@ class DataModelBuilder:
         openapi_path: str,
         ks_project_path: Optional[str] = None,
         data_types_to_keep: Optional[Set[str]] = None,
+        openapi_spec: Optional[Dict[str, Any]] = None,
+        prune_schema_pairs: bool = False,
     ) -> None:
         """
         Initialize the DataModelBuilder.
@@ -65,16 +86,19 @@ class DataModelBuilder:
             ks_project_path: Path to the KS project directory containing operation sequences
             data_types_to_keep: Set of data types to keep during attribute filtering
                                (defaults to "integer" and "string")
+            openapi_spec: Already loaded specification of openapi_path; loaded from the file if None
+            prune_schema_pairs: Whether to skip schema pairs whose schema and attribute names share no uncommon word
         """
         # Create configuration
         self.config = DataModelBuilderConfig(
             openapi_path=openapi_path,
             ks_project_path=ks_project_path,
             data_types_to_keep=data_types_to_keep or {"integer", "string"},
-        )
+            prune_schema_pairs=prune_schema_pairs,
+        ).verify()
 
         # Load OpenAPI specification
-        self.openapi_spec: Dict[str, Any] = load_openapi(openapi_path)
+        self.openapi_spec: Dict[str, Any] = openapi_spec or load_openapi(openapi_path)
         self.simplified_openapi: Dict[str, Any] = get_operation_params(
             self.openapi_spec, get_description=True, get_response_body=False
         )
@@ -91,6 +115,9 @@ class DataModelBuilder:
         # Initialize data model
         self.data_model = DataModel()
 
+        # Compact JSON of each analyzed schema, shared by the LLM prompts
+        self._serialized_schemas: Dict[str, str] = {}
+
         # Execute the building process
         self.initialize()
         self.filter_attributes()
@@ -116,8 +143,7 @@ class DataModelBuilder:
             )
 
             try:
-                with open(odg_output_dir, "r") as f:
-                    self.operation_sequences = json.load(f)
+                self.operation_sequences = load_json_file(odg_output_dir)
             except FileNotFoundError:
                 print(
                     f"Warning: Operation sequences file not found at {odg_output_dir}"
@@ -137,31 +163,29 @@ class DataModelBuilder:
         the data types specified in config.data_types_to_keep (default: integer, string).
         This helps focus the analysis on attributes that are more likely to be key fields.
         """
-        for schema_name, schema_attrs in list(self.simplified_schemas.items()):
-            if not schema_attrs:  # Skip empty schemas
-                continue
-
-            # Track attributes to remove
-            attrs_to_remove: List[str] = []
-
-            for attr_name, attr_value in schema_attrs.items():
-                if isinstance(attr_value, str):
-                    # Check if the attribute has one of the target data types
-                    has_target_type = False
-                    for data_type in self.config.data_types_to_keep:
-                        if data_type in attr_value:
-                            has_target_type = True
-                            break
-
-                    if not has_target_type:
-                        attrs_to_remove.append(attr_name)
-                else:
-                    # Non-string attributes should be removed
-                    attrs_to_remove.append(attr_name)
+        # One regex scan per attribute value instead of one substring test per
+        # data type; an empty set of data types keeps no attributes
+        data_types = sorted(self.config.data_types_to_keep)
+        data_type_pattern = (
+            re.compile("|".join(map(re.escape, data_types))) if data_types else None
+        )
 
-            # Remove unwanted attributes
-            for attr_name in attrs_to_remove:
-                schema_attrs.pop(attr_name, None)
+        # Keep only string attributes with one of the target data types;
+        # empty schemas are kept as they are
+        self.simplified_schemas = {
+            schema_name: (
+                {
+                    attr_name: attr_value
+                    for attr_name, attr_value in schema_attrs.items()
+                    if isinstance(attr_value, str)
+                    and data_type_pattern is not None
+                    and data_type_pattern.search(attr_value)
+                }
+                if schema_attrs
+                else schema_attrs
+            )
+            for schema_name, schema_attrs in self.simplified_schemas.items()
+        }
 
     def building_data_model(self) -> None:
         """
@@ -175,116 +199,166 @@ class DataModelBuilder:
         The resulting data model contains information about schema keys and
         relationships between schemas.
         """
-        # Initialize data model structure
-        self.data_model = DataModel()
+        # Collected data model contents; the DataModel itself is frozen
+        schema_keys: Dict[str, List[str]] = {}
+        schema_relationships: List[SchemaRelationship] = []
+
+        # The same operation recurs across many operation sequences, so its
+        # relevant schemas are only resolved once
+        @lru_cache(maxsize=None)
+        def relevant_schemas_of(operation: str) -> Tuple[str, ...]:
+            _, relevant_schemas = get_relevant_schemas_of_operation(
+                operation, self.openapi_spec
+            )
+            return tuple(relevant_schemas)
 
         # Collect relevant schemas from all operations
-        schemas: List[str] = []
+        schemas: Set[str] = set()
         for operation in self.simplified_openapi:
             # Get schemas directly referenced in the operation
-            _, relevant_schemas = get_relevant_schemas_of_operation(
-                operation, self.openapi_spec
-            )
-            schemas.extend(relevant_schemas)
+            schemas.update(relevant_schemas_of(operation))
 
             # Get schemas referenced in dependent operations
             sequences = self.operation_sequences.get(operation, [])
             for sequence in sequences:
                 for child_operation in sequence:
-                    _, child_schemas = get_relevant_schemas_of_operation(
-                        child_operation, self.openapi_spec
-                    )
-                    schemas.extend(child_schemas)
+                    schemas.update(relevant_schemas_of(child_operation))
+
+        # Sort for a deterministic analysis order, so prompts and their cached
+        # responses are stable across runs
+        unique_schemas = sorted(schemas)
+
+        # Schemas with attributes left after filtering
+        analyzable_schemas = [
+            schema for schema in unique_schemas if self.simplified_schemas.get(schema)
+        ]
+
+        # Serialize each schema once for the key and pair prompts; compact
+        # separators also keep the prompts shorter
+        self._serialized_schemas = {
+            schema: dumps_json(self.simplified_schemas[schema], indent=False).decode(
+                "utf-8"
+            )
+            for schema in analyzable_schemas
+        }
 
-        # Remove duplicates
-        unique_schemas = list(set(schemas))
+        # Find key fields for each schema, asking about all schemas concurrently
+        schema_key_responses = run_llm_tasks(self._find_schema_keys, analyzable_schemas)
+        for schema, response in zip(analyzable_schemas, schema_key_responses):
+            if not response:
+                continue
 
-        # Find and store key fields for each schema
-        for schema in unique_schemas:
-            if (
-                schema not in self.simplified_schemas
-                or not self.simplified_schemas[schema]
-            ):
+            # Parse the distinct keys from the response
+            candidate_keys = {key.strip() for key in response.split(",")}
+            candidate_keys.discard("")
+            if not candidate_keys:
                 continue
 
-            # Generate prompt to find schema keys
-            prompt = FIND_SCHEMA_KEYS.format(
-                schema_specification=json.dumps(self.simplified_schemas[schema])
-            )
+            # Keep the keys that exist in the schema, in schema order
+            valid_keys = [
+                key for key in self.simplified_schemas[schema] if key in candidate_keys
+            ]
+
+            if valid_keys:
+                schema_keys[schema] = valid_keys
+
+        # Analyze relationships between each pair of schemas concurrently; the
+        # pairs are distinct, so no pair is analyzed twice
+        schema_pairs = list(itertools.combinations(analyzable_schemas, 2))
+        if self.config.prune_schema_pairs:
+            # Only ask about schemas whose names share an uncommon word, since a
+            # field mapping needs a joinable field
+            name_tokens = {
+                schema: self._schema_name_tokens(schema)
+                for schema in analyzable_schemas
+            }
+            schema_pairs = [
+                (schema1, schema2)
+                for schema1, schema2 in schema_pairs
+                if not name_tokens[schema1].isdisjoint(name_tokens[schema2])
+            ]
+        data_model_responses = run_llm_tasks(self._find_schema_pair_keys, schema_pairs)
+        for (schema1, schema2), data_model_response in zip(
+            schema_pairs, data_model_responses
+        ):
+            # Extract field mappings from the response
+            if data_model_response:
+                key_pairs = extract_data_model_key_pairs(data_model_response)
+
+                if key_pairs:
+                    # Create schema relationship
+                    field_mappings = [
+                        SchemaKeyPair(source_field=src, target_field=tgt)
+                        for src, tgt in key_pairs
+                    ]
+
+                    schema_relationships.append(
+                        SchemaRelationship(
+                            schema_pair=(schema1, schema2),
+                            field_mappings=field_mappings,
+                        )
+                    )
 
-            # Get response from GPT
-            response = llm_chat_completion(prompt, system="")
-
-            if response:
-                # Parse the keys from the response
-                keys = [key.strip() for key in response.split(",")]
-                # Validate that the keys exist in the schema
-                valid_keys = [
-                    key for key in keys if key in self.simplified_schemas[schema]
-                ]
-
-                if valid_keys:
-                    self.data_model.schema_keys[schema] = valid_keys
-
-        # Analyze relationships between schemas
-        for i in range(len(unique_schemas)):
-            for j in range(i + 1, len(unique_schemas)):
-                schema1 = unique_schemas[i]
-                schema2 = unique_schemas[j]
-
-                # Skip if either schema has no attributes
-                if (
-                    schema1 not in self.simplified_schemas
-                    or schema2 not in self.simplified_schemas
-                    or not self.simplified_schemas[schema1]
-                    or not self.simplified_schemas[schema2]
-                ):
-                    continue
-
-                # Check if this schema pair is already analyzed
-                pair_exists = False
-                for relationship in self.data_model.schema_relationships:
-                    if relationship.schema_pair == (
-                        schema1,
-                        schema2,
-                    ) or relationship.schema_pair == (schema2, schema1):
-                        pair_exists = True
-                        break
-
-                if pair_exists:
-                    continue
-
-                # Format schemas for the prompt
-                schema1_str = f"{schema1}\n{self.simplified_schemas[schema1]}"
-                schema2_str = f"{schema2}\n{self.simplified_schemas[schema2]}"
-
-                # Generate prompt to find field mappings
-                data_model_prompt = DATA_MODEL_PROMPT.format(
-                    schema_1=schema1_str, schema_2=schema2_str
-                )
+        self.data_model = DataModel(
+            schema_keys=schema_keys, schema_relationships=schema_relationships
+        )
 
-                # Get response from GPT
-                data_model_response = llm_chat_completion(
-                    data_model_prompt, system="", temperature=0.0
-                )
+    def _schema_name_tokens(self, schema: str) -> Set[str]:
+        """
+        Get the lowercased words of a schema's name and attribute names.
 
-                # Extract field mappings from the response
-                if data_model_response:
-                    key_pairs = extract_data_model_key_pairs(data_model_response)
-
-                    if key_pairs:
-                        # Create schema relationship
-                        field_mappings = [
-                            SchemaKeyPair(source_field=src, target_field=tgt)
-                            for src, tgt in key_pairs
-                        ]
-
-                        self.data_model.schema_relationships.append(
-                            SchemaRelationship(
-                                schema_pair=(schema1, schema2),
-                                field_mappings=field_mappings,
-                            )
-                        )
+        Args:
+            schema: Name of the schema
+
+        Returns:
+            Set of words, without stopwords and generic field names
+        """
+        names = [schema, *self.simplified_schemas[schema]]
+        tokens = {
+            token.lower() for name in names for token in _NAME_TOKEN_RE.findall(name)
+        }
+        return tokens - _NAME_STOPWORDS
+
+    def _find_schema_keys(self, schema: str) -> Optional[str]:
+        """
+        Ask the LLM for the key fields of a schema.
+
+        Args:
+            schema: Name of the schema
+
+        Returns:
+            Comma-separated key fields, or None if the request failed
+        """
+        # Generate prompt to find schema keys
+        prompt = FIND_SCHEMA_KEYS.format(
+            schema_specification=self._serialized_schemas[schema]
+        )
+        return llm_chat_completion_with_retry(prompt, system="")
+
+    def _find_schema_pair_keys(self, schema_pair: Tuple[str, str]) -> Optional[str]:
+        """
+        Ask the LLM for the fields mapping one schema to another.
+
+        Args:
+            schema_pair: Names of the two schemas
+
+        Returns:
+            The LLM response describing the field mappings, or None if the
+            request failed
+        """
+        schema1, schema2 = schema_pair
+
+        # Format schemas for the prompt
+        schema1_str = f"{schema1}\n{self._serialized_schemas[schema1]}"
+        schema2_str = f"{schema2}\n{self._serialized_schemas[schema2]}"
+
+        # Generate prompt to find field mappings
+        data_model_prompt = DATA_MODEL_PROMPT.format(
+            schema_1=schema1_str, schema_2=schema2_str
+        )
+        return llm_chat_completion_with_retry(
+            data_model_prompt, system="", temperature=0.0
+        )
 
     def get_data_model(self) -> DataModel:
         """
@@ -311,9 +385,8 @@ class DataModelBuilder:
         # Convert to legacy format for backward compatibility
         legacy_format = self.data_model.to_legacy_format()
 
-        # Save to file
-        with open(output_path, "w") as f:
-            json.dump(legacy_format, f, indent=2)
+        # Save to file, replacing any previous data model atomically
+        dump_json_file(legacy_format, output_path, atomic=True)
 
 
 def main() -> None:
@@ -323,6 +396,21 @@ def main() -> None:
     This function creates a DataModelBuilder for the Petstore API
     and saves the resulting data model to a file.
     """
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(description="Build the data model of an OpenAPI service")
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Directory of the LLM response cache",
+    )
+    args = parser.parse_args()
+
+    # The cache directory is process-wide, so only the entry point sets it
+    if args.cache_dir is not None:
+        set_storage_path(args.cache_dir)
+
     # Create data model builder for Petstore API
     data_model_builder = DataModelBuilder("response-verification/openapi/Petstore.json")
 
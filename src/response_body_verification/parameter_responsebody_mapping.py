@@ -13,9 +13,11 @@ the same semantic concept, which can indicate potential constraints.
 """
 
 import os
-import json
-import copy
-from typing import Dict, List, Optional, Any
+import logging
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Any, Set, Tuple
 
 
 from utils.openapi_utils import (
@@ -24,28 +26,160 @@ from utils.openapi_utils import (
     simplify_openapi,
     get_relevant_schemas_of_operation,
 )
-from utils.llm_utils import llm_chat_completion
-from utils.text_extraction import extract_answer, extract_coresponding_attribute
+from utils.json_utils import dump_json_file, dumps_json, load_json_file, loads_json
+from utils.llm_utils import (
+    batch_by_tokens,
+    iter_llm_tasks,
+    llm_chat_completion,
+    llm_chat_completion_with_retry,
+)
+from utils.text_extraction import (
+    extract_answer,
+    extract_combined_answer,
+    extract_coresponding_attribute,
+    extract_structured_field,
+)
 from utils.schema_utils import (
     standardize_string,
     get_data_type,
     filter_attributes_in_schema_by_data_type,
+    get_data_types_in_schema,
     verify_attribute_in_schema,
     find_common_fields,
 )
 from constant import (
-    PARAMETER_OBSERVATION,
     SCHEMA_OBSERVATION,
-    PARAMETER_SCHEMA_MAPPING_PROMPT,
+    PARAMETER_SCHEMA_MAPPING_PROMPT_BATCH,
+    PARAMETER_SCHEMA_MAPPING_BATCH_ITEM,
     NAIVE_PARAMETER_SCHEMA_MAPPING_PROMPT,
     MAPPING_CONFIRMATION,
 )
+from response_body_verification.constraint_inference import (
+    CHECKPOINT_FLUSH_EVERY,
+    CHECKPOINT_FLUSH_INTERVAL,
+    consolidate_checkpoint,
+    load_checkpoint,
+)
 from models.mapping_models import (
     FoundMapping,
     SchemaMapping,
     ParameterResponseMapperConfig,
 )
 
+logger = logging.getLogger(__name__)
+
+# Limits for packing several parameters into one mapping prompt
+MAPPING_BATCH_MAX_PROMPT_TOKENS = 6000
+MAPPING_BATCH_MAX_PARAMETERS = 20
+
+# The naive mapping prompt asks for a two-line answer
+NAIVE_MAPPING_MAX_TOKENS = 32
+
+# Splits names like "customer_id" or "customerId" into words
+_NAME_TOKEN_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+")
+
+
+def _name_trigrams(names: Iterable[str]) -> Set[str]:
+    """
+    Get the character trigrams of the lowercased words of some names.
+
+    Words shorter than three characters are kept whole.
+
+    Args:
+        names: Names or free text to split into words
+
+    Returns:
+        Set of trigrams
+    """
+    return {
+        word[i : i + 3]
+        for name in names
+        for word in (token.lower() for token in _NAME_TOKEN_RE.findall(name))
+        for i in range(max(1, len(word) - 2))
+    }
+
+
+def _attribute_names(schema_spec: Any) -> List[str]:
+    """
+    List the attribute names of a simplified schema, including nested ones.
+
+    Args:
+        schema_spec: Simplified schema specification
+
+    Returns:
+        The attribute names, outer attributes first
+    """
+    if isinstance(schema_spec, dict):
+        return [
+            name
+            for attribute, value in schema_spec.items()
+            for name in (attribute, *_attribute_names(value))
+        ]
+    if isinstance(schema_spec, list):
+        return [name for item in schema_spec for name in _attribute_names(item)]
+    return []
+
+
+class _MappingCandidate(NamedTuple):
+    """Prompt inputs of a parameter to map to a response schema."""
+
+    method: str
+    endpoint: str
+    parameter: str
+    description: str
+    schema: str
+
+    @property
+    def key(self) -> Tuple[str, str, str]:
+        """The (parameter, description, schema) pair of the candidate."""
+        return (self.parameter, self.description, self.schema)
+
+
+def _render_mapping_batch_item(idx: int, candidate: _MappingCandidate) -> str:
+    """
+    Render one numbered parameter line of a batched mapping prompt.
+
+    Args:
+        idx: Index of the parameter in the batch, starting at 1
+        candidate: The parameter to render
+
+    Returns:
+        The parameter line
+    """
+    return PARAMETER_SCHEMA_MAPPING_BATCH_ITEM.format(
+        idx=idx,
+        method=candidate.method,
+        endpoint=candidate.endpoint,
+        attribute=candidate.parameter,
+        description=candidate.description,
+    )
+
+
+def _parse_mapping_proposals(response: Optional[str]) -> Dict[int, Optional[str]]:
+    """
+    Parse the proposed attributes of a batched mapping reply.
+
+    Args:
+        response: LLM reply holding a JSON array of {"idx",
+            "corresponding_attribute"} objects
+
+    Returns:
+        Dictionary mapping parameter indexes to the proposed attribute, or None
+        if the parameter has none; empty if the reply is not a valid JSON array
+    """
+    proposals: Dict[int, Optional[str]] = {}
+    try:
+        items = loads_json(extract_structured_field(response, "json") or response)
+        for item in items:
+            attribute = item["corresponding_attribute"]
+            attribute = str(attribute).strip() if attribute is not None else ""
+            if attribute.lower() in ("", "null", "none"):
+                attribute = None
+            proposals[int(item["idx"])] = attribute
+    except (TypeError, ValueError, KeyError):
+        return {}
+    return proposals
+
 
 class ParameterResponseMapper:
     """
@@ -85,6 +219,8 @@ class ParameterResponseMapper:
         outfile: Optional[str] = None,
         experiment_folder: str = "experiment_our",
         is_naive: bool = False,
+        openapi_spec: Optional[Dict[str, Any]] = None,
+        lexical_prefilter: bool = False,
     ) -> None:
         """
         Initialize the ParameterResponseMapper.
@@ -97,6 +233,8 @@ class ParameterResponseMapper:
             outfile: Path to the output file for saving results
             experiment_folder: Folder where experiment files are stored
             is_naive: Whether to use the naive mapping approach
+            openapi_spec: Already loaded specification of openapi_path; loaded from the file if None
+            lexical_prefilter: Whether to record parameters as unmapped, without asking the LLM, when their name and description share no text with the schema's attribute names
 
         Returns:
             None
@@ -110,10 +248,11 @@ class ParameterResponseMapper:
             outfile=outfile,
             experiment_folder=experiment_folder,
             is_naive=is_naive,
+            lexical_prefilter=lexical_prefilter,
         )
 
         # Store configuration parameters as instance variables for backward compatibility
-        self.openapi_spec = load_openapi(openapi_path)
+        self.openapi_spec = openapi_spec or load_openapi(openapi_path)
         self.except_attributes_found_constraints = (
             except_attributes_found_constraints_inside_response_body
         )
@@ -146,32 +285,100 @@ class ParameterResponseMapper:
         self.simplified_schemas = get_simplified_schema(self.openapi_spec)
         self.simplified_openapi = simplify_openapi(self.openapi_spec)
 
-        # Load input parameter constraints
-        self.input_parameter_constraints = json.load(
-            open(
-                f"{self.experiment_folder}/{self.service_name}/input_parameter.json",
-                "r",
-            )
+        # Load input parameter constraints, keeping only operations of the spec;
+        # the mapping passes skip any other operation
+        raw_constraints = load_json_file(
+            f"{self.experiment_folder}/{self.service_name}/input_parameter.json"
         )
+        paths = self.openapi_spec.get("paths", {})
+        self._operation_parts: Dict[str, Tuple[str, str]] = {}
+        for operation in raw_constraints:
+            method, _, endpoint = operation.partition("-")
+            if paths.get(endpoint, {}).get(method):
+                self._operation_parts[operation] = (method, endpoint)
+        self.input_parameter_constraints = {
+            operation: raw_constraints[operation] for operation in self._operation_parts
+        }
 
-        # Load response body constraints if needed
-        if self.except_attributes_found_constraints:
-            self.inside_response_body_constraints = json.load(
-                open(
-                    f"{self.experiment_folder}/{self.service_name}/response_property_constraints.json",
-                    "r",
+        # Data types of each schema's attributes; parameters of any other type
+        # have nothing to map to in the schema
+        self._schema_data_types: Dict[str, Set[str]] = {
+            schema: get_data_types_in_schema(schema_spec)
+            for schema, schema_spec in self.simplified_schemas.items()
+        }
+
+        # Name, description and data type of each parameter, parsed once
+        self._parameters_w_descr: Dict[Tuple[str, str], List[Tuple[str, str, str]]] = {
+            (operation, part): [
+                (
+                    param,
+                    value.split("(description:")[-1][:-1].strip(),
+                    get_data_type(value),
                 )
-            )
+                for param, value in (operation_spec.get(part) or {}).items()
+                if isinstance(value, str)
+            ]
+            for operation, operation_spec in self.input_parameter_constraints.items()
+            for part in ("parameters", "requestBody")
+        }
+
+        # Load response body constraints if needed, keeping only the schemas
+        # the mapping can exclude attributes of
+        if self.except_attributes_found_constraints:
+            self.inside_response_body_constraints = {
+                schema: schema_constraints
+                for schema, schema_constraints in load_json_file(
+                    f"{self.experiment_folder}/{self.service_name}/response_property_constraints.json"
+                ).items()
+                if schema in self.simplified_schemas
+            }
 
         # Initialize found mappings
         self.found_mappings: List[FoundMapping] = []
+        # New found mappings are appended to a journal next to the checkpoint
+        # file, which is only rewritten once a mapping pass finishes
+        self._journal = None
+        self._unsaved_mappings = 0
+        self._last_save = time.monotonic()
+
+        # Trigrams and words of the filtered attribute names by (schema, data
+        # type), for the lexical prefilter
+        self._attribute_text: Dict[Tuple[str, str], Tuple[Set[str], Set[str]]] = {}
+
+        # Filtered attributes, and their JSON, by (schema, data type)
+        self._filtered_attributes_cache: Dict[
+            Tuple[str, str], Tuple[Dict[str, Any], str]
+        ] = {}
+
+        # Schema observations by (schema, filtered attributes), shared by every
+        # parameter compared against the same attributes
+        self._schema_observations: Dict[Tuple[str, str], Optional[str]] = {}
+        self._schema_observation_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._schema_observation_lock = threading.Lock()
         if self.save_and_load:
             self.save_path = (
                 f"{self.experiment_folder}/{self.service_name}/found_maping.txt"
             )
-            if os.path.exists(self.save_path):
-                raw_mappings = json.load(open(self.save_path, "r"))
-                self.found_mappings = [FoundMapping.from_list(m) for m in raw_mappings]
+            self.found_mappings = [
+                FoundMapping.from_list(m) for m in load_checkpoint(self.save_path)
+            ]
+            # Prefilter verdicts only stand while the prefilter is on; without
+            # it those pairs are asked to the LLM again
+            if not self.config.lexical_prefilter:
+                self.found_mappings = [
+                    mapping
+                    for mapping in self.found_mappings
+                    if not mapping.prefiltered
+                ]
+
+        # Found mappings by (parameter, description, schema); the first mapping
+        # of a pair wins, as it did for the former scan of found_mappings
+        self._found_mapping_index: Dict[Tuple[str, str, str], FoundMapping] = {}
+        for mapping in self.found_mappings:
+            self._found_mapping_index.setdefault(mapping.to_tuple()[:3], mapping)
+
+        # Main response schemas by operation, walked from the spec once
+        self._main_response_schemas_cache: Dict[str, List[str]] = {}
 
         # Get list of schemas to process
         self.list_of_schemas = list(self.simplified_schemas.keys())
@@ -189,34 +396,117 @@ class ParameterResponseMapper:
             Dictionary mapping operations to their parameters with descriptions
         """
         self.operations_containing_param_w_description: Dict[str, Dict[str, Any]] = {}
-        # Get simplified openapi Spec with params, that each param has a description
-        self.operation_param_w_descr = simplify_openapi(self.openapi_spec)
-
-        for operation in self.operation_param_w_descr:
-            self.operations_containing_param_w_description[operation] = {}
-            if "summary" in self.operation_param_w_descr[operation]:
-                self.operations_containing_param_w_description[operation]["summary"] = (
-                    self.operation_param_w_descr[operation]["summary"]
-                )
+        # Get simplified openapi Spec with params, that each param has a description;
+        # initialize() has already simplified this spec, so reuse it when available
+        self.operation_param_w_descr = self.simplified_openapi or simplify_openapi(
+            self.openapi_spec
+        )
 
-            parts = ["parameters", "requestBody"]
-            for part in parts:
-                if (
-                    self.operation_param_w_descr.get(operation, {}).get(part, None)
-                    is not None
-                ):
-                    self.operations_containing_param_w_description[operation][part] = {}
-                    if isinstance(self.operation_param_w_descr[operation][part], dict):
-                        for param, value in self.operation_param_w_descr[operation][
-                            part
-                        ].items():
-                            if "(description:" in value:
-                                self.operations_containing_param_w_description[
-                                    operation
-                                ][part][param] = value
+        for operation, operation_spec in self.operation_param_w_descr.items():
+            filtered_operation: Dict[str, Any] = {}
+            self.operations_containing_param_w_description[operation] = (
+                filtered_operation
+            )
+            if "summary" in operation_spec:
+                filtered_operation["summary"] = operation_spec["summary"]
+
+            for part in ("parameters", "requestBody"):
+                part_spec = operation_spec.get(part)
+                if part_spec is None:
+                    continue
+                filtered_part: Dict[str, Any] = {}
+                filtered_operation[part] = filtered_part
+                if not isinstance(part_spec, dict):
+                    continue
+                for param, value in part_spec.items():
+                    if "(description:" in value:
+                        filtered_part[param] = value
 
         return self.operations_containing_param_w_description
 
+    def _filtered_attributes(
+        self, schema: str, data_type: str
+    ) -> Tuple[Dict[str, Any], str]:
+        """
+        Get the attributes of a schema with a data type, filtering them only once.
+
+        Args:
+            schema: Name of the schema
+            data_type: The data type to keep
+
+        Returns:
+            Tuple of (the filtered attributes, the filtered attributes serialized
+            as JSON for prompts); the attributes are empty if the schema has no
+            attribute of the data type
+        """
+        key = (schema, data_type)
+        if key not in self._filtered_attributes_cache:
+            filtered_attr_schema = (
+                filter_attributes_in_schema_by_data_type(
+                    self.simplified_schemas[schema], data_type
+                )
+                if data_type in self._schema_data_types[schema]
+                else {}
+            )
+            self._filtered_attributes_cache[key] = (
+                filtered_attr_schema,
+                dumps_json(filtered_attr_schema, indent=False).decode("utf-8"),
+            )
+        return self._filtered_attributes_cache[key]
+
+    def _lexically_unrelated(
+        self, param: str, description: str, schema: str, data_type: str
+    ) -> bool:
+        """
+        Check whether a parameter shares no text with the attributes it could map to.
+
+        The parameter is unrelated when its name shares no character trigram with
+        the names of the schema's attributes of its data type, and its
+        description mentions none of their words.
+
+        Args:
+            param: Name of the parameter
+            description: Description of the parameter
+            schema: Name of the schema
+            data_type: Data type of the parameter
+
+        Returns:
+            True if the parameter and the attributes share no text
+        """
+        key = (schema, data_type)
+        if key not in self._attribute_text:
+            names = _attribute_names(self._filtered_attributes(schema, data_type)[0])
+            words = {
+                token.lower()
+                for name in names
+                for token in _NAME_TOKEN_RE.findall(name)
+            }
+            self._attribute_text[key] = (_name_trigrams(names), words)
+        attribute_trigrams, attribute_words = self._attribute_text[key]
+
+        description_words = {
+            token.lower() for token in _NAME_TOKEN_RE.findall(description)
+        }
+        return attribute_trigrams.isdisjoint(
+            _name_trigrams([param])
+        ) and attribute_words.isdisjoint(description_words)
+
+    def _main_response_schemas(self, operation: str) -> List[str]:
+        """
+        Get the main response schemas of an operation, walking the spec once.
+
+        Args:
+            operation: Operation ID string
+
+        Returns:
+            Names of the schemas of the operation's success responses
+        """
+        if operation not in self._main_response_schemas_cache:
+            self._main_response_schemas_cache[operation], _ = (
+                get_relevant_schemas_of_operation(operation, self.openapi_spec)
+            )
+        return self._main_response_schemas_cache[operation]
+
     def foundMapping(
         self, input_parameter: str, description: str, schema: str
     ) -> Optional[FoundMapping]:
@@ -231,14 +521,7 @@ class ParameterResponseMapper:
         Returns:
             The found mapping if it exists, None otherwise
         """
-        for mapping in self.found_mappings:
-            if (
-                mapping.parameter_name == input_parameter
-                and mapping.parameter_description == description
-                and mapping.schema_name == schema
-            ):
-                return mapping
-        return None
+        return self._found_mapping_index.get((input_parameter, description, schema))
 
     def exclude_attributes_found_constraint(self, schema: str) -> Dict[str, Any]:
         """
@@ -264,12 +547,111 @@ class ParameterResponseMapper:
         potential mappings between them that could indicate constraints.
 
         It uses a sophisticated approach with LLM-based analysis of parameter
-        and schema descriptions to find semantically related fields.
+        and schema descriptions to find semantically related fields. New
+        parameters compared against the same schema attributes are mapped
+        several per prompt, and each proposed mapping is then confirmed.
 
         Returns:
             None
         """
         print(f"\nMapping input parameters to response schemas...")
+        occurrences, groups = self._collect_pending_mappings()
+
+        # Map the new pairs several per prompt, batching pairs that are compared
+        # against the same schema attributes
+        tasks: List[Tuple[List[_MappingCandidate], Dict[str, Any], str]] = []
+        for group, group_candidates in groups.items():
+            filtered_attr_schema, specification = self._filtered_attributes(*group)
+            logger.debug(
+                f"Mapping {len(group_candidates)} parameters to {specification} in {group[0]}"
+            )
+            for batch in batch_by_tokens(
+                group_candidates,
+                lambda candidate: _render_mapping_batch_item(0, candidate),
+                max_tokens=MAPPING_BATCH_MAX_PROMPT_TOKENS,
+                max_items=MAPPING_BATCH_MAX_PARAMETERS,
+            ):
+                tasks.append((batch, filtered_attr_schema, specification))
+
+        # The batches are independent, so they run concurrently; each one is
+        # recorded here as soon as it completes, so an interrupted run keeps
+        # the verdicts it already has
+        try:
+            for index, results in iter_llm_tasks(
+                lambda task: self._map_parameters_batch(*task), tasks
+            ):
+                batch = tasks[index][0]
+                for candidate, (decided, corresponding_attribute) in zip(
+                    batch, results
+                ):
+                    if decided:
+                        self._record_mapping(
+                            candidate.key,
+                            corresponding_attribute,
+                            occurrences[candidate.key],
+                            self.outfile,
+                        )
+        finally:
+            # Write any progress held back by the save interval
+            self._save_progress(self.outfile, force=True)
+
+    def mapping_response_bodies_to_input_parameters_naive(self) -> None:
+        """
+        Map input parameters to response body attributes using a naive approach.
+
+        This method is a simplified version of the mapping process that uses less
+        sophisticated prompts and analysis, which can be faster but potentially
+        less accurate.
+
+        Returns:
+            None
+        """
+        print(f"\nNAIVE Mapping input parameters to response schemas...")
+        occurrences, groups = self._collect_pending_mappings()
+
+        tasks: List[Tuple[_MappingCandidate, Dict[str, Any], str]] = [
+            (candidate, *self._filtered_attributes(*group))
+            for group, group_candidates in groups.items()
+            for candidate in group_candidates
+        ]
+
+        # The mappings are independent, so they run concurrently; each one is
+        # recorded here as soon as it completes, so an interrupted run keeps
+        # the verdicts it already has
+        try:
+            for index, (decided, corresponding_attribute) in iter_llm_tasks(
+                lambda task: self._map_parameter_naive(*task), tasks
+            ):
+                if decided:
+                    candidate = tasks[index][0]
+                    self._record_mapping(
+                        candidate.key,
+                        corresponding_attribute,
+                        occurrences[candidate.key],
+                    )
+        finally:
+            # Write any progress held back by the save interval
+            self._save_progress(force=True)
+
+    def _collect_pending_mappings(
+        self,
+    ) -> Tuple[
+        Dict[Tuple[str, str, str], List[List[str]]],
+        Dict[Tuple[str, str], List[_MappingCandidate]],
+    ]:
+        """
+        Walk the input parameters and response schemas to find the pairs to map.
+
+        Pairs with a found mapping are added to the mappings right away, and pairs
+        whose schema has no attribute of the parameter's data type are recorded
+        as having no mapping. Both mapping passes share this walk and only differ
+        in how they ask the LLM about the remaining pairs.
+
+        Returns:
+            Tuple of (every [operation, part, param] occurrence of each new
+            (parameter, description, schema) pair, the new pairs grouped by
+            (schema, data type))
+        """
         self.response_body_input_parameter_mappings: Dict[
             str, Dict[str, List[List[str]]]
         ] = {}
@@ -277,25 +659,21 @@ class ParameterResponseMapper:
         progress_size = (
             2 * len(self.input_parameter_constraints) * len(self.list_of_schemas)
         )
+        # Progress is printed once per percent rather than for every step
+        progress_step = max(1, progress_size // 100)
         completed = 0
 
+        occurrences: Dict[Tuple[str, str, str], List[List[str]]] = {}
+        groups: Dict[Tuple[str, str], List[_MappingCandidate]] = {}
+
         # Process each operation with constraints
         for operation in self.input_parameter_constraints:
-            operation_method, operation_path = operation.split("-", 1)
-            full_operation_spec = (
-                self.openapi_spec.get("paths", {})
-                .get(operation_path, {})
-                .get(operation_method, {})
-            )
-
-            if not full_operation_spec:
-                continue
+            # Operations missing from the spec were dropped by initialize
+            method, endpoint = self._operation_parts[operation]
 
             # Get main response schemas for the operation
-            main_repsonse_schemas, _ = get_relevant_schemas_of_operation(
-                operation, self.openapi_spec
-            )
-            print(
+            main_repsonse_schemas = self._main_response_schemas(operation)
+            logger.debug(
                 f"Operation: {operation}, Main response schemas: {main_repsonse_schemas}"
             )
 
@@ -303,29 +681,23 @@ class ParameterResponseMapper:
             for schema in main_repsonse_schemas:
                 for part in ["parameters", "requestBody"]:
                     try:
-                        print(
-                            f"[{self.service_name}] progress: {round(completed/progress_size*100, 2)}"
-                        )
+                        if completed % progress_step == 0:
+                            print(
+                                f"[{self.service_name}] progress: {round(completed/progress_size*100, 2)}"
+                            )
                         completed += 1
 
-                        specification = self.input_parameter_constraints.get(
-                            operation, {}
-                        ).get(part, {})
-                        if not specification:
+                        parameters = self._parameters_w_descr.get((operation, part))
+                        if not parameters:
                             continue
 
                         if schema not in self.simplified_schemas:
                             continue
 
-                        schema_spec = self.simplified_schemas[schema]
-
                         # Process each parameter in the specification
-                        for param in specification:
-                            print(f"Mapping {param} from {operation} to {schema}")
-                            description = (
-                                specification[param]
-                                .split("(description:")[-1][:-1]
-                                .strip()
+                        for param, description, filtering_data_type in parameters:
+                            logger.debug(
+                                f"Mapping {param} from {operation} to {schema}"
                             )
 
                             # Check if mapping already exists
@@ -334,419 +706,381 @@ class ParameterResponseMapper:
                             )
 
                             if found_mapping:
-                                found_corresponding_attribute = (
-                                    found_mapping.corresponding_attribute
-                                )
-                                if found_corresponding_attribute is None:
-                                    continue
-
-                                # Add to mappings dictionary
-                                if (
-                                    schema
-                                    not in self.response_body_input_parameter_mappings
-                                ):
-                                    self.response_body_input_parameter_mappings[
-                                        schema
-                                    ] = {
-                                        found_corresponding_attribute: [
-                                            [operation, part, param]
-                                        ]
-                                    }
-                                elif (
-                                    found_corresponding_attribute
-                                    not in self.response_body_input_parameter_mappings[
-                                        schema
-                                    ]
-                                ):
-                                    self.response_body_input_parameter_mappings[schema][
-                                        found_corresponding_attribute
-                                    ] = [[operation, part, param]]
-                                else:
-                                    self.response_body_input_parameter_mappings[schema][
-                                        found_corresponding_attribute
-                                    ].append([operation, part, param])
-                                continue
-
-                            # Save progress if enabled
-                            if self.save_and_load:
-                                with open(self.save_path, "w") as file:
-                                    json.dump(
-                                        [m.to_list() for m in self.found_mappings], file
+                                if found_mapping.corresponding_attribute is not None:
+                                    self._add_mapping(
+                                        schema,
+                                        found_mapping.corresponding_attribute,
+                                        [operation, part, param],
                                     )
+                                continue
 
-                            # Create new mapping
-                            mapping = FoundMapping(
-                                parameter_name=param,
-                                parameter_description=description,
-                                schema_name=schema,
-                                corresponding_attribute=None,
-                            )
+                            # A pair already waiting for a verdict shares it
+                            key = (param, description, schema)
+                            if key in occurrences:
+                                occurrences[key].append([operation, part, param])
+                                continue
 
                             # Filter attributes by data type
-                            filtering_data_type = get_data_type(specification[param])
-                            filtered_attr_schema = (
-                                filter_attributes_in_schema_by_data_type(
-                                    schema_spec, filtering_data_type
-                                )
+                            filtered_attr_schema, _ = self._filtered_attributes(
+                                schema, filtering_data_type
                             )
 
                             if not filtered_attr_schema:
-                                self.found_mappings.append(mapping)
+                                self._add_found_mapping(
+                                    FoundMapping(
+                                        parameter_name=param,
+                                        parameter_description=description,
+                                        schema_name=schema,
+                                        corresponding_attribute=None,
+                                    )
+                                )
                                 continue
 
-                            # Extract method and endpoint for prompts
-                            method = operation.split("-")[0]
-                            endpoint = "-".join(operation.split("-")[1:])
-                            print(
-                                f"Mapping {param} to {json.dumps(filtered_attr_schema)} in {schema}"
-                            )
+                            # Optionally skip parameters that share no text with
+                            # any attribute they could map to
+                            if (
+                                self.config.lexical_prefilter
+                                and self._lexically_unrelated(
+                                    param, description, schema, filtering_data_type
+                                )
+                            ):
+                                self._add_found_mapping(
+                                    FoundMapping(
+                                        parameter_name=param,
+                                        parameter_description=description,
+                                        schema_name=schema,
+                                        corresponding_attribute=None,
+                                        prefiltered=True,
+                                    )
+                                )
+                                continue
 
-                            # Generate parameter observation prompt
-                            parameter_observation_prompt = PARAMETER_OBSERVATION.format(
-                                method=method.upper(),
-                                endpoint=endpoint,
-                                attribute=param,
-                                description=description,
+                            occurrences[key] = [[operation, part, param]]
+                            groups.setdefault((schema, filtering_data_type), []).append(
+                                _MappingCandidate(
+                                    method.upper(), endpoint, param, description, schema
+                                )
                             )
+                    except Exception as e:
+                        print(f"Error: {e}")
+                        continue
 
-                            parameter_observation_response = llm_chat_completion(
-                                parameter_observation_prompt, model="gpt-4-turbo"
-                            )
+        return occurrences, groups
 
-                            # Generate schema observation prompt
-                            schema_observation_prompt = SCHEMA_OBSERVATION.format(
-                                schema=schema,
-                                specification=json.dumps(filtered_attr_schema),
-                            )
+    def _add_mapping(self, schema: str, attribute: str, occurrence: List[str]) -> None:
+        """
+        Add an [operation, part, param] occurrence to the mapped response attribute.
 
-                            schema_observation_response = llm_chat_completion(
-                                schema_observation_prompt, model="gpt-4-turbo"
-                            )
+        Args:
+            schema: Name of the response schema
+            attribute: Attribute of the schema the parameter maps to
+            occurrence: The [operation, part, param] entry to add
 
-                            # Generate mapping prompt
-                            mapping_attribute_to_schema_prompt = PARAMETER_SCHEMA_MAPPING_PROMPT.format(
-                                method=method.upper(),
-                                endpoint=endpoint,
-                                attribute=param,
-                                description=description,
-                                parameter_observation=parameter_observation_response,
-                                schema=schema,
-                                schema_observation=schema_observation_response,
-                                attributes=[attr for attr in filtered_attr_schema],
-                            )
+        Returns:
+            None
+        """
+        self.response_body_input_parameter_mappings.setdefault(schema, {}).setdefault(
+            attribute, []
+        ).append(occurrence)
 
-                            mapping_attribute_to_schema_response = llm_chat_completion(
-                                mapping_attribute_to_schema_prompt, model="gpt-4-turbo"
-                            )
+    def _record_mapping(
+        self,
+        key: Tuple[str, str, str],
+        corresponding_attribute: Optional[str],
+        occurrences: List[List[str]],
+        outfile: Optional[str] = None,
+    ) -> None:
+        """
+        Record the verdict for a (parameter, description, schema) pair.
 
-                            print("GPT: ", mapping_attribute_to_schema_response)
+        Args:
+            key: The (parameter, description, schema) pair
+            corresponding_attribute: The confirmed attribute, or None if the
+                parameter has no corresponding attribute
+            occurrences: Every [operation, part, param] entry of the pair
+            outfile: Output file to write the mappings to on the save interval
 
-                            # Extract answer from response
-                            answer = extract_answer(
-                                mapping_attribute_to_schema_response
-                            )
-                            if not "yes" in answer:
-                                self.found_mappings.append(mapping)
-                                continue
+        Returns:
+            None
+        """
+        param, description, schema = key
+        self._add_found_mapping(
+            FoundMapping(
+                parameter_name=param,
+                parameter_description=description,
+                schema_name=schema,
+                corresponding_attribute=corresponding_attribute,
+            )
+        )
+        if corresponding_attribute is None:
+            return
 
-                            # Extract corresponding attribute from response
-                            corresponding_attribute = extract_coresponding_attribute(
-                                mapping_attribute_to_schema_response
-                            )
+        for occurrence in occurrences:
+            self._add_mapping(schema, corresponding_attribute, occurrence)
 
-                            # Verify attribute exists in schema
-                            if not verify_attribute_in_schema(
-                                filtered_attr_schema, corresponding_attribute
-                            ):
-                                self.found_mappings.append(mapping)
-                                continue
+        # Save progress and results on the save interval
+        self._save_progress(outfile)
 
-                            # Generate confirmation prompt
-                            mapping_confirmation_prompt = MAPPING_CONFIRMATION.format(
-                                method=method.upper(),
-                                endpoint=endpoint,
-                                parameter_name=param,
-                                description=description,
-                                schema=schema,
-                                corresponding_attribute=corresponding_attribute,
-                            )
+    def _map_parameters_batch(
+        self,
+        batch: List[_MappingCandidate],
+        filtered_attr_schema: Dict[str, Any],
+        specification: str,
+    ) -> List[Tuple[bool, Optional[str]]]:
+        """
+        Map several parameters to attributes of the same schema in one prompt.
 
-                            mapping_confirmation_response = llm_chat_completion(
-                                mapping_confirmation_prompt, model="gpt-4-turbo"
-                            )
-                            mapping_status = extract_answer(
-                                mapping_confirmation_response
-                            )
+        The prompt carries the schema observation, shared by every batch against
+        the same attributes, and asks for an observation of each parameter
+        before the mappings, so batches of any size follow the same method.
+        Proposed mappings are confirmed one at a time. Parameters missing from
+        the reply, or all of them if the reply is not a valid JSON array, are
+        asked once more in a smaller batch; any still missing are left
+        undecided and mapped again on the next run.
 
-                            # Check confirmation status
-                            if "incorrect" in mapping_status:
-                                print(
-                                    f"[INCORRECT] {method.upper()} {endpoint} {param} --- {schema} {corresponding_attribute}"
-                                )
-                                self.found_mappings.append(mapping)
-                                continue
+        Args:
+            batch: Parameters compared against the same schema attributes
+            filtered_attr_schema: Schema attributes of the parameters' data type
+            specification: The filtered attributes serialized as JSON
 
-                            print(
-                                f"[CORRECT] {method.upper()} {endpoint} {param} --- {schema} {corresponding_attribute}"
-                            )
+        Returns:
+            Tuples of (whether a verdict was reached, the confirmed attribute or
+            None) in the same order as ``batch``
+        """
+        schema = batch[0].schema
+        schema_observation = self._observe_schema(schema, specification)
+
+        proposals: Dict[_MappingCandidate, Optional[str]] = {}
+        pending = batch
+        for _ in range(2):
+            prompt = PARAMETER_SCHEMA_MAPPING_PROMPT_BATCH.format(
+                parameters="\n".join(
+                    _render_mapping_batch_item(idx, candidate)
+                    for idx, candidate in enumerate(pending, 1)
+                ),
+                schema=schema,
+                schema_specification=specification,
+                schema_observation=schema_observation,
+                attributes=[attr for attr in filtered_attr_schema],
+            )
+            response = llm_chat_completion_with_retry(prompt, model="gpt-4-turbo")
+            logger.debug(f"GPT: {response}")
+            answers = _parse_mapping_proposals(response)
+            for idx, candidate in enumerate(pending, 1):
+                if idx in answers:
+                    proposals[candidate] = answers[idx]
+            pending = [candidate for candidate in pending if candidate not in proposals]
+            if not pending:
+                break
+
+        results: List[Tuple[bool, Optional[str]]] = []
+        for candidate in batch:
+            if candidate not in proposals:
+                results.append((False, None))
+                continue
 
-                            # Add confirmed mapping to results
-                            if (
-                                schema
-                                not in self.response_body_input_parameter_mappings
-                            ):
-                                self.response_body_input_parameter_mappings[schema] = {
-                                    corresponding_attribute: [[operation, part, param]]
-                                }
-                            elif (
-                                corresponding_attribute
-                                not in self.response_body_input_parameter_mappings[
-                                    schema
-                                ]
-                            ):
-                                self.response_body_input_parameter_mappings[schema][
-                                    corresponding_attribute
-                                ] = [[operation, part, param]]
-                            else:
-                                self.response_body_input_parameter_mappings[schema][
-                                    corresponding_attribute
-                                ].append([operation, part, param])
-
-                            # Update mapping and save
-                            mapping.corresponding_attribute = corresponding_attribute
-                            self.found_mappings.append(mapping)
-
-                            if self.save_and_load:
-                                with open(self.save_path, "w") as file:
-                                    json.dump(
-                                        [m.to_list() for m in self.found_mappings], file
-                                    )
+            corresponding_attribute = proposals[candidate]
+            try:
+                if corresponding_attribute is None or not verify_attribute_in_schema(
+                    filtered_attr_schema, corresponding_attribute
+                ):
+                    results.append((True, None))
+                elif self._confirm_mapping(candidate, corresponding_attribute):
+                    results.append((True, corresponding_attribute))
+                else:
+                    results.append((True, None))
+            except Exception as e:
+                print(f"Error: {e}")
+                results.append((False, None))
+        return results
+
+    def _observe_schema(self, schema: str, specification: str) -> Optional[str]:
+        """
+        Get the observation of a schema's attributes, asking the LLM only once.
 
-                            # Save results to output file if specified
-                            if self.outfile:
-                                with open(self.outfile, "w") as f:
-                                    json.dump(
-                                        self.response_body_input_parameter_mappings,
-                                        f,
-                                        indent=2,
-                                    )
-                    except Exception as e:
-                        print(f"Error: {e}")
-                        continue
+        Concurrent callers asking about the same attributes wait for the first
+        one instead of sending the same prompt again.
 
-    def mapping_response_bodies_to_input_parameters_naive(self) -> None:
+        Args:
+            schema: Name of the schema
+            specification: Schema attributes of one data type, serialized as JSON
+
+        Returns:
+            The LLM's observation of the attributes
         """
-        Map input parameters to response body attributes using a naive approach.
+        key = (schema, specification)
+        with self._schema_observation_lock:
+            key_lock = self._schema_observation_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            if self._schema_observations.get(key) is None:
+                # Generate schema observation prompt
+                schema_observation_prompt = SCHEMA_OBSERVATION.format(
+                    schema=schema, specification=specification
+                )
+                self._schema_observations[key] = llm_chat_completion(
+                    schema_observation_prompt, model="gpt-4-turbo"
+                )
+            return self._schema_observations[key]
 
-        This method is a simplified version of the mapping process that uses less
-        sophisticated prompts and analysis, which can be faster but potentially
-        less accurate.
+    def _confirm_mapping(
+        self, candidate: _MappingCandidate, corresponding_attribute: str
+    ) -> bool:
+        """
+        Confirm a proposed mapping of a parameter to a schema attribute.
+
+        Args:
+            candidate: The mapped parameter
+            corresponding_attribute: The proposed attribute of the schema
 
         Returns:
-            None
+            True if the mapping is confirmed as correct, False otherwise
         """
-        print(f"\nNAIVE Mapping input parameters to response schemas...")
-        self.response_body_input_parameter_mappings: Dict[
-            str, Dict[str, List[List[str]]]
-        ] = {}
+        # Generate confirmation prompt
+        mapping_confirmation_prompt = MAPPING_CONFIRMATION.format(
+            method=candidate.method,
+            endpoint=candidate.endpoint,
+            parameter_name=candidate.parameter,
+            description=candidate.description,
+            schema=candidate.schema,
+            corresponding_attribute=corresponding_attribute,
+        )
 
-        progress_size = (
-            2 * len(self.input_parameter_constraints) * len(self.list_of_schemas)
+        mapping_confirmation_response = llm_chat_completion(
+            mapping_confirmation_prompt, model="gpt-4-turbo"
         )
-        completed = 0
+        mapping_status = extract_answer(mapping_confirmation_response)
 
-        # Process each operation with constraints
-        for operation in self.input_parameter_constraints:
-            operation_path = operation.split("-")[1]
-            operation_method = operation.split("-")[0]
-            full_operation_spec = (
-                self.openapi_spec.get("paths", {})
-                .get(operation_path, {})
-                .get(operation_method, {})
+        # Check confirmation status
+        if "incorrect" in mapping_status:
+            logger.debug(
+                f"[INCORRECT] {candidate.method} {candidate.endpoint} {candidate.parameter} --- {candidate.schema} {corresponding_attribute}"
             )
+            return False
 
-            if not full_operation_spec:
-                continue
-
-            # Get main response schemas for the operation
-            main_repsonse_schemas, _ = get_relevant_schemas_of_operation(
-                operation, self.openapi_spec
-            )
-            print(
-                f"Operation: {operation}, Main response schemas: {main_repsonse_schemas}"
-            )
-
-            # Process each response schema
-            for schema in main_repsonse_schemas:
-                for part in ["parameters", "requestBody"]:
-                    try:
-                        print(
-                            f"[{self.service_name}] progress: {round(completed/progress_size*100, 2)}"
-                        )
-                        completed += 1
-
-                        specification = self.input_parameter_constraints.get(
-                            operation, {}
-                        ).get(part, {})
-                        if not specification:
-                            continue
-
-                        if schema not in self.simplified_schemas:
-                            continue
-
-                        schema_spec = self.simplified_schemas[schema]
+        logger.debug(
+            f"[CORRECT] {candidate.method} {candidate.endpoint} {candidate.parameter} --- {candidate.schema} {corresponding_attribute}"
+        )
+        return True
 
-                        # Process each parameter in the specification
-                        for param in specification:
-                            print(f"Mapping {param} from {operation} to {schema}")
-                            description = (
-                                specification[param]
-                                .split("(description:")[-1][:-1]
-                                .strip()
-                            )
+    def _map_parameter_naive(
+        self,
+        candidate: _MappingCandidate,
+        filtered_attr_schema: Dict[str, Any],
+        specification: str,
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Map one parameter to a schema attribute with a single naive prompt.
 
-                            # Check if mapping already exists
-                            found_mapping = self.foundMapping(
-                                param, description, schema
-                            )
+        Args:
+            candidate: The parameter to map
+            filtered_attr_schema: Schema attributes of the parameter's data type
+            specification: The filtered attributes serialized as JSON
 
-                            if found_mapping:
-                                found_corresponding_attribute = (
-                                    found_mapping.corresponding_attribute
-                                )
-                                if found_corresponding_attribute is None:
-                                    continue
-
-                                # Add to mappings dictionary
-                                if (
-                                    schema
-                                    not in self.response_body_input_parameter_mappings
-                                ):
-                                    self.response_body_input_parameter_mappings[
-                                        schema
-                                    ] = {
-                                        found_corresponding_attribute: [
-                                            [operation, part, param]
-                                        ]
-                                    }
-                                elif (
-                                    found_corresponding_attribute
-                                    not in self.response_body_input_parameter_mappings[
-                                        schema
-                                    ]
-                                ):
-                                    self.response_body_input_parameter_mappings[schema][
-                                        found_corresponding_attribute
-                                    ] = [[operation, part, param]]
-                                else:
-                                    self.response_body_input_parameter_mappings[schema][
-                                        found_corresponding_attribute
-                                    ].append([operation, part, param])
-                                continue
+        Returns:
+            Tuple of (whether a verdict was reached, the mapped attribute or None)
+        """
+        try:
+            logger.debug(
+                f"Mapping {candidate.parameter} to {specification} in {candidate.schema}"
+            )
 
-                            # Save progress if enabled
-                            if self.save_and_load:
-                                with open(self.save_path, "w") as file:
-                                    json.dump(
-                                        [m.to_list() for m in self.found_mappings], file
-                                    )
+            # Generate naive mapping prompt (simplified approach)
+            mapping_attribute_to_schema_prompt = (
+                NAIVE_PARAMETER_SCHEMA_MAPPING_PROMPT.format(
+                    method=candidate.method,
+                    endpoint=candidate.endpoint,
+                    attribute=candidate.parameter,
+                    description=candidate.description,
+                    schema_specification=specification,
+                    schema=candidate.schema,
+                )
+            )
 
-                            # Create new mapping
-                            mapping = FoundMapping(
-                                parameter_name=param,
-                                parameter_description=description,
-                                schema_name=schema,
-                                corresponding_attribute=None,
-                            )
+            # The answer is two short lines, so cap the completion length
+            mapping_attribute_to_schema_response = llm_chat_completion(
+                mapping_attribute_to_schema_prompt,
+                model="gpt-4-turbo",
+                max_tokens=NAIVE_MAPPING_MAX_TOKENS,
+            )
 
-                            # Filter attributes by data type
-                            filtering_data_type = get_data_type(specification[param])
-                            filtered_attr_schema = (
-                                filter_attributes_in_schema_by_data_type(
-                                    schema_spec, filtering_data_type
-                                )
-                            )
+            logger.debug(f"GPT: {mapping_attribute_to_schema_response}")
 
-                            if not filtered_attr_schema:
-                                self.found_mappings.append(mapping)
-                                continue
+            # Extract answer from response
+            answer = extract_combined_answer(mapping_attribute_to_schema_response)
+            if not "yes" in answer:
+                return True, None
 
-                            # Extract method and endpoint for prompts
-                            method = operation.split("-")[0]
-                            endpoint = "-".join(operation.split("-")[1:])
-                            print(
-                                f"Mapping {param} to {json.dumps(filtered_attr_schema)} in {schema}"
-                            )
+            # Extract corresponding attribute from response (no confirmation
+            # step in naive approach)
+            return True, extract_coresponding_attribute(
+                mapping_attribute_to_schema_response
+            )
+        except Exception as e:
+            print(f"Error: {e}")
+            return False, None
 
-                            # Generate naive mapping prompt (simplified approach)
-                            mapping_attribute_to_schema_prompt = (
-                                NAIVE_PARAMETER_SCHEMA_MAPPING_PROMPT.format(
-                                    method=method.upper(),
-                                    endpoint=endpoint,
-                                    attribute=param,
-                                    description=description,
-                                    schema_specification=json.dumps(
-                                        filtered_attr_schema
-                                    ),
-                                    schema=schema,
-                                    attributes=[attr for attr in filtered_attr_schema],
-                                )
-                            )
+    def _add_found_mapping(self, mapping: FoundMapping) -> None:
+        """
+        Record a found mapping and append it to the checkpoint journal.
 
-                            mapping_attribute_to_schema_response = llm_chat_completion(
-                                mapping_attribute_to_schema_prompt, model="gpt-4-turbo"
-                            )
+        Args:
+            mapping: The mapping to record
 
-                            print("GPT: ", mapping_attribute_to_schema_response)
+        Returns:
+            None
+        """
+        self.found_mappings.append(mapping)
+        self._found_mapping_index.setdefault(mapping.to_tuple()[:3], mapping)
+        if not self.save_and_load:
+            return
+        if self._journal is None:
+            self._journal = open(f"{self.save_path}.jsonl", "ab", buffering=1 << 16)
+        self._journal.write(dumps_json(mapping.to_list(), indent=False) + b"\n")
+
+    def _save_progress(
+        self, outfile: Optional[str] = None, force: bool = False
+    ) -> None:
+        """
+        Flush the found mappings journal and write the output file on an interval.
 
-                            # Extract answer from response
-                            answer = extract_answer(
-                                mapping_attribute_to_schema_response
-                            )
-                            if not "yes" in answer:
-                                self.found_mappings.append(mapping)
-                                continue
+        A new mapping only triggers a write once CHECKPOINT_FLUSH_EVERY mappings
+        or CHECKPOINT_FLUSH_INTERVAL seconds have accumulated since the last one,
+        so an interrupted run loses at most that much progress. Forced writes
+        are also flushed to disk, and consolidate the journal into the
+        checkpoint file.
 
-                            # Extract corresponding attribute from response
-                            corresponding_attribute = extract_coresponding_attribute(
-                                mapping_attribute_to_schema_response
-                            )
+        Args:
+            outfile: Output file to write the mappings to, if any
+            force: Whether to write pending progress immediately
 
-                            # Add mapping to results (no confirmation step in naive approach)
-                            if (
-                                schema
-                                not in self.response_body_input_parameter_mappings
-                            ):
-                                self.response_body_input_parameter_mappings[schema] = {
-                                    corresponding_attribute: [[operation, part, param]]
-                                }
-                            elif (
-                                corresponding_attribute
-                                not in self.response_body_input_parameter_mappings[
-                                    schema
-                                ]
-                            ):
-                                self.response_body_input_parameter_mappings[schema][
-                                    corresponding_attribute
-                                ] = [[operation, part, param]]
-                            else:
-                                self.response_body_input_parameter_mappings[schema][
-                                    corresponding_attribute
-                                ].append([operation, part, param])
-
-                            # Update mapping and save
-                            mapping.corresponding_attribute = corresponding_attribute
-                            self.found_mappings.append(mapping)
-
-                            if self.save_and_load:
-                                with open(self.save_path, "w") as file:
-                                    json.dump(
-                                        [m.to_list() for m in self.found_mappings], file
-                                    )
+        Returns:
+            None
+        """
+        if not force:
+            self._unsaved_mappings += 1
+            if (
+                self._unsaved_mappings < CHECKPOINT_FLUSH_EVERY
+                and time.monotonic() - self._last_save < CHECKPOINT_FLUSH_INTERVAL
+            ):
+                return
+
+        if self._journal is not None:
+            self._journal.flush()
+            if force:
+                os.fsync(self._journal.fileno())
+                self._journal.close()
+                self._journal = None
+                consolidate_checkpoint(
+                    self.save_path, [m.to_list() for m in self.found_mappings]
+                )
+        if outfile and self._unsaved_mappings:
+            dump_json_file(
+                self.response_body_input_parameter_mappings, outfile, fsync=force
+            )
 
-                    except Exception as e:
-                        print(f"Error: {e}")
-                        continue
+        self._unsaved_mappings = 0
+        self._last_save = time.monotonic()
 
     def get_mappings(self) -> Dict[str, Dict[str, List[List[str]]]]:
         """
@@ -771,5 +1105,4 @@ class ParameterResponseMapper:
         if not file_path:
             raise ValueError("No output path specified")
 
-        with open(file_path, "w") as f:
-            json.dump(self.response_body_input_parameter_mappings, f, indent=2)
+        dump_json_file(self.response_body_input_parameter_mappings, file_path)
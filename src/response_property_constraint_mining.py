@@ -9,7 +9,6 @@ response properties must satisfy.
 """
 
 import os
-import json
 from dotenv import load_dotenv
 import openai
 from response_body_verification import ConstraintExtractor
@@ -17,6 +16,7 @@ from response_body_verification import ConstraintExtractor
 from utils import (
     load_openapi,
     load_file_lines,
+    dump_json_file,
     convert_json_to_excel_response_property_constraints,
 )
 
@@ -81,6 +81,7 @@ def main() -> None:
                 openapi_path,
                 save_and_load=False,
                 list_of_operations=selected_operations,
+                openapi_spec=openapi_spec,
             )
             constraint_extractor.get_inside_response_body_constraints(
                 outfile=outfile, selected_schemas=selected_schemas
@@ -88,15 +89,12 @@ def main() -> None:
         else:
             # Default handling for other services
             constraint_extractor = ConstraintExtractor(
-                openapi_path, save_and_load=False
+                openapi_path, save_and_load=False, openapi_spec=openapi_spec
             )
             constraint_extractor.get_inside_response_body_constraints(outfile=outfile)
 
         # Save extracted constraints to JSON file
-        with open(outfile, "w") as f:
-            json.dump(
-                constraint_extractor.inside_response_body_constraints, f, indent=2
-            )
+        dump_json_file(constraint_extractor.inside_response_body_constraints, outfile)
 
         # Convert JSON results to Excel format
         convert_json_to_excel_response_property_constraints(
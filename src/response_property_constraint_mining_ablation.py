@@ -9,12 +9,11 @@ with the main approach.
 """
 
 import os
-import json
 from dotenv import load_dotenv
 import openai
 from response_body_verification import ConstraintExtractor
 
-from utils import load_openapi, load_file_lines
+from utils import load_openapi, load_file_lines, dump_json_file
 
 # Load environment variables and set up OpenAI API
 load_dotenv()
@@ -82,30 +81,29 @@ def main() -> None:
                 openapi_path,
                 save_and_load=False,
                 list_of_operations=selected_operations,
+                openapi_spec=openapi_spec,
             )
             # Use naive approach for constraint extraction
             constraint_extractor.get_inside_response_body_constraints_naive(
                 outfile=outfile, selected_schemas=selected_schemas
             )
             # Save extracted constraints to JSON file
-            with open(outfile, "w") as f:
-                json.dump(
-                    constraint_extractor.inside_response_body_constraints, f, indent=2
-                )
+            dump_json_file(
+                constraint_extractor.inside_response_body_constraints, outfile
+            )
         else:
             # Default handling for other services
             constraint_extractor = ConstraintExtractor(
-                openapi_path, save_and_load=False
+                openapi_path, save_and_load=False, openapi_spec=openapi_spec
             )
             # Use naive approach for constraint extraction
             constraint_extractor.get_inside_response_body_constraints_naive(
                 outfile=outfile
             )
             # Save extracted constraints to JSON file
-            with open(outfile, "w") as f:
-                json.dump(
-                    constraint_extractor.inside_response_body_constraints, f, indent=2
-                )
+            dump_json_file(
+                constraint_extractor.inside_response_body_constraints, outfile
+            )
 
 
 if __name__ == "__main__":
@@ -25,6 +25,7 @@ from .text_extraction import (
     extract_dict_attributes,
     extract_python_code,
     extract_answer,
+    extract_combined_answer,
     extract_summary_constraint,
     extract_idl,
     extract_coresponding_attribute,
@@ -38,12 +39,19 @@ from .schema_utils import (
     standardize_string,
     get_data_type,
     filter_attributes_in_schema_by_data_type,
+    get_data_types_in_schema,
     verify_attribute_in_schema,
     find_common_fields,
 )
 
 from .common import load_file_lines
 
+# Import JSON utilities
+from .json_utils import dumps_json, loads_json, dump_json_file, load_json_file
+
+# Import prompt utilities
+from .prompt_utils import compile_prompt
+
 # Import Excel utilities
 from .excel_utils import (
     convert_json_to_excel_response_property_constraints,
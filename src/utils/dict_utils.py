@@ -7,7 +7,7 @@ This module provides functions to find paths to specific keys or key-value pairs
 in nested dictionaries, and filter dictionaries based on those paths.
 """
 
-from typing import Dict, List, Any, Optional, TypeVar, Union
+from typing import Callable, Dict, List, Any, Optional, Tuple, TypeVar, Union
 from pydantic import BaseModel, Field
 import json
 
@@ -49,6 +49,45 @@ class FilterResult(BaseModel):
     )
 
 
+def _find_path(
+    d: JsonDict, target_key: str, is_match: Callable[[JsonDict], bool]
+) -> Optional[PathList]:
+    """
+    Find the path to the target key in the first nested dictionary that matches.
+
+    Dictionaries are visited depth-first in key order, each before its children,
+    with an explicit stack so deep documents cannot exceed the recursion limit.
+    Stack entries carry their path as a tuple and only the match builds a list.
+
+    Args:
+        d: The dictionary to search in
+        target_key: The key that ends the returned path
+        is_match: Predicate telling whether a dictionary holds the target
+
+    Returns:
+        A list representing the path to the target key, or None if not found
+    """
+    stack: List[Tuple[JsonDict, Tuple[Union[str, int], ...]]] = [(d, ())]
+    while stack:
+        current, path = stack.pop()
+        if is_match(current):
+            return list(path + (target_key,))
+
+        children = []
+        for key, value in current.items():
+            if isinstance(value, dict):
+                children.append((value, path + (key,)))
+            elif isinstance(value, list):
+                children.extend(
+                    (item, path + (key, index))
+                    for index, item in enumerate(value)
+                    if isinstance(item, dict)
+                )
+        # Push in reverse so the first child is visited next
+        stack.extend(reversed(children))
+    return None
+
+
 def find_key_val_path(
     d: JsonDict, target_key: str, target_val: Any
 ) -> Optional[PathList]:
@@ -68,27 +107,15 @@ def find_key_val_path(
         >>> find_key_val_path(data, "c", "value")
         ['a', 'b', 'c']
     """
-    # Check if the target key exists at the current level and contains the target value
-    if (
-        target_key in d
-        and isinstance(d[target_key], (str, list))
-        and target_val in d[target_key]
-    ):
-        return [target_key]
-
-    # Recursively search in nested dictionaries
-    for key, value in d.items():
-        if isinstance(value, dict):
-            path = find_key_val_path(value, target_key, target_val)
-            if path:
-                return [key] + path
-        elif isinstance(value, list):
-            for index, item in enumerate(value):
-                if isinstance(item, dict):
-                    path = find_key_val_path(item, target_key, target_val)
-                    if path:
-                        return [key, index] + path
-    return None
+    # A dictionary matches if the target key holds a string or list containing
+    # the target value
+    return _find_path(
+        d,
+        target_key,
+        lambda current: target_key in current
+        and isinstance(current[target_key], (str, list))
+        and target_val in current[target_key],
+    )
 
 
 def find_key_path(d: JsonDict, target_key: str) -> Optional[PathList]:
@@ -107,23 +134,7 @@ def find_key_path(d: JsonDict, target_key: str) -> Optional[PathList]:
         >>> find_key_path(data, "c")
         ['a', 'b', 'c']
     """
-    # Check if the target key exists at the current level
-    if target_key in d:
-        return [target_key]
-
-    # Recursively search in nested dictionaries
-    for key, value in d.items():
-        if isinstance(value, dict):
-            path = find_key_path(value, target_key)
-            if path:
-                return [key] + path
-        elif isinstance(value, list):
-            for index, item in enumerate(value):
-                if isinstance(item, dict):
-                    path = find_key_path(item, target_key)
-                    if path:
-                        return [key, index] + path
-    return None
+    return _find_path(d, target_key, lambda current: target_key in current)
 
 
 def filter_dict(d: JsonDict, path: PathList) -> Optional[JsonDict]:
@@ -15,6 +15,8 @@ from pathlib import Path
 import pandas as pd
 from pydantic import BaseModel, Field, field_validator
 
+from .json_utils import load_json_file
+
 
 class JsonToExcelConversionInput(BaseModel):
     """Input parameters for JSON to Excel conversion."""
@@ -324,7 +326,7 @@ def convert_json_to_excel_response_property_constraints(
         print(f"File {json_file} does not exist")
         return
 
-    openapi_spec = json.load(open(openapi_spec_file, "r", encoding="utf-8-sig"))
+    openapi_spec = load_json_file(openapi_spec_file)
     simplified_openapi = simplify_openapi(openapi_spec)
     simplified_schemas = get_simplified_schema(openapi_spec)
 
@@ -347,7 +349,7 @@ def convert_json_to_excel_response_property_constraints(
     except:
         selected_schemas = []
 
-    inside_response_body_constraints = json.load(open(json_file, "r"))
+    inside_response_body_constraints = load_json_file(json_file)
 
     data = []
     no_of_constraints = 0
@@ -418,7 +420,7 @@ def convert_json_to_excel_request_response_constraints(
         print(f"File {json_file} does not exist")
         return
 
-    openapi_spec = json.load(open(openapi_spec_file, "r", encoding="utf-8"))
+    openapi_spec = load_json_file(openapi_spec_file)
     simplified_openapi = simplify_openapi(openapi_spec)
     simplified_schemas = get_simplified_schema(openapi_spec)
 
@@ -431,9 +433,7 @@ def convert_json_to_excel_request_response_constraints(
         selected_operations = []
 
     service_name = openapi_spec["info"]["title"]
-    response_body_input_parameter_mappings_with_constraint = json.load(
-        open(json_file, "r")
-    )
+    response_body_input_parameter_mappings_with_constraint = load_json_file(json_file)
 
     data = []
     operations_with_constraint = set()
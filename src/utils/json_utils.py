@@ -0,0 +1,161 @@
+# /src/utils/json_utils.py
+
+"""
+JSON Utilities Module
+
+This module provides fast JSON encoding and decoding helpers. When the optional
+``orjson`` package is installed it is used for both directions; otherwise the
+standard library ``json`` module is used with equivalent settings.
+"""
+
+import json
+import os
+import tempfile
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # orjson is optional
+    orjson = None
+
+# O_CLOEXEC is POSIX-only and O_BINARY Windows-only; use whichever exists
+_WRITE_FLAGS = (
+    os.O_WRONLY
+    | os.O_CREAT
+    | os.O_TRUNC
+    | getattr(os, "O_CLOEXEC", 0)
+    | getattr(os, "O_BINARY", 0)
+)
+
+
+def dumps_json(obj: Any, indent: bool = True) -> bytes:
+    """
+    Serialize an object to UTF-8 encoded JSON.
+
+    Without indentation the output has no whitespace between tokens, with or
+    without orjson, so the same object always serializes to the same bytes.
+
+    Args:
+        obj: The object to serialize
+        indent: Whether to indent the output with two spaces
+
+    Returns:
+        The JSON document as bytes
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def loads_json(data: Union[str, bytes]) -> Any:
+    """
+    Parse a JSON document.
+
+    Args:
+        data: The JSON document as text or bytes
+
+    Returns:
+        The parsed object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dump_json_file(
+    obj: Any,
+    file_path: str,
+    indent: bool = True,
+    fsync: bool = False,
+    atomic: bool = False,
+) -> None:
+    """
+    Write an object to a JSON file.
+
+    Args:
+        obj: The object to serialize
+        file_path: Path of the file to write
+        indent: Whether to indent the output with two spaces
+        fsync: Whether to flush the file to disk before returning; always
+            done when ``atomic`` is set
+        atomic: Whether to write a temporary file, flush it to disk and move it
+            into place, so the file never holds a partial document
+
+    Returns:
+        None
+    """
+    payload = dumps_json(obj, indent=indent)
+
+    if not atomic:
+        fd = os.open(file_path, _WRITE_FLAGS, 0o644)
+        try:
+            _write_all(fd, payload, fsync)
+        finally:
+            os.close(fd)
+        return
+
+    # A uniquely named temporary file in the same directory, so concurrent
+    # writers never share one; it is flushed to disk before the rename so the
+    # rename can never become durable ahead of the data
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f"{os.path.basename(file_path)}.",
+        suffix=".tmp",
+        dir=os.path.dirname(file_path) or ".",
+    )
+    try:
+        try:
+            os.chmod(tmp_path, 0o644)
+            _write_all(fd, payload, fsync=True)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _write_all(fd: int, payload: bytes, fsync: bool) -> None:
+    """
+    Write a payload to a file descriptor in full.
+
+    The payload is a single bytes object, so it is written straight to the file
+    descriptor instead of going through a buffered file object.
+
+    Args:
+        fd: The open file descriptor
+        payload: The bytes to write
+        fsync: Whether to flush the file to disk afterwards
+
+    Returns:
+        None
+    """
+    view = memoryview(payload)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+    if fsync:
+        os.fsync(fd)
+
+
+def load_json_file(file_path: str) -> Any:
+    """
+    Read and parse a JSON file.
+
+    A UTF-8 byte order mark at the start of the file is ignored.
+
+    Args:
+        file_path: Path of the file to read
+
+    Returns:
+        The parsed object
+    """
+    with open(file_path, "rb") as f:
+        data = f.read()
+    if data.startswith(b"\xef\xbb\xbf"):
+        data = data[3:]
+    return loads_json(data)
@@ -8,10 +8,26 @@ processing responses, and managing a local cache of previous interactions.
 """
 
 import json
-import uuid
 import os
-from typing import Optional, Literal, Dict, Any, List, Union
-from hashlib import md5
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import (
+    Optional,
+    Literal,
+    Dict,
+    Any,
+    List,
+    Union,
+    Callable,
+    Sequence,
+    Iterator,
+    Tuple,
+)
+from functools import lru_cache
+from hashlib import md5, sha256
 import logging
 from datetime import datetime
 from pathlib import Path
@@ -20,12 +36,28 @@ import abc
 import openai
 from pydantic import BaseModel, Field, field_validator
 
+from .json_utils import load_json_file
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken is optional; token counts are estimated without it
+    tiktoken = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 logger = logging.getLogger(__name__)
 
+# Upper bound on LLM requests in flight at once when fanning out prompts
+LLM_MAX_CONCURRENCY = 16
+
+# Number of responses kept in memory in front of the on-disk response cache
+LLM_MEMO_MAX_ENTRIES = 4096
+
+# Environment variable overriding the directory of the LLM response cache
+LLM_CACHE_DIR_ENV = "RBCTEST_LLM_CACHE_DIR"
+
 
 class ChatMessage(BaseModel):
     """Representation of a message in a chat conversation."""
@@ -382,32 +414,161 @@ def post_processing(response: str) -> str:
     return response.split("```groovy")[1].split("```")[0]
 
 
+# Directory set with set_storage_path, taking precedence over LLM_CACHE_DIR_ENV
+_storage_dir: Optional[Path] = None
+
+
+def set_storage_path(path: Union[str, Path, None]) -> None:
+    """
+    Set the directory of the LLM response cache for this process.
+
+    Args:
+        path: The cache directory, or None to use the default again
+
+    Returns:
+        None
+    """
+    global _storage_dir, _legacy_index
+    with _legacy_index_lock:
+        _storage_dir = Path(path) if path is not None else None
+        # The legacy index and remembered responses belong to the previous
+        # directory
+        _legacy_index = None
+    with _response_memo_lock:
+        _response_memo.clear()
+
+
 def get_storage_path() -> Path:
     """
     Get the path to the LLM response storage directory.
 
+    The directory is the one given to set_storage_path, else the one named by
+    the RBCTEST_LLM_CACHE_DIR environment variable, else ``gpt_response``.
+
     Returns:
         Path object pointing to the storage directory
 
     Note:
         Creates the directory if it doesn't exist
     """
-    storage_dir = Path("gpt_response")
-    storage_dir.mkdir(exist_ok=True)
+    storage_dir = _storage_dir or Path(os.getenv(LLM_CACHE_DIR_ENV, "gpt_response"))
+    storage_dir.mkdir(parents=True, exist_ok=True)
     return storage_dir
 
 
+def _cache_key(
+    prompt: str, model: str, system: str = "", temperature: Optional[float] = None
+) -> str:
+    """
+    Content address of a cached response.
+
+    Args:
+        prompt: The user's prompt
+        model: The model name
+        system: The system message
+        temperature: The sampling temperature, if known
+
+    Returns:
+        SHA-256 hex digest of the model, system message, temperature and prompt
+    """
+    return sha256(
+        f"{model}\0{system}\0{temperature!r}\0{prompt}".encode("utf-8")
+    ).hexdigest()
+
+
+# Responses read from or written to the cache in this process, by cache key,
+# least recently used first
+_response_memo: "OrderedDict[str, str]" = OrderedDict()
+_response_memo_lock = threading.Lock()
+
+
+def _remember_response(key: str, response: str) -> None:
+    """
+    Keep a cached response in memory, evicting the least recently used one.
+
+    Args:
+        key: The cache key of the response
+        response: The response text
+
+    Returns:
+        None
+    """
+    with _response_memo_lock:
+        _response_memo[key] = response
+        _response_memo.move_to_end(key)
+        if len(_response_memo) > LLM_MEMO_MAX_ENTRIES:
+            _response_memo.popitem(last=False)
+
+
+def _recall_response(key: str) -> Optional[str]:
+    """
+    Get a response kept in memory by _remember_response.
+
+    Args:
+        key: The cache key of the response
+
+    Returns:
+        The response text, or None if it is not in memory
+    """
+    with _response_memo_lock:
+        response = _response_memo.get(key)
+        if response is not None:
+            _response_memo.move_to_end(key)
+        return response
+
+
+# Responses stored by older versions live in uuid-named files that can only be
+# matched by reading them; they are indexed by prompt hash on first use
+_legacy_index: Optional[Dict[str, Path]] = None
+_legacy_index_lock = threading.Lock()
+
+
+def _legacy_response_index() -> Dict[str, Path]:
+    """
+    Index the uuid-named cache files by prompt hash, scanning the directory once.
+
+    Returns:
+        Dictionary mapping MD5 prompt hashes to cache file paths
+    """
+    global _legacy_index
+    with _legacy_index_lock:
+        if _legacy_index is None:
+            index: Dict[str, Path] = {}
+            # uuid names contain dashes, content-addressed names do not
+            for file_path in get_storage_path().glob("api_response_*-*.json"):
+                try:
+                    prompt_hash = load_json_file(file_path)["prompt_hash"]
+                    index.setdefault(prompt_hash, file_path)
+                except (json.JSONDecodeError, KeyError) as e:
+                    logging.warning(
+                        f"Error reading cached response file {file_path}: {e}"
+                    )
+            _legacy_index = index
+    return _legacy_index
+
+
 def store_response(
-    prompt: str, response: str, model: str = "unknown", provider: str = "unknown"
+    prompt: str,
+    response: str,
+    model: str = "unknown",
+    provider: str = "unknown",
+    system: str = "",
+    temperature: Optional[float] = None,
 ) -> Path:
     """
     Store a prompt and its response to a JSON file for future retrieval.
 
+    The file is named after the SHA-256 of the model, system message,
+    temperature and prompt, so a later lookup opens it directly instead of
+    scanning the cache directory.
+
     Args:
         prompt: The user's original prompt
         response: The model's response to be stored
         model: The model name that generated the response
         provider: The provider that generated the response
+        system: The system message sent with the prompt
+        temperature: The sampling temperature of the request
 
     Returns:
         Path to the stored response file
@@ -416,7 +577,6 @@ def store_response(
         >>> file_path = store_response("Hello", "Hi there!", "gpt-4-turbo", "openai")
         >>> print(f"Response stored in {file_path}")
     """
-    uuid_str = str(uuid.uuid4())
     storage_dir = get_storage_path()
 
     stored_data = StoredResponse(
@@ -427,40 +587,71 @@ def store_response(
         provider=provider,
     )
 
-    file_path = storage_dir / f"api_response_{uuid_str}.json"
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(stored_data.model_dump_json(indent=2))
+    key = _cache_key(prompt, model, system, temperature)
+    file_path = storage_dir / f"api_response_{key}.json"
+    # Write to a uniquely named temporary file first so concurrent readers never
+    # see a partial file and concurrent writers, in any process, never share one
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f"{file_path.name}.", suffix=".tmp", dir=storage_dir
+    )
+    try:
+        with open(fd, "w", encoding="utf-8") as f:
+            f.write(stored_data.model_dump_json(indent=2))
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    _remember_response(key, response)
 
     return file_path
 
 
-def find_previous_response(prompt: str) -> Optional[str]:
+def find_previous_response(
+    prompt: str,
+    model: Optional[str] = None,
+    system: str = "",
+    temperature: Optional[float] = None,
+) -> Optional[str]:
     """
     Find a previously stored response for a given prompt.
 
     Args:
         prompt: The prompt to search for
+        model: The model the response must come from; responses stored by
+            older versions match on the prompt alone
+        system: The system message the response must have been generated with
+        temperature: The sampling temperature the response must have been
+            generated with
 
     Returns:
         The previously stored response if found, None otherwise
 
     Examples:
-        >>> response = find_previous_response("What is Python?")
+        >>> response = find_previous_response("What is Python?", "gpt-4-turbo")
         >>> if response:
         ...     print("Found cached response")
     """
-    prompt_hash = md5(prompt.encode()).hexdigest()
-    storage_dir = get_storage_path()
-
-    if not storage_dir.exists():
-        return None
-
-    for file_path in storage_dir.glob("api_response_*.json"):
+    key = None
+    file_paths = []
+    if model is not None:
+        key = _cache_key(prompt, model, system, temperature)
+        # Repeated prompts within a run are answered without touching the disk
+        response = _recall_response(key)
+        if response is not None:
+            return response
+        file_paths.append(get_storage_path() / f"api_response_{key}.json")
+    legacy_path = _legacy_response_index().get(md5(prompt.encode()).hexdigest())
+    if legacy_path is not None:
+        file_paths.append(legacy_path)
+
+    for file_path in file_paths:
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                if data.get("prompt_hash") == prompt_hash:
-                    return data["response"]
+            response = load_json_file(file_path)["response"]
+            if key is not None and response:
+                _remember_response(key, response)
+            return response
+        except FileNotFoundError:
+            continue
         except (json.JSONDecodeError, KeyError) as e:
             logging.warning(f"Error reading cached response file {file_path}: {e}")
 
@@ -513,7 +704,9 @@ def llm_chat_completion(
     )
 
     # Check cache for previous identical prompt
-    previous_response = find_previous_response(request.prompt)
+    previous_response = find_previous_response(
+        request.prompt, request.model, request.system, request.temperature
+    )
     if previous_response:
         logging.info(f"Using cached response for prompt: {prompt[:50]}...")
         return previous_response
@@ -549,7 +742,7 @@ def llm_chat_completion(
 
             # Extract and store the response
             response_text = response.choices[0].message.content
-            store_response(prompt, response_text, model, "openai")
+            store_response(prompt, response_text, model, "openai", system, temperature)
             return response_text
         except Exception as e:
             # If OpenAI call fails, try the new architecture as fallback
@@ -563,7 +756,14 @@ def llm_chat_completion(
         if response_text:
             # Store the successful response
             effective_provider = provider or LLMClient._default_provider
-            store_response(prompt, response_text, model, effective_provider)
+            store_response(
+                prompt,
+                response_text,
+                model,
+                effective_provider,
+                system,
+                temperature,
+            )
 
         return response_text
     except Exception as e:
@@ -571,6 +771,188 @@ def llm_chat_completion(
         return None
 
 
+def llm_chat_completion_with_retry(
+    prompt: str, attempts: int = 3, backoff: float = 1.0, **kwargs: Any
+) -> Optional[str]:
+    """
+    Call llm_chat_completion, retrying failed requests with exponential backoff.
+
+    Args:
+        prompt: The user's prompt to send to the model
+        attempts: Maximum number of attempts
+        backoff: Delay in seconds before the first retry; doubled after each attempt
+        **kwargs: Further arguments passed to llm_chat_completion
+
+    Returns:
+        The model's response text, or None if every attempt failed
+    """
+    for attempt in range(attempts):
+        response = llm_chat_completion(prompt, **kwargs)
+        if response is not None:
+            return response
+        if attempt + 1 < attempts:
+            time.sleep(backoff * 2**attempt)
+    return None
+
+
+# Limit set with set_llm_max_concurrency, taking precedence over LLM_MAX_CONCURRENCY
+_max_concurrency: Optional[int] = None
+
+
+def set_llm_max_concurrency(limit: Optional[int]) -> None:
+    """
+    Set how many LLM tasks run_llm_tasks runs at once in this process.
+
+    Programs that run several worker processes use this to share one overall
+    request budget between them.
+
+    Args:
+        limit: Maximum number of tasks running at once, or None to use
+            LLM_MAX_CONCURRENCY again
+
+    Returns:
+        None
+
+    Raises:
+        ValueError: If the limit is smaller than one
+    """
+    global _max_concurrency
+    if limit is not None and limit < 1:
+        raise ValueError(f"LLM concurrency limit must be at least 1, got {limit}")
+    _max_concurrency = limit
+
+
+def run_llm_tasks(
+    task: Callable[[Any], Any],
+    items: Sequence[Any],
+    max_workers: Optional[int] = None,
+) -> List[Any]:
+    """
+    Run independent LLM-bound tasks concurrently.
+
+    The calls spend nearly all their time waiting on the network, so a thread
+    pool bounded by ``max_workers`` overlaps them without changing callers
+    that use the synchronous client.
+
+    Args:
+        task: Function applied to each item
+        items: The work items
+        max_workers: Maximum number of tasks running at once; defaults to the
+            limit set with set_llm_max_concurrency, or LLM_MAX_CONCURRENCY
+
+    Returns:
+        The task results, in the same order as ``items``
+    """
+    if not items:
+        return []
+    if max_workers is None:
+        max_workers = _max_concurrency or LLM_MAX_CONCURRENCY
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(task, items))
+
+
+def iter_llm_tasks(
+    task: Callable[[Any], Any],
+    items: Sequence[Any],
+    max_workers: Optional[int] = None,
+) -> Iterator[Tuple[int, Any]]:
+    """
+    Run independent LLM-bound tasks concurrently, yielding each as it completes.
+
+    Unlike run_llm_tasks, the caller can record every result on its own thread
+    as soon as it arrives, so an interrupted run keeps the finished ones. Tasks
+    not started yet are cancelled when the caller stops iterating.
+
+    Args:
+        task: Function applied to each item
+        items: The work items
+        max_workers: Maximum number of tasks running at once; defaults to the
+            limit set with set_llm_max_concurrency, or LLM_MAX_CONCURRENCY
+
+    Yields:
+        (index, result) pairs, in completion order; index is the item's
+        position in ``items``
+    """
+    if not items:
+        return
+    if max_workers is None:
+        max_workers = _max_concurrency or LLM_MAX_CONCURRENCY
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(items)))
+    try:
+        futures = {
+            executor.submit(task, item): index for index, item in enumerate(items)
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model: str) -> Any:
+    """Load the tiktoken encoding for a model once."""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: str = "gpt-4-turbo") -> int:
+    """
+    Count the prompt tokens of a text.
+
+    Uses tiktoken when installed, otherwise estimates four characters per token.
+
+    Args:
+        text: The text to measure
+        model: The model whose tokenizer to use
+
+    Returns:
+        The number of tokens
+    """
+    if tiktoken is None:
+        return len(text) // 4 + 1
+    return len(_get_encoding(model).encode(text))
+
+
+def batch_by_tokens(
+    items: Sequence[Any],
+    to_text: Callable[[Any], str],
+    max_tokens: int,
+    max_items: int,
+    model: str = "gpt-4-turbo",
+) -> List[List[Any]]:
+    """
+    Split items into consecutive batches that fit a prompt token budget.
+
+    An item larger than ``max_tokens`` on its own still gets a batch.
+
+    Args:
+        items: The items to split
+        to_text: Function rendering an item as it appears in the prompt
+        max_tokens: Maximum tokens of rendered items per batch
+        max_items: Maximum number of items per batch
+        model: The model whose tokenizer to use
+
+    Returns:
+        List of batches, preserving the order of ``items``
+    """
+    batches: List[List[Any]] = []
+    batch_tokens = 0
+    for item in items:
+        tokens = count_tokens(to_text(item), model)
+        if (
+            not batches
+            or batch_tokens + tokens > max_tokens
+            or len(batches[-1]) >= max_items
+        ):
+            batches.append([])
+            batch_tokens = 0
+        batches[-1].append(item)
+        batch_tokens += tokens
+    return batches
+
+
 def main():
     """
     Demonstrate the functionality of the LLM module.
@@ -611,7 +993,7 @@ def main():
 
     # Example 2: Finding a cached response
     print("\n2. Finding Cached Response")
-    cached_response = find_previous_response(mock_prompt)
+    cached_response = find_previous_response(mock_prompt, "mock-gpt-4")
     if cached_response:
         print(f"Found cached response: '{cached_response[:50]}...'")
     else:
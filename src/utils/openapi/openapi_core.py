@@ -9,8 +9,16 @@ This module provides fundamental functions for loading and parsing OpenAPI speci
 import os
 import json
 import yaml
+from functools import lru_cache
 from typing import Dict, List, Any, Optional, Union
 
+from ..json_utils import loads_json
+
+try:
+    _YAML_LOADER = yaml.CSafeLoader
+except AttributeError:  # PyYAML built without libyaml
+    _YAML_LOADER = yaml.SafeLoader
+
 
 def ruler() -> None:
     """Print a horizontal ruler line of dashes to the console."""
@@ -70,40 +78,65 @@ def is_success_status_code(x: Union[int, str]) -> bool:
     return False
 
 
-def load_openapi(path: str) -> Optional[Dict[str, Any]]:
+@lru_cache(maxsize=16)
+def _load_openapi_cached(
+    path: str, mtime_ns: int, size: int
+) -> Optional[Dict[str, Any]]:
     """
-    Load an OpenAPI specification from a file.
+    Parse an OpenAPI specification file, memoized on its path and stat info.
 
-    Supports both YAML and JSON formats.
+    The modification time and size are part of the cache key so that an
+    edited file is parsed again.
 
     Args:
         path: Path to the OpenAPI specification file
+        mtime_ns: Modification time of the file in nanoseconds
+        size: Size of the file in bytes
 
     Returns:
         Parsed OpenAPI specification as a dictionary or None if loading fails
     """
-    # Check if file exists
-    if not os.path.exists(path):
-        print(f"File {path} is not existed")
-        return None
-
     if path.endswith(".yml") or path.endswith(".yaml"):
-        # Read YAML file
-        with open(path, "r") as stream:
+        # Read YAML file with the libyaml C loader when it is available
+        with open(path, "rb") as stream:
             try:
-                return yaml.safe_load(stream)
+                return yaml.load(stream, Loader=_YAML_LOADER)
             except yaml.YAMLError as exc:
                 print(exc)
+                return None
 
     elif path.endswith(".json"):
         # Read JSON file
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(path, "rb") as f:
+            return loads_json(f.read())
     else:
         print(f"File {path} is not supported. Must be in YAML or JSON format.")
         return None
 
 
+def load_openapi(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Load an OpenAPI specification from a file.
+
+    Supports both YAML and JSON formats. Parsed specifications are cached, so
+    loading the same unchanged file again returns the same dictionary; callers
+    must treat it as read-only (``copy.deepcopy`` it before modifying).
+
+    Args:
+        path: Path to the OpenAPI specification file
+
+    Returns:
+        Parsed OpenAPI specification as a dictionary or None if loading fails
+    """
+    # Check if file exists
+    if not os.path.exists(path):
+        print(f"File {path} is not existed")
+        return None
+
+    stat = os.stat(path)
+    return _load_openapi_cached(path, stat.st_mtime_ns, stat.st_size)
+
+
 def get_ref(spec: Dict[str, Any], ref: str) -> Dict[str, Any]:
     """
     Resolve a JSON reference in an OpenAPI specification.
@@ -681,7 +681,9 @@ def get_relevant_schema_of_operation(
     return list(set(relevant_schemas))
 
 
-def simplify_openapi(openapi: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+def simplify_openapi(
+    openapi: Dict[str, Any], operations: Optional[List[str]] = None
+) -> Dict[str, Dict[str, Any]]:
     """
     Create a simplified version of an OpenAPI specification.
 
@@ -690,11 +692,18 @@ def simplify_openapi(openapi: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
 
     Args:
         openapi: OpenAPI specification dictionary
+        operations: Optional list of operations (e.g. "get-/users") to simplify;
+            if None, all operations are simplified. Unknown operations are ignored.
 
     Returns:
         Simplified OpenAPI specification
     """
-    operations = extract_operations(openapi)
+    if operations is None:
+        operations = extract_operations(openapi)
+    else:
+        # Only simplify the requested operations, keeping the spec order
+        wanted = set(operations)
+        operations = [op for op in extract_operations(openapi) if op in wanted]
     simple_openapi = {}
 
     for operation in operations:
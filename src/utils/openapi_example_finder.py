@@ -11,6 +11,7 @@ from pathlib import Path
 from models.example_models import (
     ExampleSearchOptions,
     ExampleSearchResult,
+    ExampleSource,
 )
 
 # Type variables for recursive functions
@@ -166,7 +167,7 @@ class OpenAPIExampleFinder:
             object_name=object_name,
             field_name=field_name,
             example_value=None,
-            source="none",
+            source=ExampleSource.NONE,
             found=False,
         )
 
@@ -177,7 +178,7 @@ class OpenAPIExampleFinder:
             )
             if example_value is not None:
                 result.example_value = example_value
-                result.source = "components"
+                result.source = ExampleSource.COMPONENTS
                 result.found = True
                 return result
 
@@ -188,7 +189,7 @@ class OpenAPIExampleFinder:
             )
             if example_value is not None:
                 result.example_value = example_value
-                result.source = "definitions"
+                result.source = ExampleSource.DEFINITIONS
                 result.found = True
                 return result
 
@@ -199,7 +200,7 @@ class OpenAPIExampleFinder:
             )
             if example_value is not None:
                 result.example_value = example_value
-                result.source = "brute_force"
+                result.source = ExampleSource.BRUTE_FORCE
                 result.found = True
                 return result
 
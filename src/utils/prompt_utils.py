@@ -0,0 +1,63 @@
+# /src/utils/prompt_utils.py
+
+"""
+Prompt Utilities Module
+
+This module compiles prompt templates into plain Python functions, so prompts
+built inside the inference loops do not re-parse their template on every call.
+"""
+
+from string import Formatter
+from typing import Callable, List
+
+
+def compile_prompt(template: str) -> Callable[..., str]:
+    """
+    Compile a ``str.format`` prompt template into a rendering function.
+
+    The template is parsed once and turned into a function whose body is a
+    single f-string, taking every template field as an optional keyword
+    argument. Missing fields render as an empty string, and extra keyword
+    arguments are ignored, as with ``str.format``.
+
+    Args:
+        template: Prompt template using ``{field}`` placeholders
+
+    Returns:
+        Function rendering the template from keyword arguments
+
+    Raises:
+        ValueError: If a field is not a plain identifier or uses a conversion
+            or format spec
+
+    Examples:
+        >>> render = compile_prompt("name: {attribute}, type: {data_type}")
+        >>> render(attribute="id", data_type="string")
+        'name: id, type: string'
+    """
+    namespace = {}
+    fields: List[str] = []
+    pieces: List[str] = []
+
+    for index, (literal, field, spec, conversion) in enumerate(
+        Formatter().parse(template)
+    ):
+        if literal:
+            # Literal text is passed in as a constant so it needs no escaping
+            namespace[f"_literal_{index}"] = literal
+            pieces.append(f"{{_literal_{index}}}")
+        if field is None:
+            continue
+        if not field.isidentifier() or spec or conversion:
+            raise ValueError(f"Unsupported prompt template field: {{{field}}}")
+        if field not in fields:
+            fields.append(field)
+        pieces.append(f"{{{field}}}")
+
+    params = "".join(f"{field}='', " for field in fields)
+    if fields:
+        params = "*, " + params
+    body = "".join(pieces)
+    source = f"def render({params}**_unused):\n    return f'{body}'\n"
+    exec(source, namespace)
+    return namespace["render"]
@@ -65,18 +65,17 @@ def filter_attributes_in_schema_by_data_type(
     if not schema_spec:
         return {}
 
-    # Handle dictionary case
+    # Handle dictionary case; matching strings are shared with the input rather
+    # than copied, since they are immutable
     if isinstance(schema_spec, dict):
-        specification = copy.deepcopy(schema_spec)
+        specification = {}
         for attribute, value in schema_spec.items():
             if isinstance(value, dict):
                 filtered_value = filter_attributes_in_schema_by_data_type(
                     value, filtering_data_type
                 )
-                if not filtered_value:
-                    del specification[attribute]
-                    continue
-                specification[attribute] = filtered_value
+                if filtered_value:
+                    specification[attribute] = filtered_value
             elif isinstance(value, list):
                 filtered_value = (
                     filter_attributes_in_schema_by_data_type(
@@ -85,28 +84,64 @@ def filter_attributes_in_schema_by_data_type(
                     if value
                     else {}
                 )
-                if not filtered_value:
-                    del specification[attribute]
-                    continue
-                specification[attribute] = [filtered_value]
+                if filtered_value:
+                    specification[attribute] = [filtered_value]
             elif isinstance(value, str):
                 data_type = value.split("(description:")[0].strip()
-                if data_type != filtering_data_type:
-                    del specification[attribute]
+                if data_type == filtering_data_type:
+                    specification[attribute] = value
+            else:
+                specification[attribute] = copy.deepcopy(value)
         return specification
 
     # Handle list case
     if isinstance(schema_spec, list) and schema_spec:
-        return [
+        filtered_items = (
             filter_attributes_in_schema_by_data_type(item, filtering_data_type)
             for item in schema_spec
-            if filter_attributes_in_schema_by_data_type(item, filtering_data_type)
-        ]
+        )
+        return [item for item in filtered_items if item]
 
     # Default case
     return {}
 
 
+def get_data_types_in_schema(
+    schema_spec: Union[Dict[str, Any], List[Any], str],
+) -> Set[str]:
+    """
+    Collect the data types that filter_attributes_in_schema_by_data_type can keep.
+
+    Filtering a schema by a data type outside this set always gives an empty
+    result, so callers can skip the filter for it.
+
+    Args:
+        schema_spec: Schema specification (can be dict, list, or string)
+
+    Returns:
+        Set of the data types of the schema's attributes
+
+    Examples:
+        >>> sorted(get_data_types_in_schema({"id": "string (description: ...)"}))
+        ['string']
+    """
+    if isinstance(schema_spec, str):
+        return {schema_spec.split("(description:")[0].strip()}
+
+    data_types: Set[str] = set()
+    if isinstance(schema_spec, dict):
+        for value in schema_spec.values():
+            if isinstance(value, list):
+                # Only the first item of a nested list is kept by the filter
+                value = value[0] if value else None
+            if isinstance(value, (dict, str)):
+                data_types |= get_data_types_in_schema(value)
+    elif isinstance(schema_spec, list):
+        for item in schema_spec:
+            data_types |= get_data_types_in_schema(item)
+    return data_types
+
+
 def verify_attribute_in_schema(
     schema_spec: Union[Dict[str, Any], List[Any], str], attribute: str
 ) -> bool:
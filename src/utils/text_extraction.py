@@ -193,6 +193,76 @@ def extract_answer(response: Optional[str]) -> Optional[str]:
         return response.lower()
 
 
+_COMBINED_ANSWER_RE = re.compile(r"ANSWER:\s*`?\s*(yes|no)\b", re.IGNORECASE)
+
+
+def extract_combined_answer(response: Optional[str]) -> Optional[str]:
+    """
+    Extract the final yes/no verdict of a combined observation prompt.
+
+    The verdict is taken from the last ``ANSWER: yes`` or ``ANSWER: no`` line,
+    so an observation that quotes the answer format does not affect it. Responses
+    without such a line fall back to extract_answer.
+
+    Args:
+        response: String containing an observation followed by an answer line
+
+    Returns:
+        "yes" or "no", the extract_answer result if no answer line is found, or
+        None if the response is None
+
+    Examples:
+        >>> extract_combined_answer("The value must be positive.\\nANSWER: Yes")
+        'yes'
+    """
+    if response is None:
+        return None
+
+    matches = _COMBINED_ANSWER_RE.findall(response)
+    if matches:
+        return matches[-1].lower()
+    return extract_answer(response)
+
+
+_ATTRIBUTE_LINE_RE = re.compile(r"^ATTRIBUTE:\s*`?\s*(.*?)\s*`?\s*$", re.MULTILINE)
+
+
+def extract_coresponding_attribute(response: Optional[str]) -> Optional[str]:
+    """
+    Extract the corresponding attribute named in a parameter mapping response.
+
+    The attribute is taken from the last ``ATTRIBUTE: <name>`` line, or else from
+    the ```corresponding attribute block. Quotes around the name are removed.
+
+    Args:
+        response: String containing the parameter mapping answer
+
+    Returns:
+        The attribute name, or None if the response is None, names no attribute
+        or answers "none"
+
+    Examples:
+        >>> extract_coresponding_attribute("ANSWER: yes\\nATTRIBUTE: customer_id")
+        'customer_id'
+    """
+    if response is None:
+        return None
+
+    matches = _ATTRIBUTE_LINE_RE.findall(response)
+    attribute = (
+        matches[-1]
+        if matches
+        else extract_structured_field(response, "corresponding attribute")
+    )
+    if attribute is None:
+        return None
+
+    attribute = attribute.strip().strip("\"'")
+    if not attribute or attribute.lower() in ("none", "null"):
+        return None
+    return attribute
+
+
 def extract_summary_constraint(response: Optional[str]) -> Optional[str]:
     """
     Extract a constraint summary from a response string.
@@ -45,7 +45,8 @@ class ExampleVerifier:
             config: Configuration for the verifier
         """
         self.config = config
-        self.result = VerifierResult()
+        self.total_constraints = 0
+        self.examples_found = 0
 
     def process_apis(self) -> VerifierResult:
         """
@@ -64,15 +65,20 @@ class ExampleVerifier:
         logger.info(f"Found {len(api_folders)} APIs to process")
 
         # Process each API
+        apis_processed: List[str] = []
         for api in api_folders:
             self._process_api(api)
-            self.result.apis_processed.append(api)
+            apis_processed.append(api)
 
-        # Calculate final statistics
-        self.result.calculate_stats()
-        logger.info(str(self.result))
+        # Build the final statistics
+        result = VerifierResult(
+            total_constraints=self.total_constraints,
+            examples_found=self.examples_found,
+            apis_processed=apis_processed,
+        )
+        logger.info(str(result))
 
-        return self.result
+        return result
 
     def _process_api(self, api_name: str) -> None:
         """
@@ -138,9 +144,9 @@ class ExampleVerifier:
                 search_result = finder.find_example_value(object_name, field_name)
 
                 # Update statistics
-                self.result.total_constraints += 1
+                self.total_constraints += 1
                 if search_result.found:
-                    self.result.examples_found += 1
+                    self.examples_found += 1
 
                 # Update dataframe
                 df.at[index, "Example_value"] = str(search_result.example_value)